@@ -1,10 +1,30 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import predict
+from app.routers import predict, status, metrics, profiling
+from app.middleware import RequestMetricsMiddleware
+from core.config import BaseConfig
+from core.logger import setup_logging
+from services.scheduler import SCHEDULER
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Siklus hidup aplikasi: jalankan scheduler latar belakang (refresh cache, pre-load model,
+    pre-compute forecast) saat startup dan hentikan saat shutdown.
+    """
+    if BaseConfig.SCHEDULER_ENABLED:
+        await SCHEDULER.start()
+    yield
+    if BaseConfig.SCHEDULER_ENABLED:
+        await SCHEDULER.stop()
+
+# Log ditulis lewat antrean di thread terpisah agar request tidak menunggu I/O stdout
+setup_logging()
 
 # Inisialisasi aplikasi FastAPI
 # Title dan Version akan muncul di dokumentasi otomatis (/docs)
-app = FastAPI(title="Finsight ML API", version="1.0")
+app = FastAPI(title="Finsight ML API", version="1.0", lifespan=lifespan)
 
 # Konfigurasi CORS (Cross-Origin Resource Sharing)
 # Agar frontend (Next.js di port 3000) bisa mengakses API ini (di port 8000)
@@ -16,9 +36,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Daftarkan router dari modul lain
+# Catat durasi setiap request untuk endpoint /metrics
+app.add_middleware(RequestMetricsMiddleware)
+
 # Daftarkan router dari modul lain
 app.include_router(predict.router)
+app.include_router(status.router)
+app.include_router(metrics.router)
+app.include_router(profiling.router)
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Response
+from services.metrics import REGISTRY, CallbackMetric
+from services.predictor import MODEL_REGISTRY, FORECAST_CACHE
+from services.plotting import PLOT_RENDERER
+
+router = APIRouter()
+
+# Nilai cache & antrean dibaca dari statistik yang sudah ada saat scrape, tanpa biaya di jalur request
+CallbackMetric('finsight_model_cache_entries', 'Jumlah model & scaler di cache memori',
+               lambda: {(): MODEL_REGISTRY.stats()['entries']})
+CallbackMetric('finsight_model_cache_bytes', 'Perkiraan memori cache model & scaler (byte)',
+               lambda: {(): MODEL_REGISTRY.stats()['total_bytes']})
+CallbackMetric('finsight_model_cache_total', 'Hasil lookup cache model & scaler',
+               lambda: {(key,): MODEL_REGISTRY.stats()[key] for key in ('hits', 'misses', 'evictions', 'invalidations')},
+               labelnames=['result'], kind='counter')
+CallbackMetric('finsight_forecast_cache_entries', 'Jumlah forecast tersimpan',
+               lambda: {(): FORECAST_CACHE.stats()['entries']})
+CallbackMetric('finsight_forecast_cache_total', 'Hasil lookup cache forecast',
+               lambda: {(key,): FORECAST_CACHE.stats()[key] for key in ('hits', 'misses')},
+               labelnames=['result'], kind='counter')
+CallbackMetric('finsight_plot_queue_pending', 'Jumlah grafik yang menunggu dirender',
+               lambda: {(): PLOT_RENDERER.stats()['pending']})
+
+@router.get("/metrics")
+def get_metrics():
+    """
+    Endpoint metrik dalam format teks Prometheus (durasi per tahap, hasil cache, retry unduhan, ukuran cache).
+    """
+    return Response(content=REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
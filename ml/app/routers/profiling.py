@@ -0,0 +1,59 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from services.profiling import PROFILER
+
+router = APIRouter(prefix="/debug")
+
+def _authorize(request: Request):
+    """
+    Endpoint profil hanya tersedia saat profiler aktif dan PROFILING_TOKEN diisi; request harus
+    menyertakan header `X-Finsight-Profile` yang sama.
+
+    Raises:
+        HTTPException(404): Jika profiler nonaktif atau token tidak diset (endpoint seolah tidak ada).
+        HTTPException(403): Jika token tidak cocok.
+    """
+    if not PROFILER.readable:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not PROFILER.authorized(request.headers):
+        raise HTTPException(status_code=403, detail="Token profiling tidak valid.")
+
+@router.get("/profiles")
+def list_profiles(request: Request):
+    """
+    Daftar profil request prediksi yang tersimpan (terbaru lebih dulu), tanpa stack collapsed.
+    """
+    _authorize(request)
+    return {"profiles": PROFILER.summaries()}
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str, request: Request, format: str = "json"):
+    """
+    Detail satu profil.
+
+    Args:
+        profile_id (str): Id dari header `X-Profile-Id` respons prediksi.
+        format (str): 'json' (ringkasan + fungsi teratas + durasi tahap), 'collapsed' (stack collapsed
+            untuk flamegraph.pl / speedscope), atau 'pstats' (output pstats terurut waktu kumulatif).
+
+    Raises:
+        HTTPException(404): Jika profil tidak ditemukan (atau sudah tergeser profil baru).
+        HTTPException(400): Jika format tidak valid.
+    """
+    _authorize(request)
+    record = PROFILER.get(profile_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Profil {profile_id} tidak ditemukan.")
+    if format == "json":
+        return {key: value for key, value in record.items() if key not in ("collapsed", "pstats")}
+    if format in ("collapsed", "pstats"):
+        return Response(content=record[format], media_type="text/plain; charset=utf-8")
+    raise HTTPException(status_code=400, detail="Format tidak valid. Gunakan 'json', 'collapsed', atau 'pstats'.")
+
+@router.get("/stages")
+def get_slow_stages(request: Request, top: int = None):
+    """
+    Tahap paling lambat dalam jendela waktu bergulir (PROFILING_STAGE_WINDOW detik): statistik per tahap
+    (count, mean, p50, p95, max) dan observasi individual paling lambat beserta request-nya.
+    """
+    _authorize(request)
+    return PROFILER.stages.top(top or PROFILER.top_n)
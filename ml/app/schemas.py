@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import Dict, List
+from core.config import BaseConfig
 
 class ForecastItem(BaseModel):
     """
@@ -16,3 +17,19 @@ class PredictionResponse(BaseModel):
     symbol: str              # Simbol mata uang (cth: USDIDR=X)
     mode: str                # Mode prediksi (daily/hourly)
     data: List[ForecastItem] # Daftar hasil prediksi
+
+class BatchPredictionRequest(BaseModel):
+    """
+    Model request untuk prediksi banyak simbol sekaligus.
+    """
+    # Daftar simbol mata uang (cth: ["USDIDR=X", "EURUSD=X"]), dibatasi agar satu request tidak
+    # memicu unduhan & muat model untuk jumlah simbol yang tidak terbatas
+    symbols: List[str] = Field(max_length=BaseConfig.BATCH_MAX_SYMBOLS)
+
+class BatchPredictionResponse(BaseModel):
+    """
+    Model respons untuk prediksi batch.
+    """
+    mode: str                          # Mode prediksi (daily/hourly)
+    results: List[PredictionResponse]  # Hasil prediksi per simbol yang berhasil
+    errors: Dict[str, str]             # Pesan error per simbol yang gagal
@@ -0,0 +1,35 @@
+import argparse
+import json
+import os
+from core.config import CONFIGS
+from core.logger import setup_logging
+
+if __name__ == '__main__':
+    # Konfigurasi argumen baris perintah (CLI)
+    parser = argparse.ArgumentParser(description='Walk-forward backtest model LSTM terlatih')
+
+    # Argumen Mode: 'daily', 'hourly', atau 'all' (keduanya)
+    parser.add_argument('--mode', type=str, default='hourly', choices=['daily', 'hourly', 'all'], help='Mode prediksi: daily, hourly, atau all')
+
+    # Argumen Simbol: Mata uang yang diuji
+    parser.add_argument('--symbol', type=str, default='USDIDR=X', help='Simbol mata uang (cth: EURUSD=X)')
+    parser.add_argument('--start', type=str, default=None, help='Tanggal origin pertama YYYY-MM-DD (default: awal periode uji)')
+    parser.add_argument('--stride', type=int, default=1, help='Jarak antar origin dalam bar')
+    parser.add_argument('--report', type=str, default='backtest_report.json', help='Lokasi file laporan JSON')
+
+    args = parser.parse_args()
+    setup_logging()
+
+    from services.backtest import run_backtest, print_backtest
+
+    modes = list(CONFIGS.keys()) if args.mode == 'all' else [args.mode]
+    reports = [run_backtest(CONFIGS[mode], symbol=args.symbol, stride=args.stride, start=args.start) for mode in modes]
+    report = reports[0] if len(reports) == 1 else {'backtests': reports}
+
+    for res in reports:
+        print_backtest(res)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Laporan backtest disimpan ke {args.report}")
@@ -0,0 +1,2056 @@
+import argparse
+import asyncio
+import collections
+import itertools
+import multiprocessing
+import os
+import json
+import resource
+import subprocess
+import sys
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+from datetime import timedelta
+import numpy as np
+from services.data_service import create_sequences, CACHE_DIR
+from services.cache_store import CsvCacheStore, BinaryCacheStore
+from core.config import CONFIGS
+
+
+def create_sequences_loop(data, lookback, prediction_days):
+    """
+    Implementasi lama create_sequences (loop Python per baris).
+    Disimpan sebagai pembanding kecepatan dan acuan kesamaan hasil (parity).
+    """
+    X, y = [], []
+    for i in range(lookback, len(data) - prediction_days + 1):
+        X.append(data[i-lookback:i, 0])
+        y.append(data[i:i+prediction_days, 0])
+    return np.array(X), np.array(y)
+
+
+def _best_of(func, repeat):
+    """
+    Menjalankan func sebanyak `repeat` kali dan mengembalikan waktu tercepat (detik).
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_sequences(sizes, lookback=60, prediction_days=7, repeat=3):
+    """
+    Membandingkan create_sequences versi loop dengan versi strided view.
+
+    Returns:
+        list: Daftar dictionary berisi hasil per ukuran data
+    """
+    rng = np.random.default_rng(42)
+    results = []
+    for n in sizes:
+        data = rng.random((n, 1))
+
+        X_loop, y_loop = create_sequences_loop(data, lookback, prediction_days)
+        X_view, y_view = create_sequences(data, lookback, prediction_days)
+        if not (np.array_equal(X_loop, X_view) and np.array_equal(y_loop, y_view)):
+            raise AssertionError(f"Hasil create_sequences berbeda dari implementasi loop (n={n})")
+
+        results.append({
+            'rows': n,
+            'loop_s': _best_of(lambda: create_sequences_loop(data, lookback, prediction_days), repeat),
+            'view_s': _best_of(lambda: create_sequences(data, lookback, prediction_days), repeat),
+            'materialize_s': _best_of(lambda: create_sequences(data, lookback, prediction_days, materialize=True), repeat),
+        })
+    return results
+
+
+def bench_cache(ticker='USDIDR=X', intervals=('1d', '1h'), repeat=20):
+    """
+    Membandingkan latensi baca cache CSV dengan cache biner kolumnar (mmap).
+    Cache CSV yang ada disalin ke direktori sementara agar cache asli tidak berubah.
+
+    Returns:
+        list: Daftar dictionary berisi hasil per interval
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_store = CsvCacheStore(tmp_dir)
+        binary_store = BinaryCacheStore(tmp_dir)
+        for interval in intervals:
+            source = os.path.join(CACHE_DIR, f"{ticker}_{interval}.csv")
+            if not os.path.exists(source):
+                print(f"Lewati {interval}: cache CSV tidak ditemukan di {source}")
+                continue
+            shutil.copy(source, csv_store.path(ticker, interval))
+
+            # Migrasi satu kali dari CSV ke biner, lalu pastikan isinya identik
+            binary_store.exists(ticker, interval)
+            df_csv = csv_store.read(ticker, interval)
+            df_bin = binary_store.read(ticker, interval)
+            if not (df_csv.index.equals(df_bin.index) and np.array_equal(df_csv.values, df_bin.values)):
+                raise AssertionError(f"Isi cache biner berbeda dari CSV ({interval})")
+
+            results.append({
+                'interval': interval,
+                'rows': len(df_csv),
+                'csv_s': _best_of(lambda: csv_store.read(ticker, interval), repeat),
+                'binary_s': _best_of(lambda: binary_store.read(ticker, interval), repeat),
+            })
+    return results
+
+
+def _peak_rss_mb():
+    """
+    Puncak RSS proses saat ini (MB). ru_maxrss dalam KB di Linux.
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _train_epochs(mode, pipeline, rows, epochs):
+    """
+    Melatih model `mode` pada deret sintetis sepanjang `rows` dengan pipeline input tertentu.
+    Dijalankan di proses terpisah agar puncak RSS setiap pipeline terukur sendiri-sendiri.
+    """
+    import tensorflow as tf
+    from services.model_service import build_model, make_window_dataset, fit_model
+    from services.data_service import train_size_for
+
+    conf = CONFIGS[mode]
+    # Random walk ternormalisasi ke [0, 1], menyerupai harga setelah MinMaxScaler
+    series = np.cumsum(np.random.default_rng(42).normal(size=(rows, 1)), axis=0)
+    series = (series - series.min()) / (series.max() - series.min())
+
+    model = build_model((conf.LOOKBACK_WINDOW, 1), conf.PREDICTION_STEPS, units=conf.UNITS, dropout_rate=conf.DROPOUT_RATE)
+    baseline_rss = _peak_rss_mb()
+
+    if pipeline == 'numpy':
+        X, y = create_sequences(series, conf.LOOKBACK_WINDOW, conf.PREDICTION_STEPS)
+        X = np.reshape(X, (X.shape[0], X.shape[1], 1))
+        train_size = train_size_for(len(X), conf.TEST_SIZE)
+        train_data, val_data = (X[:train_size], y[:train_size]), (X[train_size:], y[train_size:])
+    else:
+        n_samples = len(series) - conf.LOOKBACK_WINDOW - conf.PREDICTION_STEPS + 1
+        train_size = train_size_for(n_samples, conf.TEST_SIZE)
+        window = dict(lookback=conf.LOOKBACK_WINDOW, prediction_days=conf.PREDICTION_STEPS, batch_size=conf.BATCH_SIZE)
+        train_data = make_window_dataset(series, start=0, stop=train_size, shuffle=True, **window)
+        val_data = make_window_dataset(series, start=train_size, stop=n_samples, **window)
+
+    epoch_times = []
+
+    class EpochTimer(tf.keras.callbacks.Callback):
+        def on_epoch_begin(self, epoch, logs=None):
+            self.start = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            epoch_times.append(time.perf_counter() - self.start)
+
+    fit_model(model, train_data, val_data, epochs=epochs, batch_size=conf.BATCH_SIZE,
+              verbose=0, callbacks=[EpochTimer()])
+
+    # Epoch pertama memuat tracing graph; ambil median epoch berikutnya sebagai waktu per epoch
+    steady = epoch_times[1:] or epoch_times
+    peak_rss = _peak_rss_mb()
+    return {
+        'mode': mode,
+        'pipeline': pipeline,
+        'rows': rows,
+        'first_epoch_s': epoch_times[0],
+        'epoch_s': float(np.median(steady)),
+        'peak_rss_mb': peak_rss,
+        'fit_rss_mb': peak_rss - baseline_rss,
+    }
+
+
+def bench_pipeline(modes=('daily', 'hourly'), pipelines=('numpy', 'tfdata'), epochs=3, scale=1.0):
+    """
+    Membandingkan waktu per epoch dan puncak RSS pipeline input numpy vs tf.data.
+    Panjang deret mengikuti ukuran data asli setiap mode (15 tahun harian, 720 hari per jam),
+    dikalikan `scale` untuk melihat pertumbuhan memori terhadap panjang data.
+
+    Returns:
+        list: Daftar dictionary berisi hasil per (mode, pipeline)
+    """
+    default_rows = {'daily': 3900, 'hourly': 12000}
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for mode in modes:
+        rows = int(default_rows[mode] * scale)
+        for pipeline in pipelines:
+            # Satu proses baru per pengukuran: ru_maxrss tidak pernah turun dalam satu proses
+            with context.Pool(1) as pool:
+                results.append(pool.apply(_train_epochs, (mode, pipeline, rows, epochs)))
+    return results
+
+
+def _current_rss_mb():
+    """
+    RSS proses saat ini (MB), dibaca dari /proc (Linux). Berbeda dengan ru_maxrss, nilai ini bisa turun.
+    """
+    with open('/proc/self/statm') as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+def _legacy_pyplot_plot(path, history, forecast):
+    """
+    Pola plot lama (state global pyplot, figure tidak pernah ditutup) sebagai pembanding memori.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(12, 6))
+    plt.plot(history, color='blue')
+    plt.plot(range(len(history) - 1, len(history) + len(forecast) - 1), forecast, color='red', marker='o')
+    plt.savefig(path)
+
+
+def bench_plots(count=300, warmup=50, max_growth_mb=10.0, legacy=True):
+    """
+    Merender `count` grafik forecast melalui PlotRenderer dan memeriksa bahwa memori tetap datar
+    (pertumbuhan RSS setelah `warmup` render tidak melebihi `max_growth_mb`).
+    Pola pyplot lama diukur dengan cara yang sama sebagai pembanding.
+
+    Returns:
+        list: Daftar dictionary berisi hasil per implementasi, termasuk status `ok`
+    """
+    import warnings
+    from services.plotting import PlotRenderer, render_lines
+
+    rng = np.random.default_rng(42)
+    history = 16000 + np.cumsum(rng.normal(size=60))
+    forecast = history[-1] + np.cumsum(rng.normal(size=24))
+    lines = [(None, history, dict(label='Riwayat', color='blue')),
+             (list(range(59, 83)), forecast, dict(label='Prediksi', color='red', marker='o'))]
+
+    def measure(render):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'forecast.png')
+            start = time.perf_counter()
+            for i in range(count):
+                if i == warmup:
+                    baseline = _current_rss_mb()
+                render(path)
+            elapsed = time.perf_counter() - start
+            return elapsed, _current_rss_mb() - baseline
+
+    results = []
+    renderer = PlotRenderer(verbose=False)
+
+    def render_worker(path):
+        renderer.submit(render_lines, path, lines, title='Forecast', xlabel='Langkah', ylabel='Harga', grid=True).result()
+
+    elapsed, growth = measure(render_worker)
+    results.append({'impl': 'renderer', 'count': count, 'per_plot_ms': elapsed / count * 1e3,
+                    'rss_growth_mb': growth, 'ok': growth <= max_growth_mb})
+
+    if legacy:
+        with warnings.catch_warnings():
+            # pyplot memperingatkan lebih dari 20 figure terbuka, justru itu yang diukur
+            warnings.simplefilter('ignore')
+            elapsed, growth = measure(lambda path: _legacy_pyplot_plot(path, history, forecast))
+        results.append({'impl': 'pyplot', 'count': count, 'per_plot_ms': elapsed / count * 1e3,
+                        'rss_growth_mb': growth, 'ok': growth <= max_growth_mb})
+    return results
+
+
+# Dependensi berat yang tidak boleh ikut termuat saat import modul jalur API
+HEAVY_MODULES = ('tensorflow', 'matplotlib', 'yfinance', 'sklearn')
+# Anggaran waktu import default (detik) untuk `benchmark.py imports`
+IMPORT_BUDGET_S = 1.0
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+__import__(sys.argv[1])
+elapsed = time.perf_counter() - start
+print(json.dumps({'import_s': elapsed, 'modules': sorted(m for m in sys.modules if '.' not in m)}))
+"""
+
+
+def check_imports(modules=('services.predictor', 'app.main'), budget=IMPORT_BUDGET_S, repeat=3):
+    """
+    Mengukur waktu import modul di proses Python baru (median dari `repeat` proses) dan memeriksa
+    bahwa dependensi berat (HEAVY_MODULES) tidak ikut termuat. Dipakai sebagai pemeriksaan regresi
+    waktu startup worker API.
+
+    Returns:
+        list: Daftar dictionary berisi hasil per modul, termasuk status `ok`
+    """
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for module in modules:
+        runs = []
+        for _ in range(repeat):
+            proc = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT, module],
+                                  cwd=base_dir, capture_output=True, text=True, check=True)
+            runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        import_s = float(np.median([run['import_s'] for run in runs]))
+        heavy = [name for name in HEAVY_MODULES if name in runs[0]['modules']]
+        results.append({
+            'module': module,
+            'import_s': import_s,
+            'heavy_modules': heavy,
+            'ok': import_s <= budget and not heavy,
+        })
+    return results
+
+
+def lstm_forward_loop(bundle, X):
+    """
+    Forward pass LSTM + Dense langsung dari bobot Keras (gate terpisah, float64, tanpa prekomputasi).
+    Disimpan sebagai pembanding kecepatan mesin inferensi NumPy (services/inference.py).
+    """
+    def sigmoid(x):
+        return 1.0 / (1.0 + np.exp(-x))
+
+    outputs = np.asarray(X, dtype=np.float64)
+    for index, kind in enumerate(bundle['layer_types']):
+        if kind == 'dense':
+            outputs = outputs @ bundle[f'layer_{index}_kernel'] + bundle[f'layer_{index}_bias']
+            continue
+        kernel, recurrent_kernel, bias = (bundle[f'layer_{index}_{name}'] for name in ('kernel', 'recurrent_kernel', 'bias'))
+        units = recurrent_kernel.shape[0]
+        h = np.zeros((len(outputs), units))
+        c = np.zeros((len(outputs), units))
+        sequence = []
+        for t in range(outputs.shape[1]):
+            z = outputs[:, t, :] @ kernel + h @ recurrent_kernel + bias
+            i, f, g, o = sigmoid(z[:, :units]), sigmoid(z[:, units:2*units]), np.tanh(z[:, 2*units:3*units]), sigmoid(z[:, 3*units:])
+            c = f * c + i * g
+            h = o * np.tanh(c)
+            sequence.append(h)
+        outputs = np.stack(sequence, axis=1) if kind == 'lstm_seq' else h
+    return outputs
+
+
+def _engine_from_bundle(bundle):
+    """
+    Membuat mesin inferensi NumPy langsung dari bundle di memori (tanpa menulis file .npz).
+    """
+    from services.inference import NumpyLSTMModel
+
+    layers = []
+    for index, kind in enumerate(bundle['layer_types']):
+        names = ('kernel', 'bias') if kind == 'dense' else ('kernel', 'recurrent_kernel', 'bias')
+        layers.append((str(kind), [bundle[f'layer_{index}_{name}'] for name in names]))
+    return NumpyLSTMModel(layers)
+
+
+def bench_engine(mode='hourly', batch_sizes=(1, 8, 64, 512, 4096), repeat=5):
+    """
+    Membandingkan latensi & throughput forward pass: Keras model.predict, loop NumPy sederhana,
+    dan mesin inferensi NumPy (gate fused, float32). Model dibangun dengan bobot acak sesuai konfigurasi mode.
+
+    Returns:
+        list: Daftar dictionary berisi hasil per ukuran batch
+    """
+    from services.model_service import build_model
+    from services.inference import bundle_from_keras
+
+    conf = CONFIGS[mode]
+    model = build_model((conf.LOOKBACK_WINDOW, 1), conf.PREDICTION_STEPS, units=conf.UNITS, dropout_rate=conf.DROPOUT_RATE)
+    bundle = bundle_from_keras(model)
+    engine = _engine_from_bundle(bundle)
+
+    rng = np.random.default_rng(42)
+    results = []
+    for batch in batch_sizes:
+        X = rng.random((batch, conf.LOOKBACK_WINDOW, 1), dtype=np.float32)
+        expected = model.predict(X, verbose=0)
+        actual = engine.predict(X)
+        if not np.allclose(actual, expected, rtol=1e-4, atol=1e-5):
+            raise AssertionError(f"Output mesin NumPy berbeda dari Keras (batch={batch}, selisih maks {np.abs(actual - expected).max():.2e})")
+
+        results.append({
+            'batch': batch,
+            'keras_s': _best_of(lambda: model.predict(X, verbose=0), repeat),
+            'loop_s': _best_of(lambda: lstm_forward_loop(bundle, X), repeat),
+            'engine_s': _best_of(lambda: engine.predict(X), repeat),
+            'max_abs_diff': float(np.abs(actual - expected).max()),
+        })
+    return results
+
+
+
+
+def check_stacked_engine(mode='hourly', models=3, extra=37):
+    """
+    Paritas model bertumpuk (`NumpyLSTMModel.stack`, dipakai prediksi batch) terhadap forward pass
+    per model, dengan jumlah sampel melebihi MAX_BATCH sehingga input dipotong pada sumbu sampel.
+
+    Returns:
+        dict: Jumlah model & sampel, selisih maks, status `ok`
+    """
+    from services.inference import NumpyLSTMModel, load_bundle
+
+    conf = CONFIGS[mode]
+    rng = np.random.default_rng(7)
+    saved_dir = conf.MODELS_DIR
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        conf.MODELS_DIR = tmp_dir
+        try:
+            engines = []
+            for index in range(models):
+                write_fixture_artifacts(conf, f"TEST{index}")
+                engines.append(load_bundle(conf.get_paths(f"TEST{index}")['weights']))
+        finally:
+            conf.MODELS_DIR = saved_dir
+    samples = NumpyLSTMModel.MAX_BATCH + extra
+    X = rng.random((models, samples, conf.LOOKBACK_WINDOW, 1), dtype=np.float32)
+    stacked = NumpyLSTMModel.stack(engines)
+    expected = np.stack([engine.predict(X[index]) for index, engine in enumerate(engines)])
+    diff = 0.0
+    # Potongan default (MAX_BATCH) dan potongan lebih kecil dari jumlah model
+    for batch_size in (None, models - 1):
+        try:
+            actual = stacked.predict(X, batch_size=batch_size)
+        except ValueError:
+            actual = None
+        if actual is None or actual.shape != expected.shape:
+            diff = float('inf')
+            break
+        diff = max(diff, float(np.abs(actual - expected).max()))
+    return {'models': models, 'samples': samples, 'max_abs_diff': diff, 'ok': diff < 1e-5}
+
+
+def _per_call(func, number=2000, repeat=3):
+    """
+    Waktu rata-rata satu pemanggilan func (detik), diambil dari pengulangan tercepat.
+    """
+    return _best_of(lambda: [func() for _ in range(number)], repeat) / number
+
+
+def bench_scaler(mode='hourly', batch=512, number=2000):
+    """
+    Mengukur overhead scaler per request: MinMaxScaler sklearn (joblib .pkl) vs MinMaxParams
+    (sidecar .json, transform NumPy). Hasil kedua implementasi harus identik bit per bit.
+
+    Returns:
+        list: Daftar dictionary berisi waktu per operasi (detik) untuk sklearn dan sidecar
+    """
+    import joblib
+    import pandas as pd
+    from services.data_service import preprocess_data
+    from services.scaling import MinMaxParams, save_params, load_scaler
+
+    conf = CONFIGS[mode]
+    prices = 16_000 * np.exp(np.cumsum(np.random.default_rng(42).normal(0, 0.002, 10_000)))
+    _, scaler = preprocess_data(pd.DataFrame({'Close': prices}))
+    params = MinMaxParams.from_sklearn(scaler)
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        pkl_path, json_path = os.path.join(tmp_dir, 'scaler.pkl'), os.path.join(tmp_dir, 'scaler.json')
+        joblib.dump(scaler, pkl_path)
+        save_params(scaler, json_path)
+
+        window = prices[-conf.LOOKBACK_WINDOW:].reshape(-1, 1).astype(conf.DTYPE)
+        output = np.random.default_rng(0).random((conf.PREDICTION_STEPS, 1), dtype=np.float32)
+        windows = np.random.default_rng(1).random((batch, conf.LOOKBACK_WINDOW, 1)).astype(np.float32) * 20_000
+
+        cases = [
+            ('load', lambda: joblib.load(pkl_path), lambda: load_scaler(json_path)),
+            ('transform', lambda: scaler.transform(window), lambda: params.transform(window)),
+            ('inverse', lambda: scaler.inverse_transform(output), lambda: params.inverse_transform(output)),
+            (f'batch {batch}', lambda: scaler.transform(windows.reshape(-1, 1)).reshape(windows.shape),
+             lambda: params.transform(windows)),
+        ]
+        results = []
+        for name, legacy, fast in cases:
+            if name != 'load':
+                expected, actual = legacy(), fast()
+                if expected.dtype != actual.dtype or not np.array_equal(expected, actual):
+                    raise AssertionError(f"Hasil MinMaxParams berbeda dari sklearn ({name})")
+            calls = number if name != 'load' else max(1, number // 10)
+            results.append({'op': name, 'sklearn_s': _per_call(legacy, calls), 'params_s': _per_call(fast, calls)})
+        return results
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def bench_metrics(number=200_000, threads=8):
+    """
+    Mengukur overhead instrumentasi per operasi (counter, histogram, timer tahap) dan memastikan
+    counter tanpa lock tetap tepat saat ditulis banyak thread bersamaan.
+
+    Returns:
+        dict: Waktu per operasi (detik) dan hasil pemeriksaan konkurensi
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from services.metrics import MetricsRegistry, Counter, Histogram
+
+    registry = MetricsRegistry()
+    counter = Counter('bench_total', 'Counter benchmark', ['result'], registry=registry)
+    histogram = Histogram('bench_seconds', 'Histogram benchmark', ['stage'], registry=registry)
+
+    def inc():
+        counter.labels('hit').inc()
+
+    def observe():
+        histogram.labels('predict').observe(0.003)
+
+    def timer():
+        with histogram.labels('predict').time():
+            pass
+
+    results = {name: _per_call(func, number) for name, func in
+               (('counter_inc', inc), ('histogram_observe', observe), ('stage_timer', timer))}
+
+    # Konkurensi: setiap thread menambah counter `number` kali
+    concurrent = Counter('bench_concurrent_total', 'Counter konkurensi', registry=registry)
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lambda _: [concurrent.inc() for _ in range(number)], range(threads)))
+    results['concurrent_expected'] = threads * number
+    results['concurrent_total'] = int(concurrent.labels().value())
+    start = time.perf_counter()
+    registry.render()
+    results['render_s'] = time.perf_counter() - start
+    return results
+
+
+def bench_logging(number=20_000):
+    """
+    Membandingkan biaya per pesan di thread pemanggil: `print` langsung ke pipe vs logger dengan
+    QueueHandler (I/O di thread listener), pesan CACHE HIT yang disampling, dan log debug yang nonaktif.
+    Pipe dibaca lambat oleh thread lain, meniru pipeline log produksi yang tertinggal saat beban tinggi.
+
+    Returns:
+        dict: Waktu per pesan (detik) untuk setiap cara
+    """
+    import io
+    import logging
+    import threading
+    from core.logger import setup_logging, LogSampler, _stop_listener
+
+    def slow_reader():
+        # Konsumen log yang lambat (~1 MB/s): pipe penuh membuat penulis sinkron ikut menunggu
+        while os.read(read_fd, 4096):
+            time.sleep(0.004)
+
+    read_fd, write_fd = os.pipe()
+    threading.Thread(target=slow_reader, daemon=True).start()
+    stream = io.TextIOWrapper(io.FileIO(write_fd, 'w'), line_buffering=True)
+
+    logger = logging.getLogger('services.benchmark')
+    sampler = LogSampler(100)
+    columns = ['Close'] * 50
+    try:
+        setup_logging(level='INFO', stream=stream)
+        results = {
+            'print_s': _per_call(lambda: print(f"CACHE HIT: Menggunakan data cache lokal untuk USDIDR=X", file=stream), number),
+            'logger_s': _per_call(lambda: logger.info("CACHE HIT: Menggunakan data cache lokal untuk %s", 'USDIDR=X'), number),
+            'sampled_s': _per_call(lambda: sampler() and logger.info("CACHE HIT: %s", 'USDIDR=X'), number),
+            'debug_off_s': _per_call(lambda: logger.debug("Initial DF Columns: %s", columns), number),
+        }
+    finally:
+        _stop_listener()
+        stream.close()
+    return results
+
+# Batas error relatif harga (terhadap acuan float64) untuk kebijakan dtype; 1e-4 = 1 basis poin
+DTYPE_TOLERANCE = 1e-4
+
+
+def bench_profiling(number=200_000, batch=64, repeat=20):
+    """
+    Mengukur biaya profiler opt-in: timer tahap tanpa profiler (jalur default) vs dengan profiler aktif
+    (pengamat tahap + jendela bergulir), serta perlambatan satu forward pass NumPy saat diprofil
+    (cProfile + sampler stack) dan jumlah sampel stack yang tertangkap.
+
+    Returns:
+        dict: Waktu per operasi/pemanggilan (detik) dan ringkasan profil
+    """
+    from services.inference import NumpyLSTMModel
+    from services.metrics import stage, remove_stage_observer
+    from services.profiling import RequestProfiler
+
+    results = {'stage_off_s': _per_call(lambda: stage('bench').__enter__().__exit__(), number)}
+    profiler = RequestProfiler(enabled=True, stage_window=60)
+    try:
+        results['stage_on_s'] = _per_call(lambda: stage('bench').__enter__().__exit__(), number)
+
+        rng = np.random.default_rng(0)
+        units, lookback, steps = 50, 60, 24
+        model = NumpyLSTMModel([
+            ('lstm_seq', [rng.normal(0, 0.1, (1, 4 * units)), rng.normal(0, 0.1, (units, 4 * units)), np.zeros(4 * units)]),
+            ('lstm', [rng.normal(0, 0.1, (units, 4 * units)), rng.normal(0, 0.1, (units, 4 * units)), np.zeros(4 * units)]),
+            ('dense', [rng.normal(0, 0.1, (units, steps)), np.zeros(steps)]),
+        ])
+        X = rng.random((batch, lookback, 1), dtype=np.float32)
+
+        def workload():
+            with stage('predict'):
+                return model.predict(X)
+
+        results['call_off_s'] = _best_of(workload, repeat)
+        results['call_on_s'] = _best_of(lambda: profiler.profile('bench', workload), repeat)
+        record = profiler.get(profiler.summaries()[0]['id'])
+        results.update(samples=record['samples'], stacks=len(record['collapsed'].splitlines()),
+                       top_function=record['top_functions'][0]['function'])
+    finally:
+        remove_stage_observer(profiler._observe_stage)
+    return results
+
+
+def bench_dtype(mode='daily', rows=100_000, levels=(16_000.0, 1.1), tolerance=DTYPE_TOLERANCE):
+    """
+    Memeriksa regresi akurasi kebijakan dtype (`BaseConfig.DTYPE` & `WEIGHTS_STORAGE_DTYPE`)
+    terhadap acuan float64, dalam satuan harga asli.
+
+    Untuk setiap level harga (cth: USDIDR ~16000, EURUSD ~1.1) deret random walk dinormalisasi
+    dengan float64 dan float32, lalu dibandingkan: (1) round-trip scaler, (2) prediksi model
+    (bobot acak) dari input float32 vs loop float64, untuk bobot tersimpan float32 dan float16.
+
+    Returns:
+        list: Daftar dictionary berisi hasil per (level harga, dtype)
+    """
+    from services.data_service import preprocess_data
+    from services.model_service import build_model
+    from services.inference import bundle_from_keras
+    import pandas as pd
+
+    conf = CONFIGS[mode]
+    model = build_model((conf.LOOKBACK_WINDOW, 1), conf.PREDICTION_STEPS, units=conf.UNITS, dropout_rate=conf.DROPOUT_RATE)
+    reference_bundle = bundle_from_keras(model, dtype='float64')
+
+    rng = np.random.default_rng(42)
+    results = []
+    for level in levels:
+        prices = level * np.exp(np.cumsum(rng.normal(0, 0.002, rows)))
+        df = pd.DataFrame({'Close': prices})
+
+        ref_scaled, scaler = preprocess_data(df, dtype='float64')
+        X_ref, _ = create_sequences(ref_scaled[-4096:], conf.LOOKBACK_WINDOW, conf.PREDICTION_STEPS, features=[0])
+        ref_pred = scaler.inverse_transform(lstm_forward_loop(reference_bundle, X_ref)[:, :1]).ravel()
+
+        # Data selalu float32; float16 hanya dipakai untuk penyimpanan bobot
+        scaled, _ = preprocess_data(df, dtype='float32')
+        roundtrip = scaler.inverse_transform(scaled).ravel()
+        scaler_err = float(np.max(np.abs(roundtrip - prices) / prices))
+
+        for dtype in ('float32', 'float16'):
+            bundle = bundle_from_keras(model, dtype=dtype)
+            engine = _engine_from_bundle(bundle)
+            X, _ = create_sequences(scaled[-4096:], conf.LOOKBACK_WINDOW, conf.PREDICTION_STEPS, features=[0])
+            pred = scaler.inverse_transform(engine.predict(X)[:, :1]).ravel()
+            predict_err = float(np.max(np.abs(pred - ref_pred) / np.abs(ref_pred)))
+
+            results.append({
+                'level': level,
+                'dtype': dtype,
+                'data_mb': scaled.nbytes / 1e6,
+                'data_ref_mb': ref_scaled.nbytes / 1e6,
+                'weights_kb': sum(v.nbytes for k, v in bundle.items() if k.startswith('layer_') and k != 'layer_types') / 1e3,
+                'scaler_rel_err': scaler_err,
+                'predict_rel_err': predict_err,
+                'ok': scaler_err <= tolerance and predict_err <= tolerance,
+            })
+    return results
+
+# Dijalankan di proses Python baru: import predictor -> muat artefak -> satu forward pass
+COLDSTART_SCRIPT = """
+import json, resource, sys, time
+start = time.perf_counter()
+from core.config import CONFIGS, BaseConfig
+BaseConfig.INFERENCE_BACKEND = sys.argv[1]
+import numpy as np
+from services.predictor import load_artifacts
+imported = time.perf_counter()
+conf = CONFIGS[sys.argv[2]]
+model, scaler = load_artifacts(conf, sys.argv[3], sys.argv[2])
+loaded = time.perf_counter()
+model.predict(np.zeros((1, conf.LOOKBACK_WINDOW, 1), dtype=np.float32), verbose=0)
+done = time.perf_counter()
+print(json.dumps({
+    'import_s': imported - start,
+    'load_s': loaded - imported,
+    'first_predict_s': done - loaded,
+    'total_s': done - start,
+    'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'tensorflow_loaded': 'tensorflow' in sys.modules,
+}))
+"""
+
+
+def bench_coldstart(symbol='USDIDR=X', mode='daily', backends=('keras', 'numpy'), repeat=3):
+    """
+    Mengukur cold start worker API (import + muat model + prediksi pertama) dan puncak RSS
+    untuk setiap backend inferensi. Setiap pengukuran memakai proses Python baru.
+
+    Returns:
+        list: Daftar dictionary berisi hasil per backend (median dari `repeat` proses)
+    """
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for backend in backends:
+        runs = []
+        for _ in range(repeat):
+            proc = subprocess.run([sys.executable, '-c', COLDSTART_SCRIPT, backend, mode, symbol],
+                                  cwd=base_dir, capture_output=True, text=True, check=True)
+            runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        result = {key: float(np.median([run[key] for run in runs])) for key in runs[0] if key != 'tensorflow_loaded'}
+        result.update(backend=backend, tensorflow_loaded=runs[0]['tensorflow_loaded'])
+        results.append(result)
+    return results
+
+
+# Simbol untuk skenario banyak simbol pada load test (data & model sintetis, tanpa jaringan)
+LOADTEST_SYMBOLS = ['USDIDR=X', 'EURUSD=X', 'GBPUSD=X', 'JPY=X', 'AUDUSD=X', 'SGDIDR=X', 'EURIDR=X', 'CNYIDR=X']
+LOADTEST_SCENARIOS = ('cold', 'warm', 'uncached')
+# Ambang regresi default saat membandingkan artefak suite dengan baseline (10%)
+REGRESSION_THRESHOLD = 0.10
+
+
+def _synthetic_base(ticker):
+    return 1000.0 + zlib.crc32(ticker.encode()) % 9000
+
+
+def fake_downloader(latency=0.0):
+    """
+    Pengunduh palsu pengganti `yf.download` untuk load test: harga sintetis deterministik per simbol
+    (fungsi dari timestamp, jadi unduhan delta konsisten dengan unduhan penuh), bar Senin-Jumat,
+    index UTC untuk interval per jam seperti yfinance. `latency` meniru waktu respons Yahoo Finance.
+    """
+    import pandas as pd
+
+    def download(ticker, start=None, end=None, interval='1d', progress=False):
+        if latency:
+            time.sleep(latency)
+        hourly = interval == '1h'
+        now = pd.Timestamp.now().floor('h')
+        end = now if end is None else min(pd.Timestamp(end), now)
+        index = pd.date_range(pd.Timestamp(start), end, freq='h' if hourly else 'D', inclusive='left',
+                              name='Datetime' if hourly else 'Date')
+        index = index[index.dayofweek < 5]
+        if hourly:
+            index = index.tz_localize('UTC')
+        hours = index.asi8 / 3.6e12
+        close = _synthetic_base(ticker) * (1 + 0.03 * np.sin(hours / 97.0) + 0.01 * np.sin(hours / 7.3))
+        return pd.DataFrame({'Close': close}, index=index)
+    return download
+
+
+def write_fixture_artifacts(conf, symbol):
+    """
+    Menulis bundle bobot NumPy (.npz, topologi build_model dengan bobot acak) dan sidecar scaler (.json)
+    untuk simbol & mode ke `conf.MODELS_DIR`. Tidak membutuhkan TensorFlow maupun pelatihan.
+    """
+    from services.inference import BUNDLE_VERSION, save_bundle
+    from services.scaling import MinMaxParams, save_params, scaler_params_path
+
+    rng = np.random.default_rng(zlib.crc32(f"{symbol}:{conf.MODE}".encode()))
+    units = conf.UNITS
+    layer_types = ['lstm_seq', 'lstm_seq', 'lstm', 'dense']
+    bundle = {'version': np.array(BUNDLE_VERSION), 'layer_types': np.array(layer_types)}
+    inputs = 1
+    for index, kind in enumerate(layer_types):
+        if kind == 'dense':
+            bundle[f'layer_{index}_kernel'] = rng.normal(0, 0.1, (units, conf.PREDICTION_STEPS)).astype(np.float32)
+            bundle[f'layer_{index}_bias'] = np.full(conf.PREDICTION_STEPS, 0.5, dtype=np.float32)
+            continue
+        bundle[f'layer_{index}_kernel'] = rng.normal(0, 0.1, (inputs, 4 * units)).astype(np.float32)
+        bundle[f'layer_{index}_recurrent_kernel'] = rng.normal(0, 0.1, (units, 4 * units)).astype(np.float32)
+        bundle[f'layer_{index}_bias'] = np.zeros(4 * units, dtype=np.float32)
+        inputs = units
+
+    paths = conf.get_paths(symbol)
+    save_bundle(bundle, paths['weights'])
+    low, high = _synthetic_base(symbol) * 0.95, _synthetic_base(symbol) * 1.05
+    scale = 1.0 / (high - low)
+    save_params(MinMaxParams([-low * scale], [scale], [low], [high]), scaler_params_path(paths['scaler']))
+
+
+class LoadTestEnv:
+    """
+    Lingkungan in-process untuk load test API: model fixture & cache harga di direktori sementara,
+    pengunduh palsu menggantikan Yahoo Finance, dan app FastAPI dipanggil langsung lewat ASGI
+    (middleware dan router sama seperti produksi; scheduler latar belakang tidak dijalankan).
+    Semua perubahan dikembalikan saat keluar dari blok `with`.
+    """
+    def __init__(self, modes, symbols, download_latency=0.0):
+        self.modes = list(modes)
+        self.symbols = list(symbols)
+        self.download_latency = download_latency
+
+    def __enter__(self):
+        import services.data_service as data_service
+        from services.predictor import MODEL_REGISTRY, FORECAST_CACHE
+        from core.logger import setup_logging
+        from app.main import app
+
+        # Log per request (CACHE HIT, muat model) tidak relevan untuk pengukuran
+        setup_logging('WARNING')
+        self.app = app
+        self.data_service = data_service
+        self.model_registry = MODEL_REGISTRY
+        self.forecast_cache = FORECAST_CACHE
+        self.tmp_dir = tempfile.mkdtemp(prefix='finsight-loadtest-')
+        self._saved = (data_service.CACHE_STORE, data_service.default_downloader,
+                       {mode: conf.MODELS_DIR for mode, conf in CONFIGS.items()})
+
+        download = fake_downloader(self.download_latency)
+        data_service.default_downloader = lambda: download
+        for mode in self.modes:
+            CONFIGS[mode].MODELS_DIR = os.path.join(self.tmp_dir, 'models')
+            for symbol in self.symbols:
+                write_fixture_artifacts(CONFIGS[mode], symbol)
+        self.reset()
+        return self
+
+    def __exit__(self, *exc):
+        cache_store, downloader, models_dirs = self._saved
+        self.data_service.CACHE_STORE = cache_store
+        self.data_service.default_downloader = downloader
+        for mode, models_dir in models_dirs.items():
+            CONFIGS[mode].MODELS_DIR = models_dir
+        self.forecast_cache.__dict__.pop('get_entry', None)
+        self.model_registry.invalidate()
+        self.forecast_cache.invalidate()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        return False
+
+    def reset(self):
+        """
+        Mengosongkan semua cache (harga, model & scaler, forecast) untuk skenario cold.
+        """
+        self.data_service.CACHE_STORE = BinaryCacheStore(tempfile.mkdtemp(prefix='cache-', dir=self.tmp_dir))
+        self.model_registry.invalidate()
+        self.forecast_cache.invalidate()
+
+    def bypass_forecast_cache(self, enabled):
+        """
+        Melewati cache forecast agar setiap request menjalankan inferensi penuh (skenario uncached).
+        """
+        if enabled:
+            self.forecast_cache.get_entry = lambda *args: None
+        else:
+            self.forecast_cache.__dict__.pop('get_entry', None)
+
+    def paths(self, symbols=None):
+        return [f"/predict/{mode}?symbol={symbol}" for symbol in (symbols or self.symbols) for mode in self.modes]
+
+
+class _RssMonitor:
+    """
+    Mencatat puncak RSS selama satu blok pengukuran (sampling /proc setiap `interval` detik).
+    ru_maxrss hanya memberi puncak sejak proses mulai, sehingga tidak bisa dipakai per skenario.
+    """
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+
+    def _run(self):
+        while True:
+            self.peak_mb = max(self.peak_mb, _current_rss_mb())
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self):
+        self.peak_mb = _current_rss_mb()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, _current_rss_mb())
+        return False
+
+
+async def _drive(app, paths, total, concurrency):
+    """
+    Mengirim `total` request GET (bergiliran atas `paths`) dengan `concurrency` klien bersamaan.
+
+    Returns:
+        tuple: (latensi per request dalam detik, jumlah status per kode, waktu total)
+    """
+    import httpx
+
+    latencies, statuses = [], collections.Counter()
+    counter = itertools.count()
+
+    async def client_loop(client):
+        while (i := next(counter)) < total:
+            start = time.perf_counter()
+            response = await client.get(paths[i % len(paths)])
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://loadtest') as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        wall = time.perf_counter() - start
+    return np.array(latencies), statuses, wall
+
+
+def _latency_summary(latencies, statuses, wall):
+    return {
+        'requests': int(len(latencies)),
+        'errors': int(sum(count for status, count in statuses.items() if status != 200)),
+        'status': {str(status): count for status, count in sorted(statuses.items())},
+        'p50_ms': float(np.percentile(latencies, 50) * 1e3),
+        'p95_ms': float(np.percentile(latencies, 95) * 1e3),
+        'p99_ms': float(np.percentile(latencies, 99) * 1e3),
+        'mean_ms': float(latencies.mean() * 1e3),
+        'max_ms': float(latencies.max() * 1e3),
+        'rps': len(latencies) / wall,
+        'wall_s': wall,
+    }
+
+
+def run_load_scenario(env, scenario, symbols, concurrency, requests, cold_rounds=20):
+    """
+    Menjalankan satu skenario load test terhadap `/predict/{mode}`.
+
+    - cold: setiap putaran mengosongkan semua cache lalu meminta setiap (mode, simbol) sekali
+      (unduhan palsu, tulis cache, muat model & scaler, inferensi); diulang `cold_rounds` putaran.
+    - warm: cache harga, model, dan forecast sudah panas (kasus umum di produksi).
+    - uncached: cache harga & model panas, cache forecast dilewati sehingga setiap request
+      menjalankan jalur prediksi penuh (baca cache, normalisasi, forward pass, serialisasi).
+
+    Returns:
+        dict: Statistik latensi (p50/p95/p99), RPS, dan puncak RSS selama skenario
+    """
+    paths = env.paths(symbols)
+    env.bypass_forecast_cache(scenario == 'uncached')
+    try:
+        with _RssMonitor() as rss:
+            if scenario == 'cold':
+                latencies, statuses, wall = [], collections.Counter(), 0.0
+                for _ in range(cold_rounds):
+                    env.reset()
+                    round_latencies, round_statuses, round_wall = asyncio.run(
+                        _drive(env.app, paths, len(paths), min(concurrency, len(paths))))
+                    latencies.extend(round_latencies)
+                    statuses.update(round_statuses)
+                    wall += round_wall
+                latencies = np.array(latencies)
+            else:
+                # Pemanasan: satu request per path mengisi cache harga, model, dan forecast
+                asyncio.run(_drive(env.app, paths, len(paths), 1))
+                latencies, statuses, wall = asyncio.run(_drive(env.app, paths, requests, concurrency))
+    finally:
+        env.bypass_forecast_cache(False)
+
+    result = {'scenario': scenario, 'symbols': len(symbols), 'modes': env.modes, 'concurrency': concurrency}
+    result.update(_latency_summary(latencies, statuses, wall))
+    result['peak_rss_mb'] = rss.peak_mb
+    return result
+
+
+def bench_micro(env, mode, sequence_rows=100_000, repeat=20):
+    """
+    Micro-benchmark komponen jalur prediksi di lingkungan load test: create_sequences, pembacaan cache
+    harga (fetch_data saat cache hit), dan satu forward pass model fixture (batch 1 & 64).
+
+    Returns:
+        dict: Waktu tercepat per operasi (detik)
+    """
+    from services.data_service import fetch_data
+    from services.predictor import load_artifacts, recent_range
+
+    conf = CONFIGS[mode]
+    symbol = env.symbols[0]
+    sequences = bench_sequences([sequence_rows], conf.LOOKBACK_WINDOW, conf.PREDICTION_STEPS)[0]
+    fetch_data(symbol, **recent_range(conf, mode))
+    model, _ = load_artifacts(conf, symbol, mode)
+    rng = np.random.default_rng(0)
+    X1 = rng.random((1, conf.LOOKBACK_WINDOW, 1), dtype=np.float32)
+    X64 = rng.random((64, conf.LOOKBACK_WINDOW, 1), dtype=np.float32)
+    return {
+        'sequences_rows': sequence_rows,
+        'sequences_loop_s': sequences['loop_s'],
+        'sequences_view_s': sequences['view_s'],
+        'cache_read_s': _best_of(lambda: fetch_data(symbol, **recent_range(conf, mode)), repeat),
+        'forward_b1_s': _best_of(lambda: model.predict(X1), repeat),
+        'forward_b64_s': _best_of(lambda: model.predict(X64), repeat),
+    }
+
+
+def _git_commit():
+    try:
+        proc = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True)
+        return proc.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize_suite(report):
+    """
+    Meratakan hasil suite menjadi {nama_metrik: nilai} agar dua artefak mudah dibandingkan.
+    Metrik berakhiran `_ms` / `_mb` lebih baik jika turun, `rps` lebih baik jika naik.
+    """
+    summary = {}
+    for name, value in report.get('micro', {}).items():
+        if name.endswith('_s'):
+            summary[f"micro.{name[:-2]}_ms"] = value * 1e3
+    for run in report.get('load', []):
+        prefix = f"load.{run['scenario']}.{'+'.join(run['modes'])}.{run['symbols']}sym.c{run['concurrency']}"
+        for name in ('p50_ms', 'p95_ms', 'p99_ms', 'rps', 'peak_rss_mb'):
+            summary[f"{prefix}.{name}"] = run[name]
+    return summary
+
+
+def compare_suite(summary, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Membandingkan ringkasan suite dengan ringkasan baseline (artefak commit lain).
+
+    Returns:
+        list: Dictionary {metric, baseline, current, change, regression} untuk metrik yang ada di keduanya
+    """
+    rows = []
+    for metric, current in summary.items():
+        if metric not in baseline or not baseline[metric]:
+            continue
+        change = current / baseline[metric] - 1
+        worse = -change if metric.endswith('rps') else change
+        rows.append({'metric': metric, 'baseline': baseline[metric], 'current': current,
+                     'change': change, 'regression': worse > threshold})
+    return rows
+
+
+def check_singleflight(clients=16, mode='hourly', symbol='USDIDR=X', delay=0.05):
+    """
+    Uji penggabungan request pada key dingin: `clients` thread memanggil `fetch_data` dan `load_artifacts`
+    bersamaan (dimulai serentak lewat barrier). Pengunduh dan loader model/scaler dibungkus penghitung
+    dan diberi jeda `delay` detik agar semua pemanggil benar-benar tumpang tindih.
+    Harus terjadi tepat satu unduhan, satu muat model, dan satu muat scaler.
+
+    Returns:
+        dict: Jumlah unduhan & muat, jumlah pemanggil, dan status `ok`
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    import services.predictor as predictor
+    from services.data_service import fetch_data
+
+    conf = CONFIGS[mode]
+    counts = collections.Counter()
+    counts_lock = threading.Lock()
+
+    def counted(name, func):
+        def wrapper(*args, **kwargs):
+            with counts_lock:
+                counts[name] += 1
+            time.sleep(delay)
+            return func(*args, **kwargs)
+        return wrapper
+
+    download = counted('download', fake_downloader())
+    original_loaders = predictor._load_model, predictor._load_scaler
+    with LoadTestEnv([mode], [symbol]):
+        predictor._load_model = counted('model_load', predictor._load_model)
+        predictor._load_scaler = counted('scaler_load', predictor._load_scaler)
+        try:
+            barrier = threading.Barrier(clients)
+
+            def fetch(_):
+                barrier.wait()
+                return len(fetch_data(symbol, **predictor.recent_range(conf, mode), downloader=download))
+
+            def load(_):
+                barrier.wait()
+                return predictor.load_artifacts(conf, symbol, mode)
+
+            with ThreadPoolExecutor(max_workers=clients) as executor:
+                rows = set(executor.map(fetch, range(clients)))
+                artifacts = list(executor.map(load, range(clients)))
+        finally:
+            predictor._load_model, predictor._load_scaler = original_loaders
+
+    result = {'clients': clients, 'download_count': counts['download'], 'model_load_count': counts['model_load'],
+              'scaler_load_count': counts['scaler_load'], 'rows': sorted(rows),
+              'same_model': all(model is artifacts[0][0] for model, _ in artifacts)}
+    result['ok'] = (result['download_count'] == 1 and result['model_load_count'] == 1
+                    and result['scaler_load_count'] == 1 and len(rows) == 1 and result['same_model'])
+    return result
+
+
+def check_cache_writes(writers=16, rows=100):
+    """
+    Uji penulisan cache bersamaan untuk satu (ticker, interval): setengah thread menggabungkan bar baru
+    di akhir (`apply_refresh` delta), setengah lagi bar lama di depan (`apply_cache_gap`), seperti refresh
+    dan pengisian gap dari jalur sinkron, async, dan scheduler. Tidak boleh ada bar yang hilang.
+
+    Returns:
+        dict: Jumlah baris yang diharapkan dan yang tersimpan, serta status `ok`
+    """
+    import pandas as pd
+    from concurrent.futures import ThreadPoolExecutor
+    import services.data_service as data_service
+
+    saved_store = data_service.CACHE_STORE
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_service.CACHE_STORE = BinaryCacheStore(tmp_dir)
+        try:
+            index = pd.date_range('2024-01-01', periods=rows, freq='D', name='Date')
+            data_service.CACHE_STORE.write('TEST', '1d', pd.DataFrame({'Close': np.ones(rows)}, index=index))
+            barrier = threading.Barrier(writers)
+
+            def write(i):
+                barrier.wait()
+                if i % 2:
+                    bar = pd.DatetimeIndex([index[-1] + pd.Timedelta(days=i)], name='Date')
+                    data_service.apply_refresh('TEST', index[0], '1d', 'delta', pd.DataFrame({'Close': [2.0]}, index=bar))
+                else:
+                    bar = pd.DatetimeIndex([index[0] - pd.Timedelta(days=i + 1)], name='Date')
+                    data_service.apply_cache_gap('TEST', bar[0], '1d', pd.DataFrame({'Close': [3.0]}, index=bar))
+
+            with ThreadPoolExecutor(max_workers=writers) as executor:
+                list(executor.map(write, range(writers)))
+            stored = len(data_service.CACHE_STORE.read('TEST', '1d'))
+        finally:
+            data_service.CACHE_STORE = saved_store
+    return {'expected_rows': rows + writers, 'stored_rows': stored, 'ok': stored == rows + writers}
+
+
+def check_incremental_refresh(ticker='TEST', interval='1d'):
+    """
+    Uji refresh cache inkremental dengan pengunduh palsu yang mencatat setiap permintaan:
+    - cache yang sudah ada hanya meminta rentang delta (mulai dari bar terakhir di cache);
+    - bar yang terunduh ulang (duplikat) memakai nilai terbaru, tanpa index ganda;
+    - delta kosong (belum ada bar baru) bukan error dan cache tetap ditandai segar.
+
+    Returns:
+        dict: Rentang yang diminta, status tiap skenario, dan status `ok`
+    """
+    import pandas as pd
+    import services.data_service as data_service
+
+    calls = []
+    base = fake_downloader()
+
+    def recording(offset=0.0, empty=False):
+        def download(ticker, start=None, end=None, interval='1d', progress=False):
+            calls.append((start, end))
+            df = base(ticker, start=start, end=end, interval=interval)
+            return df.iloc[:0] if empty else df + offset
+        return download
+
+    saved_store = data_service.CACHE_STORE
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_service.CACHE_STORE = BinaryCacheStore(tmp_dir)
+        try:
+            data_service.refresh_cache(ticker, '2024-01-01', '2024-03-01', interval, downloader=recording())
+            before = data_service.CACHE_STORE.read(ticker, interval)
+            last_cached = before.index[-1]
+
+            calls.clear()
+            data_service.refresh_cache(ticker, '2024-01-01', '2024-03-15', interval, incremental=True,
+                                       downloader=recording(offset=100.0))
+            delta_calls = list(calls)
+            after = data_service.CACHE_STORE.read(ticker, interval)
+            delta_only = delta_calls == [(last_cached.strftime('%Y-%m-%d'), '2024-03-15')]
+            newer_wins = (after.index.is_unique
+                          and after.loc[last_cached, 'Close'] == before.loc[last_cached, 'Close'] + 100.0
+                          and after.loc[:last_cached].index[:-1].equals(before.index[:-1])
+                          and np.array_equal(after.loc[:last_cached, 'Close'].values[:-1], before['Close'].values[:-1])
+                          and after.index[-1] > last_cached)
+
+            stale_at = time.time() - 3600
+            os.utime(data_service.CACHE_STORE.path(ticker, interval), (stale_at, stale_at))
+            try:
+                data_service.refresh_cache(ticker, '2024-01-01', '2024-03-30', interval, incremental=True,
+                                           downloader=recording(empty=True))
+                empty_ok = (len(data_service.CACHE_STORE.read(ticker, interval)) == len(after)
+                            and data_service.CACHE_STORE.age(ticker, interval).total_seconds() < 60)
+            except Exception:
+                empty_ok = False
+        finally:
+            data_service.CACHE_STORE = saved_store
+
+    return {'delta_calls': delta_calls, 'delta_only': delta_only, 'newer_wins': newer_wins, 'empty_ok': empty_ok,
+            'ok': delta_only and newer_wins and empty_ok}
+
+
+def check_range_reads(ticker='TEST'):
+    """
+    Uji pembacaan rentang cache biner dan pengisian awal cache:
+    - `read_range` (dan `slice_range` untuk cache CSV) sama persis dengan potongan pandas dari frame penuh
+      (index naif harian & UTC per jam), dengan `end` inklusif: tanggal saja mencakup seluruh hari,
+      datetime mencakup bar pada waktu tersebut; termasuk rentang kosong;
+    - request yang dimulai sebelum awal rentang cache hanya mengunduh bagian awal yang hilang,
+      dan request berikutnya tidak mengunduh apa pun.
+
+    Returns:
+        dict: Jumlah kasus rentang yang cocok, rentang yang diunduh, dan status `ok`
+    """
+    import pandas as pd
+    import services.data_service as data_service
+    from services.cache_store import slice_range
+
+    cases = [(None, None), ('2024-02-10', None), (None, '2024-02-20'), ('2024-02-10', '2024-02-20'),
+             ('2024-02-10 05:00', '2024-02-20 13:00'), ('2030-01-01', None), ('2024-02-20', '2024-02-10')]
+    download = fake_downloader()
+
+    def expected_slice(full, start, end):
+        index = full.index
+        mask = np.ones(len(full), dtype=bool)
+        if start is not None:
+            mask &= index >= pd.Timestamp(start, tz=index.tz)
+        if end is not None:
+            end_ts = pd.Timestamp(end, tz=index.tz)
+            mask &= (index < end_ts + pd.Timedelta(days=1)) if len(end) == 10 else (index <= end_ts)
+        return full[mask]
+
+    calls = []
+
+    def recording(ticker, start=None, end=None, interval='1d', progress=False):
+        calls.append((start, end))
+        return download(ticker, start=start, end=end, interval=interval)
+
+    saved_store = data_service.CACHE_STORE
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = BinaryCacheStore(tmp_dir)
+        matched = 0
+        for interval in ('1d', '1h'):
+            full = download(ticker, start='2024-01-01', end='2024-04-01', interval=interval)
+            store.write(ticker, interval, full)
+            for start, end in cases:
+                expected = expected_slice(full, start, end)
+                # Cache biner (mmap) dan slice_range (dipakai cache CSV) harus sama dengan potongan pandas
+                for actual in (store.read_range(ticker, interval, start, end), slice_range(full, start, end)):
+                    if actual.index.equals(expected.index) and np.array_equal(actual['Close'].values, expected['Close'].values):
+                        matched += 1
+
+        data_service.CACHE_STORE = store
+        try:
+            head = download(ticker, start='2024-02-01', end='2024-03-01', interval='1d')
+            store.write(ticker, '1d', head, coverage_start='2024-02-01')
+            df = data_service.fetch_data(ticker, '2024-01-01', '2024-02-29', '1d', downloader=recording)
+            gap_calls = list(calls)
+            data_service.fetch_data(ticker, '2024-01-01', '2024-02-29', '1d', downloader=recording)
+            repeat_calls = calls[len(gap_calls):]
+            full = download(ticker, start='2024-01-01', end='2024-03-01', interval='1d')
+            complete = df.index.equals(full.index) and np.array_equal(df['Close'].values, full['Close'].values)
+        finally:
+            data_service.CACHE_STORE = saved_store
+
+    total = 4 * len(cases)
+    head_only = gap_calls == [('2024-01-01', '2024-02-01')] and not repeat_calls
+    return {'matched': matched, 'cases': total, 'gap_calls': gap_calls, 'head_only': head_only, 'complete': complete,
+            'ok': matched == total and head_only and complete}
+
+
+def check_model_registry():
+    """
+    Uji cache model/scaler ber-batas (`ModelRegistry`) dengan file artefak palsu dan loader penghitung:
+    - batas jumlah entri mengeluarkan entri yang paling lama tidak dipakai (LRU), bukan yang paling lama dimuat;
+    - batas byte menjaga total di bawah `max_bytes`, dengan entri terbaru tetap disimpan walau melebihi batas;
+    - artefak dimuat ulang jika ukuran atau mtime file berubah, dan hit berikutnya tidak memuat ulang.
+
+    Returns:
+        dict: Status tiap skenario dan status `ok`
+    """
+    from services.model_registry import ModelRegistry
+
+    loads = collections.Counter()
+
+    def loader(path):
+        loads[os.path.basename(path)] += 1
+        with open(path, 'rb') as f:
+            return f.read()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        def artifact(name, size):
+            path = os.path.join(tmp_dir, name)
+            with open(path, 'wb') as f:
+                f.write(b'x' * size)
+            return path
+
+        paths = {name: artifact(name, 100) for name in 'abcd'}
+
+        registry = ModelRegistry(max_entries=2)
+        for name in 'aba':
+            registry.get(name, paths[name], loader)
+        registry.get('c', paths['c'], loader)
+        lru_by_count = list(registry._entries) == ['a', 'c'] and registry.evictions == 1 and loads['a'] == 1
+
+        registry = ModelRegistry(max_bytes=250)
+        for name in 'abc':
+            registry.get(name, paths[name], loader)
+        within_bytes = list(registry._entries) == ['b', 'c'] and registry.total_bytes <= 250
+        registry.get('big', artifact('big', 400), loader)
+        keeps_newest = list(registry._entries) == ['big']
+
+        loads.clear()
+        registry = ModelRegistry()
+        registry.get('a', paths['a'], loader)
+        artifact('a', 120)
+        size_reload = len(registry.get('a', paths['a'], loader)) == 120
+        stat = os.stat(paths['a'])
+        os.utime(paths['a'], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        registry.get('a', paths['a'], loader)
+        registry.get('a', paths['a'], loader)
+        reloads = size_reload and loads['a'] == 3 and registry.invalidations == 2 and registry.hits == 1
+
+    return {'lru_by_count': lru_by_count, 'within_bytes': within_bytes, 'keeps_newest': keeps_newest,
+            'reloads_on_change': reloads,
+            'ok': lru_by_count and within_bytes and keeps_newest and reloads}
+
+
+def check_http_cache(mode='hourly', symbol='USDIDR=X'):
+    """
+    Uji cache forecast dan header HTTP `/predict/{mode}` (in-process, pengunduh palsu, model fixture):
+    - request pertama miss, request kedua hit dengan body & ETag yang sama;
+    - If-None-Match dengan ETag tersebut mendapat 304 tanpa body;
+    - jika entri cache diganti bersamaan (cth: scheduler) setelah forecast dihitung, ETag respons tetap
+      milik forecast di body, bukan milik entri pengganti.
+
+    Returns:
+        dict: Status tiap skenario dan status `ok`
+    """
+    import httpx
+
+    path = f"/predict/{mode}?symbol={symbol}"
+
+    async def run(env):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=env.app), base_url='http://check') as client:
+            cache = env.forecast_cache
+            first = await client.get(path)
+            misses, hits = cache.misses, cache.hits
+            second = await client.get(path)
+            hit = (first.status_code == second.status_code == 200 and cache.hits == hits + 1
+                   and cache.misses == misses and first.json() == second.json()
+                   and first.headers.get('etag') == second.headers.get('etag') is not None)
+            not_modified = await client.get(path, headers={'If-None-Match': first.headers['etag']})
+            revalidated = not_modified.status_code == 304 and not not_modified.content
+
+            # Entri pengganti dengan versi lain ditulis tepat setelah forecast request ini disimpan
+            cache.invalidate()
+            stored = []
+            original_put = cache.put
+
+            def racing_put(symbol, mode, version, results, bar_duration):
+                stored.append(original_put(symbol, mode, version, results, bar_duration))
+                original_put(symbol, mode, version[:-1] + (version[-1] - timedelta(hours=1),), results[:1], bar_duration)
+                return stored[-1]
+
+            cache.put = racing_put
+            try:
+                raced = await client.get(path)
+            finally:
+                del cache.put
+            consistent = (raced.status_code == 200 and raced.json()['data'] == stored[0].results
+                          and raced.headers.get('etag') == f'"{stored[0].etag}"')
+        return hit, revalidated, consistent
+
+    with LoadTestEnv([mode], [symbol]) as env:
+        hit, revalidated, consistent = asyncio.run(run(env))
+    return {'miss_then_hit': hit, 'not_modified': revalidated, 'etag_matches_body': consistent,
+            'ok': hit and revalidated and consistent}
+
+
+def check_legacy_migration(ticker='TEST', interval='1d'):
+    """
+    Uji migrasi cache CSV lama pada setiap jalur baca `BinaryCacheStore`, tanpa memanggil `exists()` lebih dulu:
+    `read`, `read_range`, `last_timestamp`, `coverage_start`, dan `touch` masing-masing dicoba pada
+    direktori cache baru yang hanya berisi file CSV. Hasil harus sama dengan isi CSV dan
+    waktu modifikasi file lama tetap dipertahankan (kecuali `touch`, yang memang menyegarkannya).
+
+    Returns:
+        dict: Jalur yang berhasil, apakah data & mtime sesuai, dan status `ok`
+    """
+    download = fake_downloader()
+    frame = download(ticker, start='2024-01-01', end='2024-03-01', interval=interval)
+    old_mtime = time.time() - 3600
+    paths = {
+        'read': lambda store: store.read(ticker, interval).equals(frame),
+        'read_range': lambda store: store.read_range(ticker, interval, '2024-02-01', '2024-02-10').equals(
+            frame.loc['2024-02-01':'2024-02-10']),
+        'last_timestamp': lambda store: store.last_timestamp(ticker, interval) == frame.index[-1],
+        'coverage_start': lambda store: store.coverage_start(ticker, interval) == frame.index[0],
+        'touch': lambda store: store.touch(ticker, interval) is None,
+    }
+
+    migrated = {}
+    mtime_kept = True
+    for name, probe in paths.items():
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            legacy = CsvCacheStore(tmp_dir)
+            legacy.write(ticker, interval, frame)
+            os.utime(legacy.path(ticker, interval), (old_mtime, old_mtime))
+            frame = legacy.read(ticker, interval)
+            store = BinaryCacheStore(tmp_dir)
+            try:
+                migrated[name] = bool(probe(store))
+            except FileNotFoundError:
+                migrated[name] = False
+                continue
+            mtime = os.path.getmtime(store.path(ticker, interval))
+            if name == 'touch':
+                mtime_kept &= mtime > old_mtime + 60
+            else:
+                mtime_kept &= abs(mtime - old_mtime) < 1
+
+    return {'migrated': migrated, 'mtime_kept': mtime_kept,
+            'ok': all(migrated.values()) and mtime_kept}
+
+
+def check_prefetch(symbols=('USDIDR=X', 'EURUSD=X', 'JPY=X', 'SGD=X'), modes=('daily', 'hourly'), latency=0.3):
+    """
+    Uji prefetch data sebelum pelatihan paralel: setiap (simbol, interval) diunduh tepat satu kali
+    dan unduhan berjalan paralel (waktu total jauh di bawah jumlah latensi unduhan serial).
+
+    Returns:
+        dict: Waktu prefetch, waktu serial yang setara, jumlah unduhan, dan status `ok`
+    """
+    from services.orchestrator import prefetch_data
+
+    with LoadTestEnv([], []) as env:
+        download = fake_downloader(latency)
+        calls = collections.Counter()
+        lock = threading.Lock()
+
+        def recording(ticker, start=None, end=None, interval='1d', progress=False):
+            with lock:
+                calls[(ticker, interval)] += 1
+            return download(ticker, start=start, end=end, interval=interval)
+
+        env.data_service.default_downloader = lambda: recording
+        start = time.perf_counter()
+        prefetch_data(list(symbols), list(modes))
+        elapsed = time.perf_counter() - start
+        cached = all(env.data_service.CACHE_STORE.exists(symbol, CONFIGS[mode].INTERVAL)
+                     for symbol in symbols for mode in modes)
+
+    pairs = len(symbols) * len(modes)
+    serial = pairs * latency
+    once = len(calls) == pairs and all(count == 1 for count in calls.values())
+    return {'elapsed': elapsed, 'serial': serial, 'downloads': sum(calls.values()), 'pairs': pairs,
+            'once': once, 'cached': cached, 'ok': once and cached and elapsed < serial / 2}
+
+
+def check_profiling_auth(token='rahasia'):
+    """
+    Uji akses endpoint `/debug` profiler (in-process lewat ASGI):
+    - profiler nonaktif: 404;
+    - PROFILING_ENABLED tanpa token: 404 (dengan atau tanpa header) dan peringatan dicatat saat startup;
+    - dengan token: tanpa header atau header salah 403, header benar 200.
+
+    Returns:
+        dict: Kode status per skenario dan status `ok`
+    """
+    import logging
+    import httpx
+    import app.routers.profiling as profiling_router
+    from services.metrics import remove_stage_observer
+    from services.profiling import RequestProfiler, PROFILE_HEADER
+    from core.config import BaseConfig
+
+    class Conf(BaseConfig):
+        PROFILING_ENABLED = True
+        PROFILING_TOKEN = None
+
+    class Capture(logging.Handler):
+        def __init__(self):
+            super().__init__(logging.WARNING)
+            self.records = []
+
+        def emit(self, record):
+            self.records.append(record)
+
+    capture = Capture()
+    profiling_logger = logging.getLogger('services.profiling')
+    profiling_logger.addHandler(capture)
+    try:
+        open_profiler = RequestProfiler.from_config(Conf)
+    finally:
+        profiling_logger.removeHandler(capture)
+    warned = len(capture.records) == 1
+
+    scenarios = {
+        'nonaktif': (RequestProfiler(), [({}, 404)]),
+        'tanpa token': (open_profiler, [({}, 404), ({PROFILE_HEADER: token}, 404)]),
+        'dengan token': (RequestProfiler(enabled=True, token=token),
+                         [({}, 403), ({PROFILE_HEADER: 'salah'}, 403), ({PROFILE_HEADER: token}, 200)]),
+    }
+
+    async def run(env):
+        statuses = {}
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=env.app), base_url='http://check') as client:
+            for name, (profiler, requests) in scenarios.items():
+                profiling_router.PROFILER = profiler
+                statuses[name] = [((await client.get('/debug/profiles', headers=headers)).status_code, expected)
+                                  for headers, expected in requests]
+        return statuses
+
+    saved = profiling_router.PROFILER
+    try:
+        with LoadTestEnv([], []) as env:
+            statuses = asyncio.run(run(env))
+    finally:
+        profiling_router.PROFILER = saved
+        for profiler, _ in scenarios.values():
+            if profiler.active:
+                remove_stage_observer(profiler._observe_stage)
+
+    ok = warned and all(status == expected for results in statuses.values() for status, expected in results)
+    return {'statuses': {name: [status for status, _ in results] for name, results in statuses.items()},
+            'warned': warned, 'ok': ok}
+
+
+def check_async_cancel(deadline=0.3, hang=1.0):
+    """
+    Uji pembatalan & deadline jalur unduh async:
+    - membatalkan salah satu dari dua pemanggil `AsyncSingleFlight` tidak menghentikan unduhan;
+    - membatalkan pemanggil terakhir membatalkan task unduhan (retry berhenti) dan melepas key;
+    - `download_with_retry_async` dengan pengunduh yang macet `hang` detik menyerah setelah `deadline`
+      detik walaupun batas waktu per percobaan lebih besar.
+
+    Returns:
+        dict: Status tiap skenario, waktu hingga menyerah, dan status `ok`
+    """
+    from services.data_service import download_with_retry_async
+    from services.singleflight import AsyncSingleFlight
+
+    def failing(ticker, **kwargs):
+        raise ConnectionError('upstream down')
+
+    def hanging(ticker, **kwargs):
+        time.sleep(hang)
+        return fake_downloader()(ticker, **kwargs)
+
+    async def run():
+        flights = AsyncSingleFlight()
+        key = ('TEST', '1h')
+
+        def start():
+            return asyncio.ensure_future(flights.do(key, download_with_retry_async, 'TEST', None, None, '1h',
+                                                    max_retries=10, downloader=failing))
+
+        first, second = start(), start()
+        await asyncio.sleep(0.05)
+        task = flights._calls[key].task
+        first.cancel()
+        await asyncio.sleep(0.05)
+        survives = not task.done() and flights.in_flight(key)
+        second.cancel()
+        await asyncio.sleep(0.05)
+        stopped = task.cancelled() and not flights.in_flight(key)
+
+        began = time.perf_counter()
+        try:
+            await download_with_retry_async('TEST', None, None, '1h', downloader=hanging, timeout=30, deadline=deadline)
+            gave_up = None
+        except asyncio.TimeoutError:
+            gave_up = time.perf_counter() - began
+        return survives, stopped, gave_up
+
+    survives, stopped, gave_up = asyncio.run(run())
+    return {'one_cancelled_survives': survives, 'last_cancelled_stops': stopped, 'deadline': deadline,
+            'gave_up_after_s': gave_up,
+            'ok': survives and stopped and gave_up is not None and gave_up < deadline + 0.2}
+
+
+def check_stale_serving(mode='hourly', symbol='USDIDR=X', latency=1.0):
+    """
+    Uji stale-while-revalidate di jalur sinkron (batch & profil): dengan cache kadaluarsa dan unduhan
+    yang butuh `latency` detik, `predict_many` harus langsung dilayani dari cache lama sementara
+    cache diperbarui di thread latar belakang. Sebagai pembanding, `fetch_data` tanpa opsi ini
+    menunggu unduhan.
+
+    Returns:
+        dict: Waktu respons dengan & tanpa stale-while-revalidate, apakah cache segar kembali, status `ok`
+    """
+    import services.data_service as data_service
+    from services.predictor import predict_many, recent_range
+
+    conf = CONFIGS[mode]
+    with LoadTestEnv([mode], [symbol], download_latency=latency) as env:
+        data_service.fetch_data(symbol, **recent_range(conf, mode))
+        path = data_service.CACHE_STORE.path(symbol, conf.INTERVAL)
+
+        def make_stale():
+            stale_at = time.time() - data_service.cache_ttl(conf.INTERVAL).total_seconds() - 60
+            os.utime(path, (stale_at, stale_at))
+
+        make_stale()
+        began = time.perf_counter()
+        results, errors = predict_many(mode, [symbol])
+        stale_s = time.perf_counter() - began
+        deadline = time.perf_counter() + latency * 5
+        while not data_service.cache_status(symbol, conf.INTERVAL)[1] and time.perf_counter() < deadline:
+            time.sleep(0.05)
+        revalidated = data_service.cache_status(symbol, conf.INTERVAL)[1]
+
+        make_stale()
+        env.forecast_cache.invalidate()
+        began = time.perf_counter()
+        data_service.fetch_data(symbol, **recent_range(conf, mode))
+        blocking_s = time.perf_counter() - began
+
+    return {'latency': latency, 'stale_s': stale_s, 'blocking_s': blocking_s, 'revalidated': revalidated,
+            'ok': symbol in results and not errors and stale_s < latency / 2 and revalidated}
+
+
+def check_scheduler_preload(mode='hourly', symbol='USDIDR=X'):
+    """
+    Uji pre-load scheduler yang gagal saat start (model belum ada) lalu berhasil di tick berikutnya
+    setelah model tersedia, sehingga forecast kembali dihitung ulang oleh scheduler.
+
+    Returns:
+        dict: Status model_loaded setelah start & setelah tick, hasil tick, status `ok`
+    """
+    from services.scheduler import RefreshScheduler
+
+    conf = CONFIGS[mode]
+    with LoadTestEnv([mode], [symbol]):
+        os.remove(conf.get_paths(symbol)['weights'])
+        scheduler = RefreshScheduler([symbol], [mode])
+        job = scheduler.jobs[0]
+        loaded_at_start = asyncio.run(scheduler._preload(job))
+        write_fixture_artifacts(conf, symbol)
+        tick_ok = asyncio.run(scheduler._run(job, force_refresh=True))
+
+    return {'loaded_at_start': loaded_at_start, 'loaded_after_tick': job.model_loaded, 'tick_ok': tick_ok,
+            'last_error': job.last_error,
+            'ok': not loaded_at_start and job.model_loaded and tick_ok and job.last_error is None}
+
+
+def check_checkpoint(epochs=3):
+    """
+    Uji konsistensi checkpoint saat crash: model kecil dilatih `epochs` epoch dengan `TrainingCheckpoint`,
+    dan penulisan state pada epoch terakhir digagalkan (meniru crash setelah model & bobot terbaik
+    epoch itu tertulis). `load_checkpoint` harus mengembalikan checkpoint utuh epoch sebelumnya: model
+    dengan bobot persis epoch tersebut beserta bobot terbaiknya.
+
+    Returns:
+        dict: Epoch checkpoint yang termuat, konsistensi bobot, file tersisa, status `ok`
+    """
+    import glob
+    from tensorflow.keras.callbacks import Callback
+    import services.checkpoint as checkpoint
+    from services.model_service import build_model
+
+    rng = np.random.default_rng(0)
+    X = rng.random((64, 10, 1), dtype=np.float32)
+    y = rng.random((64, 2), dtype=np.float32)
+    snapshots = {}
+
+    class Snapshot(Callback):
+        def on_epoch_end(self, epoch, logs=None):
+            snapshots[epoch + 1] = self.model.get_weights()
+
+    original_tmp_path = checkpoint._tmp_path
+
+    def crashing_tmp_path(path):
+        if path.endswith('.json') and epochs in snapshots:
+            raise OSError('crash sebelum state tersimpan')
+        return original_tmp_path(path)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_path = os.path.join(tmp_dir, 'TEST_daily_model.h5')
+        model = build_model((10, 1), 2, units=8, dropout_rate=0.0)
+        early_stopping = checkpoint.ResumableEarlyStopping(monitor='val_loss', patience=epochs,
+                                                           restore_best_weights=True)
+        callbacks = [early_stopping, Snapshot(), checkpoint.TrainingCheckpoint(model_path, early_stopping=early_stopping)]
+        checkpoint._tmp_path = crashing_tmp_path
+        try:
+            model.fit(X, y, validation_split=0.25, epochs=epochs, callbacks=callbacks, verbose=0)
+            crashed = False
+        except OSError:
+            crashed = True
+        finally:
+            checkpoint._tmp_path = original_tmp_path
+
+        loaded, state = checkpoint.load_checkpoint(model_path)
+        loaded_epoch = state['epoch'] if state else None
+        consistent = loaded is not None and all(
+            np.array_equal(a, b) for a, b in zip(loaded.get_weights(), snapshots[epochs - 1]))
+        has_best = bool(state) and state['best_weights'] is not None
+        files = sorted(os.path.basename(path) for path in glob.glob(os.path.join(tmp_dir, '*_checkpoint*')))
+        checkpoint.clear_checkpoint(model_path)
+        cleared = not glob.glob(os.path.join(tmp_dir, '*_checkpoint*'))
+
+    return {'crashed': crashed, 'loaded_epoch': loaded_epoch, 'consistent': consistent, 'has_best': has_best,
+            'files': files, 'cleared': cleared,
+            'ok': crashed and loaded_epoch == epochs - 1 and consistent and has_best and cleared}
+
+
+def bench_suite(modes=('hourly',), symbol_counts=(1, 8), concurrency=(1, 16), requests=500,
+                scenarios=LOADTEST_SCENARIOS, cold_rounds=20, download_latency=0.0, micro=True):
+    """
+    Suite benchmark API yang dapat dibandingkan antar commit: micro-benchmark komponen dan load test
+    `/predict/{mode}` in-process (pengunduh palsu, model fixture) untuk setiap kombinasi skenario
+    (cold / warm / uncached), jumlah simbol, dan concurrency.
+
+    Returns:
+        dict: Artefak suite (meta, micro, load, summary) siap ditulis sebagai JSON
+    """
+    symbols = LOADTEST_SYMBOLS[:max(symbol_counts)]
+    report = {
+        'meta': {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'commit': _git_commit(),
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'cpu_count': os.cpu_count(),
+            'inference_backend': CONFIGS[modes[0]].INFERENCE_BACKEND,
+            'params': {'modes': list(modes), 'symbol_counts': list(symbol_counts), 'concurrency': list(concurrency),
+                       'requests': requests, 'scenarios': list(scenarios), 'cold_rounds': cold_rounds,
+                       'download_latency': download_latency},
+        },
+        'load': [],
+    }
+    with LoadTestEnv(modes, symbols, download_latency) as env:
+        if micro:
+            report['micro'] = bench_micro(env, modes[0])
+        for scenario in scenarios:
+            for count in symbol_counts:
+                for clients in concurrency:
+                    report['load'].append(run_load_scenario(env, scenario, symbols[:count], clients,
+                                                            requests, cold_rounds))
+    report['summary'] = summarize_suite(report)
+    return report
+
+
+if __name__ == '__main__':
+    # Konfigurasi argumen baris perintah (CLI)
+    parser = argparse.ArgumentParser(description='Micro-benchmark dan load test komponen ML Finsight')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    # Benchmark pembuatan sliding window
+    seq_parser = subparsers.add_parser('sequences', help='Loop vs strided view pada create_sequences')
+    seq_parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000], help='Jumlah baris data')
+    seq_parser.add_argument('--repeat', type=int, default=3, help='Jumlah pengulangan (diambil waktu tercepat)')
+
+    # Benchmark latensi baca cache harga
+    cache_parser = subparsers.add_parser('cache', help='Baca cache CSV vs biner kolumnar')
+    cache_parser.add_argument('--symbol', type=str, default='USDIDR=X', help='Simbol mata uang (cth: EURUSD=X)')
+    cache_parser.add_argument('--repeat', type=int, default=20, help='Jumlah pengulangan (diambil waktu tercepat)')
+
+    # Benchmark pipeline input pelatihan
+    pipe_parser = subparsers.add_parser('pipeline', help='Pipeline input numpy vs tf.data (waktu epoch & RSS)')
+    pipe_parser.add_argument('--modes', type=str, nargs='+', default=['daily', 'hourly'], choices=list(CONFIGS.keys()), help='Mode yang diukur')
+    pipe_parser.add_argument('--epochs', type=int, default=3, help='Jumlah epoch per pengukuran')
+    pipe_parser.add_argument('--scale', type=float, default=1.0, help='Pengali panjang data (cth: 10 untuk data 10x lebih panjang)')
+
+    # Benchmark cold start backend inferensi
+    cold_parser = subparsers.add_parser('coldstart', help='Cold start API: backend keras vs numpy (waktu & RSS)')
+    cold_parser.add_argument('--symbol', type=str, default='USDIDR=X', help='Simbol dengan model terlatih (cth: EURUSD=X)')
+    cold_parser.add_argument('--mode', type=str, default='daily', choices=list(CONFIGS.keys()), help='Mode model')
+    cold_parser.add_argument('--repeat', type=int, default=3, help='Jumlah proses per backend (diambil median)')
+
+    # Benchmark mesin inferensi NumPy
+    engine_parser = subparsers.add_parser('engine', help='Forward pass: Keras vs loop NumPy vs mesin NumPy (latensi & throughput)')
+    engine_parser.add_argument('--mode', type=str, default='hourly', choices=list(CONFIGS.keys()), help='Konfigurasi model')
+    engine_parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 64, 512, 4096], help='Ukuran batch')
+    engine_parser.add_argument('--repeat', type=int, default=5, help='Jumlah pengulangan (diambil waktu tercepat)')
+
+    # Pemeriksaan regresi waktu import
+    import_parser = subparsers.add_parser('imports', help='Waktu import modul API & dependensi berat yang ikut termuat')
+    import_parser.add_argument('--modules', type=str, nargs='+', default=['services.predictor', 'app.main'], help='Modul yang diukur')
+    import_parser.add_argument('--budget', type=float, default=IMPORT_BUDGET_S, help='Batas waktu import per modul (detik)')
+    import_parser.add_argument('--repeat', type=int, default=3, help='Jumlah proses per modul (diambil median)')
+
+    # Pemeriksaan memori rendering plot
+    plots_parser = subparsers.add_parser('plots', help='Render banyak grafik forecast dan periksa memori tetap datar')
+    plots_parser.add_argument('--count', type=int, default=300, help='Jumlah grafik yang dirender')
+    plots_parser.add_argument('--max-growth', type=float, default=10.0, help='Batas pertumbuhan RSS setelah warm-up (MB)')
+    plots_parser.add_argument('--no-legacy', action='store_true', help='Lewati pengukuran pola pyplot lama')
+
+    # Benchmark overhead scaler per request
+    scaler_parser = subparsers.add_parser('scaler', help='Overhead scaler per request: sklearn .pkl vs sidecar .json NumPy')
+    scaler_parser.add_argument('--mode', type=str, default='hourly', choices=list(CONFIGS.keys()), help='Konfigurasi window')
+    scaler_parser.add_argument('--batch', type=int, default=512, help='Jumlah window pada pengukuran batch')
+
+    # Benchmark overhead instrumentasi metrik
+    metrics_parser = subparsers.add_parser('metrics', help='Overhead counter/histogram per operasi & ketepatan counter multi-thread')
+    metrics_parser.add_argument('--number', type=int, default=200_000, help='Jumlah operasi per pengukuran')
+    metrics_parser.add_argument('--threads', type=int, default=8, help='Jumlah thread pada uji konkurensi')
+
+    # Benchmark biaya logging di thread pemanggil
+    logging_parser = subparsers.add_parser('logging', help='Biaya per pesan: print ke pipe vs logger antrean, sampling, debug nonaktif')
+    logging_parser.add_argument('--number', type=int, default=20_000, help='Jumlah pesan per pengukuran')
+
+    # Benchmark overhead profiler opt-in
+    profiling_parser = subparsers.add_parser('profiling', help='Overhead profiler opt-in: timer tahap nonaktif vs aktif & forward pass diprofil')
+    profiling_parser.add_argument('--number', type=int, default=200_000, help='Jumlah operasi timer per pengukuran')
+    profiling_parser.add_argument('--batch', type=int, default=64, help='Ukuran batch forward pass yang diprofil')
+
+    # Suite benchmark API (micro + load test in-process), artefak JSON untuk dibandingkan antar commit
+    suite_parser = subparsers.add_parser('suite', help='Load test /predict in-process (p50/p95/p99, RPS, RSS) + micro-benchmark, artefak JSON')
+    suite_parser.add_argument('--modes', type=str, nargs='+', default=['hourly'], choices=list(CONFIGS.keys()), help='Mode yang diminta')
+    suite_parser.add_argument('--symbols', type=int, nargs='+', default=[1, 8], help=f'Jumlah simbol per skenario (maks {len(LOADTEST_SYMBOLS)})')
+    suite_parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 16], help='Jumlah klien bersamaan')
+    suite_parser.add_argument('--requests', type=int, default=500, help='Jumlah request per skenario warm/uncached')
+    suite_parser.add_argument('--scenarios', type=str, nargs='+', default=list(LOADTEST_SCENARIOS), choices=list(LOADTEST_SCENARIOS))
+    suite_parser.add_argument('--cold-rounds', type=int, default=20, help='Jumlah putaran skenario cold (cache dikosongkan setiap putaran)')
+    suite_parser.add_argument('--download-latency', type=float, default=0.0, help='Latensi tiruan pengunduh palsu (detik)')
+    suite_parser.add_argument('--no-micro', action='store_true', help='Lewati micro-benchmark')
+    suite_parser.add_argument('--output', type=str, default='benchmark_report.json', help='Lokasi artefak JSON')
+    suite_parser.add_argument('--baseline', type=str, default=None, help='Artefak JSON commit lain untuk dibandingkan')
+    suite_parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD, help='Ambang regresi relatif (0.1 = 10%%)')
+
+    # Uji penggabungan request bersamaan (single-flight) pada key dingin
+    sf_parser = subparsers.add_parser('singleflight', help='N request bersamaan pada key dingin: tepat satu unduhan & satu muat model, tanpa bar cache hilang, pembatalan & deadline async')
+    sf_parser.add_argument('--clients', type=int, default=16, help='Jumlah pemanggil bersamaan')
+    sf_parser.add_argument('--mode', type=str, default='hourly', choices=list(CONFIGS.keys()), help='Mode yang diuji')
+
+    # Stale-while-revalidate jalur sinkron & pre-load scheduler yang diulang
+    stale_parser = subparsers.add_parser('stale', help='Cache kadaluarsa dilayani tanpa menunggu unduhan (jalur sinkron) & pre-load scheduler diulang per tick')
+    stale_parser.add_argument('--latency', type=float, default=1.0, help='Waktu respons pengunduh palsu (detik)')
+    stale_parser.add_argument('--mode', type=str, default='hourly', choices=list(CONFIGS.keys()), help='Mode yang diuji')
+
+    # Refresh cache inkremental dengan pengunduh palsu
+    subparsers.add_parser('incremental', help='Refresh inkremental: hanya rentang delta diunduh, duplikat memakai nilai terbaru, delta kosong bukan error')
+
+    # Pembacaan rentang cache & pengisian awal cache
+    subparsers.add_parser('ranges', help='read_range = potongan pandas (termasuk end tanggal saja); request sebelum awal cache hanya mengunduh bagian yang hilang')
+
+    # Cache model/scaler ber-batas (LRU)
+    subparsers.add_parser('registry', help='Cache model/scaler: eviction LRU per jumlah entri & byte, muat ulang saat file berubah')
+
+    # Cache forecast & header HTTP (ETag/304)
+    hc_parser = subparsers.add_parser('httpcache', help='Cache forecast: miss lalu hit, If-None-Match -> 304, ETag milik body walau entri cache diganti bersamaan')
+    hc_parser.add_argument('--mode', type=str, default='hourly', choices=list(CONFIGS.keys()), help='Mode yang diuji')
+
+    # Migrasi cache CSV lama pada setiap jalur baca
+    subparsers.add_parser('migrate', help='Cache CSV lama dimigrasikan pada read/read_range/last_timestamp/coverage_start/touch tanpa exists(); mtime dipertahankan')
+
+    # Prefetch data paralel sebelum pelatihan
+    pf_parser = subparsers.add_parser('prefetch', help='Prefetch data sebelum pelatihan: paralel, satu unduhan per (simbol, interval)')
+    pf_parser.add_argument('--latency', type=float, default=0.3, help='Latensi pengunduh palsu (detik)')
+
+    # Akses endpoint /debug profiler
+    subparsers.add_parser('profauth', help='Endpoint /debug: 404 tanpa token (dengan peringatan startup), 403 token salah, 200 token benar')
+
+    # Konsistensi checkpoint pelatihan saat crash
+    ckpt_parser = subparsers.add_parser('checkpoint', help='Crash sebelum state tersimpan: --resume tetap memuat model & bobot terbaik dari epoch yang sama')
+    ckpt_parser.add_argument('--epochs', type=int, default=3, help='Jumlah epoch (crash pada epoch terakhir)')
+
+    # Pemeriksaan akurasi kebijakan dtype
+    dtype_parser = subparsers.add_parser('dtype', help='Akurasi pipeline float32/bobot float16 terhadap acuan float64')
+    dtype_parser.add_argument('--mode', type=str, default='daily', choices=list(CONFIGS.keys()), help='Konfigurasi model')
+    dtype_parser.add_argument('--rows', type=int, default=100_000, help='Jumlah baris deret harga sintetis')
+    dtype_parser.add_argument('--tolerance', type=float, default=DTYPE_TOLERANCE, help='Batas error relatif harga')
+
+    args = parser.parse_args()
+
+    if args.command == 'sequences':
+        print(f"{'Rows':>10} | {'Loop (ms)':>10} | {'View (ms)':>10} | {'Copy (ms)':>10} | {'Speedup':>8}")
+        for res in bench_sequences(args.sizes, repeat=args.repeat):
+            print(f"{res['rows']:>10} | {res['loop_s']*1e3:>10.2f} | {res['view_s']*1e3:>10.3f} | "
+                  f"{res['materialize_s']*1e3:>10.2f} | {res['loop_s']/res['view_s']:>7.0f}x")
+
+    elif args.command == 'cache':
+        print(f"{'Interval':>8} | {'Rows':>6} | {'CSV (ms)':>9} | {'Biner (ms)':>10} | {'Speedup':>8}")
+        for res in bench_cache(args.symbol, repeat=args.repeat):
+            print(f"{res['interval']:>8} | {res['rows']:>6} | {res['csv_s']*1e3:>9.2f} | "
+                  f"{res['binary_s']*1e3:>10.3f} | {res['csv_s']/res['binary_s']:>7.0f}x")
+
+    elif args.command == 'pipeline':
+        print(f"{'Mode':>7} | {'Pipeline':>8} | {'Rows':>7} | {'Epoch 1 (s)':>11} | {'Epoch (s)':>9} | "
+              f"{'Peak RSS (MB)':>13} | {'Fit RSS (MB)':>12}")
+        for res in bench_pipeline(args.modes, epochs=args.epochs, scale=args.scale):
+            print(f"{res['mode']:>7} | {res['pipeline']:>8} | {res['rows']:>7} | {res['first_epoch_s']:>11.2f} | "
+                  f"{res['epoch_s']:>9.2f} | {res['peak_rss_mb']:>13.0f} | {res['fit_rss_mb']:>12.0f}")
+
+    elif args.command == 'coldstart':
+        print(f"{'Backend':>7} | {'Import (s)':>10} | {'Load (s)':>8} | {'Predict (s)':>11} | {'Total (s)':>9} | "
+              f"{'Peak RSS (MB)':>13} | {'TF dimuat':>9}")
+        for res in bench_coldstart(args.symbol, args.mode, repeat=args.repeat):
+            print(f"{res['backend']:>7} | {res['import_s']:>10.2f} | {res['load_s']:>8.2f} | {res['first_predict_s']:>11.3f} | "
+                  f"{res['total_s']:>9.2f} | {res['peak_rss_mb']:>13.0f} | {str(res['tensorflow_loaded']):>9}")
+
+    elif args.command == 'engine':
+        print(f"{'Batch':>6} | {'Keras (ms)':>10} | {'Loop (ms)':>10} | {'Mesin (ms)':>10} | {'Sampel/s':>10} | "
+              f"{'vs Keras':>8} | {'Selisih maks':>12}")
+        for res in bench_engine(args.mode, args.batch_sizes, repeat=args.repeat):
+            print(f"{res['batch']:>6} | {res['keras_s']*1e3:>10.2f} | {res['loop_s']*1e3:>10.2f} | {res['engine_s']*1e3:>10.2f} | "
+                  f"{res['batch']/res['engine_s']:>10.0f} | {res['keras_s']/res['engine_s']:>7.1f}x | {res['max_abs_diff']:>12.1e}")
+        stacked = check_stacked_engine(args.mode)
+        print(f"Bertumpuk {stacked['models']} model x {stacked['samples']} sampel (> MAX_BATCH) vs per model: "
+              f"selisih maks {stacked['max_abs_diff']:.1e} ({'OK' if stacked['ok'] else 'GAGAL'})")
+        if not stacked['ok']:
+            exit(1)
+
+    elif args.command == 'imports':
+        print(f"{'Modul':>20} | {'Import (s)':>10} | {'Status':>6} | Dependensi berat")
+        results = check_imports(args.modules, budget=args.budget, repeat=args.repeat)
+        for res in results:
+            print(f"{res['module']:>20} | {res['import_s']:>10.2f} | {'OK' if res['ok'] else 'GAGAL':>6} | "
+                  f"{', '.join(res['heavy_modules']) or '-'}")
+        # Exit code non-zero agar bisa dipakai sebagai pemeriksaan di CI
+        if not all(res['ok'] for res in results):
+            exit(1)
+
+    elif args.command == 'plots':
+        print(f"{'Implementasi':>12} | {'Grafik':>6} | {'Per grafik (ms)':>15} | {'Pertumbuhan RSS (MB)':>20} | {'Status':>6}")
+        results = bench_plots(args.count, max_growth_mb=args.max_growth, legacy=not args.no_legacy)
+        for res in results:
+            print(f"{res['impl']:>12} | {res['count']:>6} | {res['per_plot_ms']:>15.1f} | "
+                  f"{res['rss_growth_mb']:>20.1f} | {'OK' if res['ok'] else 'BOCOR':>6}")
+        # Hanya renderer baru yang wajib datar; pola pyplot lama ditampilkan sebagai pembanding
+        if not results[0]['ok']:
+            exit(1)
+
+    elif args.command == 'scaler':
+        print(f"{'Operasi':>10} | {'sklearn (us)':>12} | {'Sidecar (us)':>12} | {'Speedup':>8}")
+        for res in bench_scaler(args.mode, args.batch):
+            print(f"{res['op']:>10} | {res['sklearn_s']*1e6:>12.1f} | {res['params_s']*1e6:>12.1f} | "
+                  f"{res['sklearn_s']/res['params_s']:>7.1f}x")
+
+    elif args.command == 'metrics':
+        res = bench_metrics(args.number, args.threads)
+        for name in ('counter_inc', 'histogram_observe', 'stage_timer'):
+            print(f"{name:>18} | {res[name]*1e9:>8.0f} ns/op")
+        ok = res['concurrent_total'] == res['concurrent_expected']
+        print(f"Counter {args.threads} thread: {res['concurrent_total']}/{res['concurrent_expected']} ({'OK' if ok else 'GAGAL'}), "
+              f"render {res['render_s']*1e3:.2f} ms")
+        if not ok:
+            exit(1)
+
+    elif args.command == 'logging':
+        res = bench_logging(args.number)
+        for name, label in (('print_s', 'print ke pipe'), ('logger_s', 'logger (antrean)'),
+                            ('sampled_s', 'CACHE HIT 1/100'), ('debug_off_s', 'debug nonaktif')):
+            print(f"{label:>18} | {res[name]*1e6:>8.2f} us/pesan")
+
+    elif args.command == 'profiling':
+        res = bench_profiling(args.number, args.batch)
+        print(f"{'Timer tahap':>18} | nonaktif {res['stage_off_s']*1e9:>6.0f} ns | aktif {res['stage_on_s']*1e9:>6.0f} ns")
+        print(f"{'Forward pass':>18} | biasa {res['call_off_s']*1e3:>8.2f} ms | diprofil {res['call_on_s']*1e3:>8.2f} ms "
+              f"({res['call_on_s']/res['call_off_s']:.2f}x)")
+        print(f"{'Profil terakhir':>18} | {res['samples']} sampel, {res['stacks']} stack unik, teratas {res['top_function']}")
+
+    elif args.command == 'singleflight':
+        res = check_singleflight(args.clients, args.mode)
+        print(f"{res['clients']} pemanggil: unduhan {res['download_count']}, muat model {res['model_load_count']}, "
+              f"muat scaler {res['scaler_load_count']}, baris {res['rows']}, model sama {res['same_model']} "
+              f"({'OK' if res['ok'] else 'GAGAL'})")
+        writes = check_cache_writes(args.clients)
+        print(f"{args.clients} penulis cache: {writes['stored_rows']}/{writes['expected_rows']} baris tersimpan "
+              f"({'OK' if writes['ok'] else 'GAGAL'})")
+        cancel = check_async_cancel()
+        print(f"Async: batal 1 dari 2 pemanggil -> unduhan lanjut {cancel['one_cancelled_survives']}, "
+              f"batal semua -> unduhan berhenti {cancel['last_cancelled_stops']}, "
+              f"deadline {cancel['deadline']} s -> menyerah setelah {cancel['gave_up_after_s'] or float('nan'):.2f} s "
+              f"({'OK' if cancel['ok'] else 'GAGAL'})")
+        if not (res['ok'] and writes['ok'] and cancel['ok']):
+            exit(1)
+
+    elif args.command == 'stale':
+        res = check_stale_serving(args.mode, latency=args.latency)
+        print(f"Cache kadaluarsa, unduhan {res['latency']:.1f} s: batch {res['stale_s']*1e3:.1f} ms "
+              f"(tanpa stale-while-revalidate {res['blocking_s']*1e3:.1f} ms), cache segar kembali {res['revalidated']} "
+              f"({'OK' if res['ok'] else 'GAGAL'})")
+        preload = check_scheduler_preload(args.mode)
+        print(f"Pre-load scheduler: saat start {preload['loaded_at_start']}, setelah tick {preload['loaded_after_tick']} "
+              f"({'OK' if preload['ok'] else 'GAGAL'})")
+        if not (res['ok'] and preload['ok']):
+            exit(1)
+
+    elif args.command == 'incremental':
+        res = check_incremental_refresh()
+        print(f"Refresh inkremental: rentang diminta {res['delta_calls']} (hanya delta {res['delta_only']}), "
+              f"duplikat memakai nilai terbaru {res['newer_wins']}, delta kosong {res['empty_ok']} "
+              f"({'OK' if res['ok'] else 'GAGAL'})")
+        if not res['ok']:
+            exit(1)
+
+    elif args.command == 'ranges':
+        res = check_range_reads()
+        print(f"read_range vs potongan pandas: {res['matched']}/{res['cases']} cocok; awal cache: diunduh "
+              f"{res['gap_calls']} (hanya bagian hilang {res['head_only']}, data lengkap {res['complete']}) "
+              f"({'OK' if res['ok'] else 'GAGAL'})")
+        if not res['ok']:
+            exit(1)
+
+    elif args.command == 'registry':
+        res = check_model_registry()
+        print(f"Registry model: LRU per entri {res['lru_by_count']}, batas byte {res['within_bytes']}, "
+              f"entri terbaru dipertahankan {res['keeps_newest']}, muat ulang saat file berubah {res['reloads_on_change']} "
+              f"({'OK' if res['ok'] else 'GAGAL'})")
+        if not res['ok']:
+            exit(1)
+
+    elif args.command == 'httpcache':
+        res = check_http_cache(args.mode)
+        print(f"Cache forecast: miss lalu hit {res['miss_then_hit']}, If-None-Match -> 304 {res['not_modified']}, "
+              f"ETag milik body saat entri diganti bersamaan {res['etag_matches_body']} "
+              f"({'OK' if res['ok'] else 'GAGAL'})")
+        if not res['ok']:
+            exit(1)
+
+    elif args.command == 'migrate':
+        res = check_legacy_migration()
+        paths = ', '.join(f"{name} {ok}" for name, ok in res['migrated'].items())
+        print(f"Migrasi cache CSV lama: {paths}; mtime dipertahankan {res['mtime_kept']} "
+              f"({'OK' if res['ok'] else 'GAGAL'})")
+        if not res['ok']:
+            exit(1)
+
+    elif args.command == 'prefetch':
+        res = check_prefetch(latency=args.latency)
+        print(f"Prefetch data: {res['pairs']} (simbol, interval) dalam {res['elapsed']:.2f} s "
+              f"(serial ~{res['serial']:.2f} s), {res['downloads']} unduhan, satu kali per pasangan {res['once']}, "
+              f"cache terisi {res['cached']} ({'OK' if res['ok'] else 'GAGAL'})")
+        if not res['ok']:
+            exit(1)
+
+    elif args.command == 'profauth':
+        res = check_profiling_auth()
+        statuses = ', '.join(f"{name} {codes}" for name, codes in res['statuses'].items())
+        print(f"Akses /debug profiler: {statuses}; peringatan startup tanpa token {res['warned']} "
+              f"({'OK' if res['ok'] else 'GAGAL'})")
+        if not res['ok']:
+            exit(1)
+
+    elif args.command == 'checkpoint':
+        res = check_checkpoint(args.epochs)
+        print(f"Crash pada epoch {args.epochs}: checkpoint termuat epoch {res['loaded_epoch']}, bobot konsisten "
+              f"{res['consistent']}, bobot terbaik {res['has_best']}, file {res['files']} "
+              f"({'OK' if res['ok'] else 'GAGAL'})")
+        if not res['ok']:
+            exit(1)
+
+    elif args.command == 'suite':
+        report = bench_suite(args.modes, args.symbols, args.concurrency, args.requests, args.scenarios,
+                             args.cold_rounds, args.download_latency, micro=not args.no_micro)
+        for name, value in report.get('micro', {}).items():
+            if name.endswith('_s'):
+                print(f"{name[:-2]:>18} | {value*1e3:>9.3f} ms")
+        print(f"{'Skenario':>9} | {'Simbol':>6} | {'Klien':>5} | {'Req':>5} | {'Err':>4} | {'p50 (ms)':>8} | "
+              f"{'p95 (ms)':>8} | {'p99 (ms)':>8} | {'RPS':>8} | {'RSS (MB)':>8}")
+        for run in report['load']:
+            print(f"{run['scenario']:>9} | {run['symbols']:>6} | {run['concurrency']:>5} | {run['requests']:>5} | "
+                  f"{run['errors']:>4} | {run['p50_ms']:>8.2f} | {run['p95_ms']:>8.2f} | {run['p99_ms']:>8.2f} | "
+                  f"{run['rps']:>8.1f} | {run['peak_rss_mb']:>8.1f}")
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Artefak disimpan ke {args.output}")
+
+        failed = any(run['errors'] for run in report['load'])
+        if args.baseline:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            rows = compare_suite(report['summary'], baseline['summary'], args.threshold)
+            print(f"Dibandingkan dengan {args.baseline} (commit {baseline['meta'].get('commit')}):")
+            for row in rows:
+                print(f"{row['metric']:>40} | {row['baseline']:>10.3f} -> {row['current']:>10.3f} | "
+                      f"{row['change']*100:>+7.1f}% {'REGRESI' if row['regression'] else ''}")
+            failed = failed or any(row['regression'] for row in rows)
+        if failed:
+            exit(1)
+
+    elif args.command == 'dtype':
+        print(f"{'Level':>8} | {'Bobot':>7} | {'Data (MB)':>9} | {'f64 (MB)':>8} | {'Bobot (KB)':>10} | "
+              f"{'Err scaler':>10} | {'Err prediksi':>12} | {'Status':>6}")
+        results = bench_dtype(args.mode, args.rows, tolerance=args.tolerance)
+        for res in results:
+            print(f"{res['level']:>8g} | {res['dtype']:>7} | {res['data_mb']:>9.2f} | {res['data_ref_mb']:>8.2f} | "
+                  f"{res['weights_kb']:>10.1f} | {res['scaler_rel_err']:>10.1e} | {res['predict_rel_err']:>12.1e} | "
+                  f"{'OK' if res['ok'] else 'GAGAL':>6}")
+        if not all(res['ok'] for res in results):
+            exit(1)
@@ -18,6 +18,77 @@ class BaseConfig:
     BATCH_SIZE = 32     # Jumlah sampel per update gradien
     EPOCHS = 50         # Jumlah iterasi pelatihan penuh
 
+    # Kebijakan dtype numerik: data ternormalisasi, window latih, dan input inferensi memakai DTYPE
+    # (float32 = dtype komputasi Keras, sehingga tidak ada konversi/salinan float64 -> float32 per fit/predict).
+    # Parameter scaler tetap dihitung dari harga asli float64.
+    DTYPE = 'float32'
+    # dtype penyimpanan bundle bobot inferensi (.npz): 'float32' atau 'float16' (file 2x lebih kecil)
+    WEIGHTS_STORAGE_DTYPE = 'float32'
+
+    # Pipeline input pelatihan: 'numpy' (seluruh window X dimaterialisasi di memori sebelum fit)
+    # atau 'tfdata' (opsional: window dibangun lazy per batch + prefetch, memori sebanding panjang data)
+    INPUT_PIPELINE = 'numpy'
+    SHUFFLE_BUFFER = None    # Ukuran buffer shuffle tf.data; None = seluruh data latih (setara shuffle Keras)
+    PIPELINE_CACHE = False   # Simpan batch validasi di memori setelah epoch pertama (tf.data)
+
+    # Early stopping: hentikan pelatihan saat val loss tidak membaik, lalu kembalikan bobot terbaik
+    EARLY_STOPPING = True
+    EARLY_STOPPING_PATIENCE = 5     # Jumlah epoch tanpa perbaikan sebelum berhenti
+    EARLY_STOPPING_MIN_DELTA = 0.0  # Perbaikan minimum val loss yang dihitung sebagai perbaikan
+    CHECKPOINT_EVERY = 1            # Tulis checkpoint (untuk --resume) setiap N epoch
+
+    # Warm-start fine-tuning (train.py --finetune): lanjutkan model lama pada data terbaru
+    FINE_TUNE_EPOCHS = 5
+    FINE_TUNE_LEARNING_RATE = 0.0001  # Lebih kecil dari LEARNING_RATE agar bobot lama tidak rusak
+    FINE_TUNE_TOLERANCE = 0.0         # Kenaikan loss holdout relatif yang masih diterima saat promosi
+
+    # Format penyimpanan cache harga: 'binary' (kolumnar, mmap) atau 'csv' (format lama)
+    CACHE_FORMAT = 'binary'
+    # Saat cache kadaluarsa, unduh hanya bar baru (delta) alih-alih seluruh riwayat
+    CACHE_INCREMENTAL = True
+    # Batas waktu (detik) per percobaan unduh pada jalur async
+    DOWNLOAD_TIMEOUT = 30
+    # Batas waktu total (detik) seluruh percobaan + backoff unduh pada jalur async
+    DOWNLOAD_DEADLINE = 120
+    # Jalur prediksi API (async, batch, dan profil) melayani cache kadaluarsa langsung sambil memperbaruinya di latar belakang
+    CACHE_STALE_WHILE_REVALIDATE = True
+
+    # Backend inferensi API: 'numpy' (bundle bobot .npz, tanpa memuat TensorFlow) atau 'keras' (.h5)
+    # Jika bundle .npz belum ada, predictor otomatis memakai model Keras
+    INFERENCE_BACKEND = 'numpy'
+
+    # Batas cache model & scaler di memori API (LRU); None berarti tanpa batas
+    MODEL_CACHE_MAX_ENTRIES = 32
+    MODEL_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+    # Jumlah simbol maksimum per request POST /predict/{mode}/batch
+    BATCH_MAX_SYMBOLS = 20
+
+    # Scheduler latar belakang API: refresh cache sebelum kadaluarsa, pre-load model, pre-compute forecast.
+    # Nonaktif secara default (tanpa unduhan berkala saat app start); aktifkan dengan environment
+    # FINSIGHT_SCHEDULER=1 di deployment (lihat hf_deploy/Dockerfile)
+    SCHEDULER_ENABLED = os.environ.get('FINSIGHT_SCHEDULER', '').lower() in ('1', 'true', 'yes', 'on')
+    SCHEDULER_SYMBOLS = ['USDIDR=X']  # Simbol yang dipanaskan (untuk semua mode di CONFIGS)
+    SCHEDULER_CONCURRENCY = 2         # Jumlah refresh yang boleh berjalan bersamaan
+    SCHEDULER_JITTER = 30             # Jitter acak (detik) agar refresh tidak serentak
+    SCHEDULER_REFRESH_LEAD = 0.1      # Refresh saat sisa TTL cache tinggal 10%
+
+    # Logging (core/logger.py): level minimum dan format keluaran 'text' atau 'json' (satu objek JSON per baris)
+    LOG_LEVEL = 'INFO'
+    LOG_FORMAT = 'text'
+    # Pesan berfrekuensi tinggi (cth: CACHE HIT) hanya dicatat sekali setiap N kejadian
+    LOG_SAMPLE_EVERY = 100
+
+    # Profiler request prediksi (services/profiling.py). Nonaktif secara default dan tanpa overhead.
+    # PROFILING_ENABLED memprofil setiap request /predict/{mode} (untuk debugging/staging); dengan
+    # PROFILING_TOKEN hanya request ber-header `X-Finsight-Profile: <token>` yang diprofil.
+    PROFILING_ENABLED = False
+    PROFILING_TOKEN = os.environ.get('FINSIGHT_PROFILING_TOKEN') or None
+    PROFILING_SAMPLE_INTERVAL = 0.001  # Jarak sampling stack (detik) untuk output collapsed/flamegraph
+    PROFILING_MAX_PROFILES = 20        # Jumlah profil terakhir yang disimpan di memori
+    PROFILING_STAGE_WINDOW = 300       # Jendela bergulir (detik) untuk ringkasan tahap paling lambat
+    PROFILING_TOP_N = 10
+
     def __init__(self):
         # Mengatur jalur direktori dinamis
         # CORE_DIR adalah direktori tempat file ini berada ('ml/core')
@@ -49,6 +120,7 @@ class BaseConfig:
         return {
             'model': os.path.join(self.MODELS_DIR, f'{safe_symbol}_{self.MODE}_model.h5'),
             'scaler': os.path.join(self.MODELS_DIR, f'{safe_symbol}_{self.MODE}_scaler.pkl'),
+            'weights': os.path.join(self.MODELS_DIR, f'{safe_symbol}_{self.MODE}_weights.npz'),
             'loss_plot': os.path.join(self.PLOTS_DIR, f'{safe_symbol}_{self.MODE}_loss.png'),
             'prediction_plot': os.path.join(self.PLOTS_DIR, f'{safe_symbol}_{self.MODE}_prediction.png'),
             'forecast_plot': os.path.join(self.PLOTS_DIR, f'{safe_symbol}_{self.MODE}_forecast.png')
@@ -66,6 +138,7 @@ class DailyConfig(BaseConfig):
     
     LOOKBACK_WINDOW = 60  # Melihat ke belakang 60 hari untuk prediksi
     PREDICTION_STEPS = 7  # Memprediksi 7 hari ke depan (Output Model)
+    FINE_TUNE_BARS = 500  # Jumlah bar terakhir untuk fine-tuning (sekitar 2 tahun)
     
     def __init__(self):
         super().__init__()
@@ -85,6 +158,7 @@ class HourlyConfig(BaseConfig):
     
     LOOKBACK_WINDOW = 60  # Melihat ke belakang 60 jam untuk prediksi
     PREDICTION_STEPS = 24 # Memprediksi 24 jam ke depan (Output Model)
+    FINE_TUNE_BARS = 2000 # Jumlah bar terakhir untuk fine-tuning (sekitar 4 bulan)
     
     def __init__(self):
         super().__init__()
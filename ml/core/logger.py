@@ -0,0 +1,106 @@
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime, timezone
+from core.config import BaseConfig
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+# Logger paket ml yang mengikuti LOG_LEVEL; library pihak ketiga tetap di level WARNING
+PACKAGE_LOGGERS = ('app', 'core', 'services')
+
+# Listener yang menulis log dari antrean ke stream (thread latar belakang)
+_LISTENER = None
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format satu objek JSON per baris (time, level, logger, message, dan exc_info jika ada).
+    """
+    def format(self, record):
+        payload = {
+            'time': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class _InProcessQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler untuk antrean di proses yang sama.
+
+    `prepare` bawaan memformat pesan lengkap dan menyalin record di thread pemanggil (agar bisa di-pickle
+    ke proses lain). Di sini thread pemanggil hanya menggabungkan argumen pesan (agar objek yang berubah
+    kemudian tidak memengaruhi isi log); format waktu/JSON dan penulisan dikerjakan thread listener.
+    """
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class LogSampler:
+    """
+    Sampling untuk pesan berfrekuensi tinggi: `sampler()` bernilai True sekali setiap `every` pemanggilan.
+
+    Dipakai sebelum memanggil logger (`if sampler(): logger.info(...)`), sehingga kejadian yang tidak
+    dicatat tidak membuat LogRecord sama sekali. `itertools.count` bersifat atomik di CPython,
+    jadi tidak perlu lock.
+    """
+    def __init__(self, every=None):
+        self.every = BaseConfig.LOG_SAMPLE_EVERY if every is None else every
+        self._counter = itertools.count()
+
+    def __call__(self):
+        return self.every <= 1 or next(self._counter) % self.every == 0
+
+
+def setup_logging(level=None, fmt=None, stream=None):
+    """
+    Mengonfigurasi logging untuk seluruh paket ml (dipanggil sekali oleh entry point: API, train.py, dll).
+
+    Logger root hanya diberi QueueHandler: thread pemanggil cukup memasukkan record ke antrean,
+    sedangkan penulisan ke stream dilakukan QueueListener di thread terpisah sehingga request
+    tidak pernah menunggu I/O. Listener dihentikan (dan antrean dikosongkan) saat interpreter berhenti.
+
+    Args:
+        level (str): Level minimum logger paket ml (default: BaseConfig.LOG_LEVEL)
+        fmt (str): 'text' atau 'json' (default: BaseConfig.LOG_FORMAT)
+        stream: Tujuan keluaran (default: sys.stdout)
+    """
+    global _LISTENER
+    _stop_listener()
+
+    handler = logging.StreamHandler(stream or sys.stdout)
+    if (fmt or BaseConfig.LOG_FORMAT) == 'json':
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(_InProcessQueueHandler(log_queue))
+    root.setLevel(logging.WARNING)
+    for name in PACKAGE_LOGGERS:
+        logging.getLogger(name).setLevel(level or BaseConfig.LOG_LEVEL)
+
+    _LISTENER = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _LISTENER.start()
+    return _LISTENER
+
+
+@atexit.register
+def _stop_listener():
+    global _LISTENER
+    if _LISTENER is not None:
+        _LISTENER.stop()
+        _LISTENER = None
@@ -0,0 +1,34 @@
+import time
+from services.metrics import REQUEST_SECONDS
+
+
+class RequestMetricsMiddleware:
+    """
+    Middleware ASGI yang mencatat durasi setiap request HTTP ke histogram `finsight_http_request_seconds`.
+
+    Label route memakai pola path (cth: /predict/{mode}), bukan path asli, agar jumlah seri metrik
+    tetap kecil. Request yang tidak cocok dengan route mana pun dicatat sebagai 'unmatched'.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get('route')
+            path = getattr(route, 'path', 'unmatched')
+            REQUEST_SECONDS.labels(scope['method'], path, str(status)).observe(time.perf_counter() - start)
@@ -1,13 +1,23 @@
-from fastapi import APIRouter, HTTPException
-from app.schemas import PredictionResponse
-from services.predictor import predict_future
+import asyncio
+from fastapi import APIRouter, HTTPException, Request, Response
+from app.schemas import PredictionResponse, BatchPredictionRequest, BatchPredictionResponse
+from services.predictor import forecast_future, forecast_future_async, predict_many
+from services.profiling import PROFILER, REQUEST_LABEL
+from services.metrics import stage
 
 router = APIRouter()
 
 @router.get("/predict/{mode}", response_model=PredictionResponse)
-def get_prediction(mode: str, symbol: str = "USDIDR=X"):
+async def get_prediction(mode: str, request: Request, symbol: str = "USDIDR=X"):
     """
     Endpoint API untuk mendapatkan prediksi harga mata uang.
+    Berjalan secara async: retry unduhan data tidak memblokir worker, dan inferensi model
+    dijalankan di thread executor.
+    Respons menyertakan header ETag dan Cache-Control; request dengan If-None-Match yang cocok
+    mendapat 304 Not Modified.
+
+    Jika profiler aktif (lihat `services.profiling`) dan request ini diprofil, prediksi dijalankan lewat
+    `forecast_future` di satu thread di bawah profiler, dan id profil dikembalikan di header `X-Profile-Id`.
     
     Args:
         mode (str): Mode prediksi, harus 'daily' atau 'hourly'.
@@ -25,20 +35,71 @@ def get_prediction(mode: str, symbol: str = "USDIDR=X"):
         raise HTTPException(status_code=400, detail="Mode tidak valid. Gunakan 'daily' atau 'hourly'.")
     
     try:
-        # Panggil service predictor untuk melakukan prediksi
-        # plot=False karena kita hanya butuh data JSON, bukan gambar
-        results = predict_future(mode, symbol=symbol, plot=False)
+        headers = {}
+        profiled = False
+        if PROFILER.active:
+            REQUEST_LABEL.set(f"{mode}:{symbol}")
+            profiled = PROFILER.wants_profile(request.headers)
+
+        if profiled:
+            # Seluruh jalur prediksi di satu thread agar tertangkap utuh oleh cProfile & sampler stack
+            entry, headers["X-Profile-Id"] = await asyncio.to_thread(
+                PROFILER.profile, REQUEST_LABEL.get(), forecast_future, mode, symbol=symbol, plot=False,
+                stale_while_revalidate=True)
+        else:
+            # Panggil service predictor untuk melakukan prediksi (tanpa plot, hanya data JSON)
+            entry = await forecast_future_async(mode, symbol=symbol)
         
         # Validasi hasil prediksi
-        if not results:
+        if entry is None or not entry.results:
             raise HTTPException(status_code=500, detail=f"Prediksi gagal untuk {symbol}. Pastikan model sudah dilatih.")
+
+        # Header cache HTTP dari entri yang sama dengan body: forecast tidak berubah sampai bar berikutnya muncul
+        etag = f'"{entry.etag}"'
+        headers.update({"ETag": etag, "Cache-Control": f"public, max-age={entry.max_age()}"})
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
             
-        # Kembalikan respons sesuai skema Pydantic
-        return dict(
-            symbol=symbol,
-            mode=mode,
-            data=results
-        )
+        # Serialisasi sesuai skema Pydantic di sini (bukan oleh FastAPI) agar durasinya tercatat
+        with stage('serialize'):
+            body = PredictionResponse(symbol=symbol, mode=mode, data=entry.results).model_dump_json()
+        return Response(content=body, media_type="application/json", headers=headers)
     except Exception as e:
         # Tangkap error kustom dan kembalikan sebagai 500 Internal Server Error
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/predict/{mode}/batch", response_model=BatchPredictionResponse)
+def get_batch_prediction(mode: str, request: BatchPredictionRequest):
+    """
+    Endpoint API untuk mendapatkan prediksi banyak simbol dalam satu request.
+    
+    Args:
+        mode (str): Mode prediksi, harus 'daily' atau 'hourly'.
+        request (BatchPredictionRequest): Daftar simbol mata uang.
+        
+    Returns:
+        BatchPredictionResponse: Hasil prediksi per simbol dan pesan error untuk simbol yang gagal.
+        
+    Raises:
+        HTTPException(400): Jika mode tidak valid atau daftar simbol kosong.
+        422: Jika jumlah simbol melebihi BATCH_MAX_SYMBOLS (validasi skema request).
+        HTTPException(500): Jika terjadi kesalahan tak terduga saat prediksi.
+    """
+    # Validasi input mode
+    if mode not in ['daily', 'hourly']:
+        raise HTTPException(status_code=400, detail="Mode tidak valid. Gunakan 'daily' atau 'hourly'.")
+    if not request.symbols:
+        raise HTTPException(status_code=400, detail="Daftar simbol tidak boleh kosong.")
+    
+    try:
+        results, errors = predict_many(mode, request.symbols)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    with stage('serialize'):
+        body = BatchPredictionResponse(
+            mode=mode,
+            results=[dict(symbol=symbol, mode=mode, data=data) for symbol, data in results.items()],
+            errors=errors
+        ).model_dump_json()
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from services.predictor import MODEL_REGISTRY, FORECAST_CACHE
+from services.plotting import PLOT_RENDERER
+from services.scheduler import SCHEDULER
+
+router = APIRouter()
+
+@router.get("/status")
+def get_status():
+    """
+    Endpoint API untuk memantau kondisi layanan.
+    
+    Returns:
+        dict: Status scheduler latar belakang, statistik cache model, cache forecast, dan antrean rendering plot.
+    """
+    return {
+        "scheduler": SCHEDULER.status(),
+        "model_cache": MODEL_REGISTRY.stats(),
+        "forecast_cache": FORECAST_CACHE.stats(),
+        "plot_renderer": PLOT_RENDERER.stats(),
+    }
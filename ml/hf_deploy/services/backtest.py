@@ -0,0 +1,131 @@
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from services.data_service import fetch_data, create_sequences, train_size_for
+
+
+def horizon_metrics(actual, predicted, last_close):
+    """
+    Menghitung metrik akurasi per horizon dari matriks (origin x horizon), sepenuhnya vektor NumPy.
+
+    Args:
+        actual (array): Harga asli berbentuk (origin, horizon)
+        predicted (array): Harga prediksi berbentuk (origin, horizon)
+        last_close (array): Harga terakhir yang diketahui di setiap origin, berbentuk (origin,)
+
+    Returns:
+        dict: Array per horizon untuk mae, rmse, mape (%), directional_accuracy (%), dan mae_naive
+        (MAE prediksi naif "harga tetap sama seperti harga terakhir", sebagai pembanding)
+    """
+    actual = np.asarray(actual, dtype=np.float64)
+    predicted = np.asarray(predicted, dtype=np.float64)
+    last_close = np.asarray(last_close, dtype=np.float64)[:, None]
+
+    error = predicted - actual
+    abs_error = np.abs(error)
+    # Arah pergerakan terhadap harga terakhir di origin: naik (+1), turun (-1), atau tetap (0)
+    hit = np.sign(predicted - last_close) == np.sign(actual - last_close)
+    return {
+        'mae': abs_error.mean(axis=0),
+        'rmse': np.sqrt(np.square(error).mean(axis=0)),
+        'mape': (abs_error / np.abs(actual)).mean(axis=0) * 100,
+        'directional_accuracy': hit.mean(axis=0) * 100,
+        'mae_naive': np.abs(actual - last_close).mean(axis=0),
+    }
+
+
+def run_backtest(conf, symbol='USDIDR=X', stride=1, start=None, batch_size=None):
+    """
+    Walk-forward backtest model terlatih pada periode uji.
+
+    Setiap origin hanya memakai `LOOKBACK_WINDOW` bar sampai origin tersebut sebagai input, lalu seluruh
+    `PREDICTION_STEPS` horizon dibandingkan dengan harga yang terjadi sesudahnya. Semua window dibentuk
+    sebagai strided view dan diprediksi dalam satu forward pass batch, lalu metrik dihitung langsung
+    pada matriks (origin x horizon). Model tidak dilatih ulang di antara origin.
+
+    Args:
+        conf (Config): Objek konfigurasi (Hourly/Daily)
+        symbol (str): Simbol mata uang
+        stride (int): Jarak antar origin dalam bar (1 = setiap bar)
+        start (str): Tanggal origin pertama 'YYYY-MM-DD' (default: awal periode uji `TEST_SIZE`,
+            sama dengan data uji saat pelatihan)
+        batch_size (int): Ukuran potongan batch forward pass (default: bawaan backend)
+
+    Returns:
+        dict: Laporan backtest (periode, jumlah origin, waktu, metrik per horizon dan rata-rata)
+
+    Raises:
+        FileNotFoundError: Jika model atau scaler belum dilatih
+        ValueError: Jika periode uji tidak memiliki origin dengan horizon lengkap
+    """
+    # Import di sini agar modul ringan saat hanya metrik yang dipakai
+    from services.predictor import load_artifacts, model_artifact_path, scaler_artifact_path
+
+    start_time = time.perf_counter()
+    model, scaler = load_artifacts(conf, symbol, conf.MODE)
+    df = fetch_data(symbol, conf.START_DATE, conf.END_DATE, interval=conf.INTERVAL)
+    prices = df['Close'].to_numpy(dtype=np.float64)
+    scaled = scaler.transform(prices.astype(conf.DTYPE).reshape(-1, 1))
+
+    # Window ke-i: input bar [i, i + lookback), origin = bar i + lookback - 1, target bar sesudahnya
+    lookback, steps = conf.LOOKBACK_WINDOW, conf.PREDICTION_STEPS
+    X, _ = create_sequences(scaled, lookback, steps, features=[0])
+    _, y = create_sequences(prices, lookback, steps)
+    origin_index = np.arange(len(X)) + lookback - 1
+
+    if start is None:
+        first = train_size_for(len(X), conf.TEST_SIZE)
+    else:
+        start = pd.Timestamp(start)
+        if df.index.tz is not None and start.tz is None:
+            start = start.tz_localize(df.index.tz)
+        first = int(np.searchsorted(origin_index, df.index.searchsorted(start)))
+    selected = np.arange(first, len(X), max(1, stride))
+    if len(selected) == 0:
+        raise ValueError(f"Tidak ada origin backtest untuk {symbol} ({len(df)} rows).")
+
+    # Satu forward pass untuk seluruh origin
+    predict_start = time.perf_counter()
+    predicted_scaled = model.predict(X[selected], verbose=0, batch_size=batch_size)
+    predict_time = time.perf_counter() - predict_start
+
+    predicted = scaler.inverse_transform(predicted_scaled.reshape(-1, 1)).reshape(len(selected), steps)
+    metrics = horizon_metrics(y[selected], predicted, prices[origin_index[selected]])
+
+    return {
+        'symbol': symbol,
+        'mode': conf.MODE,
+        'created_at': datetime.now().isoformat(),
+        'model': model_artifact_path(conf, symbol),
+        'scaler': scaler_artifact_path(conf, symbol),
+        'period': {
+            'first_origin': df.index[origin_index[selected[0]]].isoformat(),
+            'last_origin': df.index[origin_index[selected[-1]]].isoformat(),
+        },
+        'origins': int(len(selected)),
+        'stride': max(1, stride),
+        'horizons': steps,
+        'predict_time': predict_time,
+        'wall_time': time.perf_counter() - start_time,
+        'per_horizon': [
+            {'horizon': h + 1, **{name: float(values[h]) for name, values in metrics.items()}}
+            for h in range(steps)
+        ],
+        'overall': {name: float(values.mean()) for name, values in metrics.items()},
+    }
+
+
+def print_backtest(report):
+    """
+    Menampilkan metrik backtest per horizon dalam bentuk tabel di terminal.
+    """
+    print("-" * 72)
+    print(f"Backtest {report['symbol']} ({report['mode']}): {report['origins']} origin, "
+          f"{report['period']['first_origin']} s/d {report['period']['last_origin']}")
+    print(f"{'Horizon':>8} | {'MAE':>10} | {'RMSE':>10} | {'MAPE (%)':>8} | {'Arah (%)':>8} | {'MAE naif':>10}")
+    for row in report['per_horizon'] + [dict(report['overall'], horizon='rata2')]:
+        print(f"{row['horizon']:>8} | {row['mae']:>10.4f} | {row['rmse']:>10.4f} | {row['mape']:>8.3f} | "
+              f"{row['directional_accuracy']:>8.1f} | {row['mae_naive']:>10.4f}")
+    print(f"Forward pass: {report['predict_time']:.2f} detik | Total: {report['wall_time']:.2f} detik")
+    print("-" * 72)
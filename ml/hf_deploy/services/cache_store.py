@@ -0,0 +1,371 @@
+import os
+import json
+import logging
+import struct
+import threading
+import datetime
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Format biner kolumnar untuk cache harga:
+# MAGIC (8 byte) | panjang header (uint32) | header JSON | padding 64 byte |
+# index int64 (epoch-ns, UTC) | kolom float64 ke-1 | kolom float64 ke-2 | ...
+# Setiap kolom disimpan berurutan (columnar) sehingga bisa dibaca langsung via mmap.
+MAGIC = b'FSCACHE1'
+ALIGNMENT = 64
+
+
+class CsvCacheStore:
+    """
+    Penyimpanan cache dalam format CSV (format lama).
+    Setiap cache hit harus mem-parsing tanggal untuk seluruh baris.
+    """
+    extension = '.csv'
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def path(self, ticker, interval):
+        """
+        Mengembalikan lokasi file cache untuk ticker dan interval tertentu.
+        """
+        return os.path.join(self.cache_dir, f"{ticker}_{interval}{self.extension}")
+
+    def exists(self, ticker, interval):
+        return os.path.exists(self.path(ticker, interval))
+
+    def age(self, ticker, interval):
+        """
+        Mengembalikan umur file cache (timedelta), atau None jika cache belum ada.
+        """
+        if not self.exists(ticker, interval):
+            return None
+        file_mod_time = datetime.datetime.fromtimestamp(os.path.getmtime(self.path(ticker, interval)))
+        return datetime.datetime.now() - file_mod_time
+
+    def read(self, ticker, interval):
+        return pd.read_csv(self.path(ticker, interval), index_col=0, parse_dates=True)
+
+    def read_range(self, ticker, interval, start=None, end=None):
+        """
+        Membaca hanya bar dalam rentang [start, end] dari cache.
+        Lihat `slice_range` untuk aturan batas rentang.
+        """
+        return slice_range(self.read(ticker, interval), start, end)
+
+    def coverage_start(self, ticker, interval):
+        """
+        Mengembalikan awal rentang yang sudah pernah diminta dan tersimpan di cache.
+        Format CSV tidak menyimpan metadata, sehingga digunakan bar pertama.
+        """
+        return self.read(ticker, interval).index[0]
+
+    def write(self, ticker, interval, df, coverage_start=None):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Tulis ke file sementara lalu ganti secara atomik agar pembaca tidak melihat file setengah jadi
+        tmp_path = _tmp_path(self.path(ticker, interval))
+        df.to_csv(tmp_path)
+        os.replace(tmp_path, self.path(ticker, interval))
+
+    def touch(self, ticker, interval):
+        """
+        Memperbarui waktu modifikasi cache tanpa mengubah isinya (menandai cache sebagai segar).
+        """
+        os.utime(self.path(ticker, interval))
+
+    def last_timestamp(self, ticker, interval):
+        """
+        Mengembalikan timestamp bar terakhir yang tersimpan di cache.
+        """
+        return self.read(ticker, interval).index[-1]
+
+    def append(self, ticker, interval, df, coverage_start=None):
+        """
+        Menggabungkan bar baru ke cache yang ada lalu menyimpannya secara atomik.
+        Bar dengan timestamp yang sama ditimpa oleh versi terbaru.
+
+        Args:
+            coverage_start: Awal rentang baru yang dicakup (jika bar ditambahkan di depan)
+
+        Returns:
+            DataFrame: Seluruh isi cache setelah penggabungan
+        """
+        if not self.exists(ticker, interval):
+            self.write(ticker, interval, df, coverage_start=coverage_start)
+            return df
+
+        existing_start = self.coverage_start(ticker, interval)
+        if coverage_start is not None:
+            coverage_start = min(_to_timestamp(coverage_start, existing_start.tz), existing_start)
+        else:
+            coverage_start = existing_start
+
+        cached = self.read(ticker, interval)
+        if len(df) == 0:
+            # Tidak ada bar baru, hanya metadata rentang yang diperbarui
+            merged = cached
+        else:
+            merged = pd.concat([cached, df[cached.columns]])
+            merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+        self.write(ticker, interval, merged, coverage_start=coverage_start)
+        return merged
+
+
+class BinaryCacheStore(CsvCacheStore):
+    """
+    Penyimpanan cache dalam format biner kolumnar yang bisa di-mmap.
+
+    Index disimpan sebagai int64 epoch-ns dan setiap kolom sebagai blok float64,
+    sehingga cache hit hanya berupa pemetaan memori tanpa parsing tanggal.
+    Cache CSV lama (jika ada) dimigrasikan otomatis satu kali saat pertama diakses.
+    """
+    extension = '.fcache'
+
+    def __init__(self, cache_dir):
+        super().__init__(cache_dir)
+        self.legacy = CsvCacheStore(cache_dir)
+
+    def _migrate(self, ticker, interval):
+        """
+        Mengonversi cache CSV lama ke format biner (sekali saja).
+        Waktu modifikasi file dipertahankan agar perhitungan TTL tidak berubah.
+        """
+        if super().exists(ticker, interval) or not self.legacy.exists(ticker, interval):
+            return
+        legacy_path = self.legacy.path(ticker, interval)
+        logger.info("CACHE MIGRATE: Mengonversi %s ke format biner", os.path.basename(legacy_path))
+        self.write(ticker, interval, self.legacy.read(ticker, interval))
+        mtime = os.path.getmtime(legacy_path)
+        os.utime(self.path(ticker, interval), (mtime, mtime))
+
+    def exists(self, ticker, interval):
+        self._migrate(ticker, interval)
+        return super().exists(ticker, interval)
+
+    def _open(self, ticker, interval):
+        """
+        Membuka file cache biner untuk dibaca. Jika belum ada, cache CSV lama dimigrasikan lebih dulu,
+        sehingga pembacaan tidak bergantung pada pemanggilan `exists()` sebelumnya.
+        Cache hit tidak menambah pemeriksaan file apa pun.
+
+        Returns:
+            tuple: (file object biner, path)
+        """
+        path = self.path(ticker, interval)
+        try:
+            return open(path, 'rb'), path
+        except FileNotFoundError:
+            self._migrate(ticker, interval)
+            return open(path, 'rb'), path
+
+    def touch(self, ticker, interval):
+        self._migrate(ticker, interval)
+        super().touch(ticker, interval)
+
+    def _read_header(self, f, path):
+        """
+        Membaca header dari file cache yang sudah dibuka dan mengembalikan (header, offset_data).
+
+        Header, index, dan kolom harus dibaca dari file object yang sama: penulis mengganti file lewat
+        `os.replace`, sehingga membuka ulang berdasarkan path bisa mendapat file baru dengan `rows` berbeda.
+        Ukuran file diperiksa terhadap header agar file yang terpotong tidak terbaca sebagai data.
+
+        Raises:
+            ValueError: Jika file bukan cache Finsight atau ukurannya tidak sesuai header
+        """
+        prefix = f.read(len(MAGIC) + 4)
+        if prefix[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"Bukan file cache Finsight: {path}")
+        (header_len,) = struct.unpack('<I', prefix[len(MAGIC):])
+        header = json.loads(f.read(header_len).decode('utf-8'))
+        offset = _align(len(MAGIC) + 4 + header_len)
+        expected = offset + (len(header['columns']) + 1) * header['rows'] * 8
+        actual = os.fstat(f.fileno()).st_size
+        if actual != expected:
+            raise ValueError(f"Ukuran file cache {path} tidak sesuai header ({actual} != {expected} byte)")
+        return header, offset
+
+    def _read_index_value(self, f, header, offset, position):
+        """
+        Membaca satu nilai index (int64 epoch-ns) langsung dari file tanpa memuat seluruh index.
+        """
+        f.seek(offset + position * 8)
+        (value,) = struct.unpack('<q', f.read(8))
+        return _from_ns(value, header['tz'])
+
+    def last_timestamp(self, ticker, interval):
+        # Cukup baca satu nilai int64 terakhir dari blok index
+        f, path = self._open(ticker, interval)
+        with f:
+            header, offset = self._read_header(f, path)
+            if header['rows'] == 0:
+                raise IndexError(f"Cache kosong: {path}")
+            return self._read_index_value(f, header, offset, header['rows'] - 1)
+
+    def coverage_start(self, ticker, interval):
+        f, path = self._open(ticker, interval)
+        with f:
+            header, offset = self._read_header(f, path)
+            if header.get('coverage_start') is not None:
+                return _from_ns(header['coverage_start'], header['tz'])
+            if header['rows'] == 0:
+                raise IndexError(f"Cache kosong: {path}")
+            return self._read_index_value(f, header, offset, 0)
+
+    def read(self, ticker, interval):
+        return self.read_range(ticker, interval)
+
+    def read_range(self, ticker, interval, start=None, end=None):
+        # Index tersimpan terurut, sehingga batas rentang dicari dengan binary search pada index
+        # yang di-mmap, lalu hanya rentang byte yang dibutuhkan dari setiap kolom yang dipetakan.
+        # Semua pemetaan dibuat dari file object yang sama dengan header (lihat `_read_header`);
+        # mmap tetap menunjuk file tersebut walaupun path sudah diganti penulis lain.
+        f, path = self._open(ticker, interval)
+        with f:
+            header, offset = self._read_header(f, path)
+            rows, columns = header['rows'], header['columns']
+
+            lo, hi = 0, rows
+            if rows > 0 and (start is not None or end is not None):
+                index_ns = np.memmap(f, dtype='<i8', mode='r', offset=offset, shape=(rows,))
+                lo, hi = _range_bounds(index_ns, start, end, header['tz'])
+            n = max(hi - lo, 0)
+
+            if n == 0:
+                index_ns = np.empty(0, dtype='<i8')
+                values = [np.empty(0, dtype='<f8') for _ in columns]
+            else:
+                # Pemetaan memori langsung, tanpa menyalin isi file
+                index_ns = np.memmap(f, dtype='<i8', mode='r', offset=offset + lo * 8, shape=(n,))
+                values = [
+                    np.memmap(f, dtype='<f8', mode='r', offset=offset + (i + 1) * rows * 8 + lo * 8, shape=(n,))
+                    for i in range(len(columns))
+                ]
+
+        index = pd.DatetimeIndex(index_ns.view('datetime64[ns]'), name=header['index_name'])
+        if header['tz']:
+            index = index.tz_localize('UTC').tz_convert(header['tz'])
+        return pd.DataFrame(dict(zip(columns, values)), index=index, copy=False)
+
+    def write(self, ticker, interval, df, coverage_start=None):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path(ticker, interval)
+
+        index = pd.DatetimeIndex(df.index)
+        tz = str(index.tz) if index.tz is not None else None
+        if coverage_start is not None:
+            coverage_start = _to_timestamp(coverage_start, tz).as_unit('ns').value
+        header = json.dumps({
+            'rows': len(df),
+            'columns': [str(col) for col in df.columns],
+            'index_name': index.name,
+            'tz': tz,
+            'coverage_start': coverage_start,
+        }).encode('utf-8')
+
+        # Tulis ke file sementara lalu ganti secara atomik agar pembaca tidak melihat file setengah jadi
+        tmp_path = _tmp_path(path)
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            f.write(b'\0' * (_align(f.tell()) - f.tell()))
+            f.write(index.as_unit('ns').asi8.astype('<i8').tobytes())
+            for col in df.columns:
+                f.write(df[col].to_numpy(dtype='<f8').tobytes())
+        os.replace(tmp_path, path)
+
+
+def _to_timestamp(value, tz):
+    """
+    Mengubah string/datetime menjadi pd.Timestamp dengan zona waktu yang sama seperti index cache.
+    """
+    ts = pd.Timestamp(value)
+    if tz is not None and ts.tz is None:
+        return ts.tz_localize(tz)
+    if tz is None and ts.tz is not None:
+        return ts.tz_localize(None)
+    return ts
+
+
+def _from_ns(value, tz):
+    """
+    Mengubah nilai epoch-ns (UTC jika tz diisi) kembali menjadi pd.Timestamp.
+    """
+    ts = pd.Timestamp(value, unit='ns')
+    return ts.tz_localize('UTC').tz_convert(tz) if tz else ts
+
+
+def _end_bound(end, tz):
+    """
+    Batas akhir untuk rentang [start, end] beserta sisi `searchsorted` yang membuatnya inklusif.
+    Jika `end` hanya berupa tanggal, seluruh hari tersebut ikut tercakup (batas eksklusif hari berikutnya).
+
+    Returns:
+        tuple: (pd.Timestamp batas, 'left' atau 'right')
+    """
+    end_ts = _to_timestamp(end, tz)
+    if end_ts == end_ts.normalize():
+        return end_ts + pd.Timedelta(days=1), 'left'
+    return end_ts, 'right'
+
+
+def _range_bounds(index_ns, start, end, tz):
+    """
+    Mencari posisi (lo, hi) rentang [start, end] pada array index int64 yang terurut.
+    """
+    lo, hi = 0, len(index_ns)
+    if start is not None:
+        lo = int(np.searchsorted(index_ns, _to_timestamp(start, tz).as_unit('ns').value, side='left'))
+    if end is not None:
+        end_ts, side = _end_bound(end, tz)
+        hi = int(np.searchsorted(index_ns, end_ts.as_unit('ns').value, side=side))
+    return lo, hi
+
+
+def slice_range(df, start=None, end=None):
+    """
+    Memotong DataFrame berindex waktu (terurut) ke rentang [start, end] tanpa menyalin data.
+    `end` bersifat inklusif; jika hanya berupa tanggal, seluruh hari tersebut ikut tercakup.
+    """
+    index = pd.DatetimeIndex(df.index)
+    tz = str(index.tz) if index.tz is not None else None
+    lo, hi = 0, len(df)
+    if start is not None:
+        lo = index.searchsorted(_to_timestamp(start, tz), side='left')
+    if end is not None:
+        end_ts, side = _end_bound(end, tz)
+        hi = index.searchsorted(end_ts, side=side)
+    return df.iloc[lo:hi]
+
+
+def _tmp_path(path):
+    """
+    Nama file sementara yang unik per proses/thread untuk penulisan atomik.
+    """
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _align(offset):
+    """
+    Membulatkan offset ke kelipatan ALIGNMENT berikutnya.
+    """
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+# Registry format cache yang tersedia
+CACHE_STORES = {
+    'csv': CsvCacheStore,
+    'binary': BinaryCacheStore,
+}
+
+
+def get_cache_store(cache_format, cache_dir):
+    """
+    Membuat objek penyimpanan cache berdasarkan nama format ('csv' atau 'binary').
+    """
+    if cache_format not in CACHE_STORES:
+        raise ValueError(f"Format cache tidak valid: {cache_format}. Opsi: {list(CACHE_STORES.keys())}")
+    return CACHE_STORES[cache_format](cache_dir)
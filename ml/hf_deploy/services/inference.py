@@ -0,0 +1,219 @@
+import os
+import numpy as np
+
+# Versi format bundle bobot (.npz); naikkan jika susunan array berubah
+BUNDLE_VERSION = 1
+
+
+def bundle_from_keras(model, dtype='float32'):
+    """
+    Mengambil bobot model Keras (topologi build_model: LSTM bertumpuk -> Dense) menjadi dictionary array NumPy.
+    Layer Dropout dilewati karena tidak aktif saat inferensi. `dtype` menentukan tipe penyimpanan bobot
+    (float16 memperkecil file separuhnya); saat dimuat bobot selalu dihitung dalam float32.
+
+    Raises:
+        ValueError: Jika model berisi layer atau aktivasi yang tidak didukung runtime NumPy
+    """
+    bundle = {'version': np.array(BUNDLE_VERSION)}
+    layer_types = []
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind == 'Dropout':
+            continue
+        config = layer.get_config()
+        index = len(layer_types)
+        if kind == 'LSTM':
+            if config['activation'] != 'tanh' or config['recurrent_activation'] != 'sigmoid' or not config['use_bias']:
+                raise ValueError(f"Konfigurasi LSTM tidak didukung runtime NumPy: {layer.name}")
+            kernel, recurrent_kernel, bias = layer.get_weights()
+            bundle[f'layer_{index}_kernel'] = kernel.astype(dtype)
+            bundle[f'layer_{index}_recurrent_kernel'] = recurrent_kernel.astype(dtype)
+            bundle[f'layer_{index}_bias'] = bias.astype(dtype)
+            layer_types.append('lstm_seq' if config['return_sequences'] else 'lstm')
+        elif kind == 'Dense':
+            if config['activation'] != 'linear' or not config['use_bias']:
+                raise ValueError(f"Konfigurasi Dense tidak didukung runtime NumPy: {layer.name}")
+            kernel, bias = layer.get_weights()
+            bundle[f'layer_{index}_kernel'] = kernel.astype(dtype)
+            bundle[f'layer_{index}_bias'] = bias.astype(dtype)
+            layer_types.append('dense')
+        else:
+            raise ValueError(f"Layer {kind} tidak didukung runtime NumPy")
+    bundle['layer_types'] = np.array(layer_types)
+    return bundle
+
+
+def save_bundle(bundle, path):
+    """
+    Menyimpan bundle bobot ke file .npz secara atomik (file sementara lalu os.replace).
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **bundle)
+    os.replace(tmp_path, path)
+
+
+def load_bundle(path):
+    """
+    Memuat bundle bobot (.npz) menjadi model inferensi NumPy.
+    """
+    with np.load(path) as data:
+        if int(data['version']) != BUNDLE_VERSION:
+            raise ValueError(f"Versi bundle {path} tidak didukung: {int(data['version'])}")
+        layer_types = [str(kind) for kind in data['layer_types']]
+        layers = []
+        for index, kind in enumerate(layer_types):
+            names = ('kernel', 'bias') if kind == 'dense' else ('kernel', 'recurrent_kernel', 'bias')
+            layers.append((kind, [data[f'layer_{index}_{name}'] for name in names]))
+    return NumpyLSTMModel(layers)
+
+
+class NumpyLSTMModel:
+    """
+    Runtime inferensi untuk model LSTM bertumpuk + Dense tanpa TensorFlow.
+
+    Meniru `model.predict` Keras (aktivasi tanh & sigmoid), sehingga predictor dapat memakainya
+    sebagai pengganti model Keras. Bobot disiapkan satu kali saat dimuat:
+
+    - Kolom gate disusun ulang menjadi [i, f, o, c] dalam satu matriks fused (float32, contiguous).
+    - Kolom gate sigmoid (i, f, o) dikalikan 0.5, karena sigmoid(x) = 0.5 * tanh(x / 2) + 0.5;
+      dengan begitu keempat gate cukup dihitung dengan satu `np.tanh` per langkah waktu.
+    - Proyeksi input (x @ kernel + bias) untuk seluruh langkah waktu dihitung dalam satu matmul,
+      sehingga loop waktu hanya berisi satu matmul recurrent (h @ recurrent_kernel).
+
+    Data disimpan time-major (waktu, batch, fitur) di antara layer agar setiap langkah waktu contiguous.
+
+    `NumpyLSTMModel.stack(models)` menggabungkan beberapa model bertopologi sama (cth: model per simbol)
+    menjadi satu model bertumpuk: bobot diberi sumbu model di depan dan input berbentuk
+    (model, batch, lookback, fitur), sehingga loop waktu dijalankan sekali untuk semua model
+    (matmul batch per langkah waktu) alih-alih sekali per model.
+    """
+    # Batas jumlah sampel per potongan batch, membatasi memori proyeksi input (waktu x batch x 4*units)
+    MAX_BATCH = 512
+
+    def __init__(self, layers):
+        self.layers = []
+        for kind, weights in layers:
+            if kind == 'dense':
+                kernel, bias = weights
+                self.layers.append((kind, (np.ascontiguousarray(kernel, dtype=np.float32),
+                                           np.ascontiguousarray(bias, dtype=np.float32))))
+            else:
+                self.layers.append((kind, self._fuse_gates(*weights)))
+
+    @staticmethod
+    def _fuse_gates(kernel, recurrent_kernel, bias):
+        """
+        Urutan gate Keras [i, f, c, o] -> [i, f, o, c], dengan gate sigmoid diskalakan 0.5.
+        """
+        units = recurrent_kernel.shape[0]
+        order = np.r_[0:2 * units, 3 * units:4 * units, 2 * units:3 * units]
+        scale = np.ones(4 * units, dtype=np.float32)
+        scale[:3 * units] = 0.5
+        return tuple(np.ascontiguousarray(weight[..., order] * scale, dtype=np.float32)
+                     for weight in (kernel, recurrent_kernel, bias))
+
+    @classmethod
+    def stack(cls, models):
+        """
+        Menumpuk beberapa model dengan `weights_signature()` yang sama menjadi satu model bertumpuk.
+
+        Raises:
+            ValueError: Jika topologi atau ukuran bobot model berbeda
+        """
+        signature = models[0].weights_signature()
+        if any(model.weights_signature() != signature for model in models[1:]):
+            raise ValueError("Model dengan topologi atau ukuran bobot berbeda tidak bisa ditumpuk")
+        stacked = cls.__new__(cls)
+        stacked.layers = []
+        for index, (kind, weights) in enumerate(models[0].layers):
+            arrays = []
+            for position in range(len(weights)):
+                array = np.stack([model.layers[index][1][position] for model in models])
+                # Bias (model, n) -> (model, 1, n) agar ter-broadcast ke setiap sampel batch
+                arrays.append(array[:, None, :] if array.ndim == 2 else array)
+            stacked.layers.append((kind, tuple(arrays)))
+        return stacked
+
+    def weights_signature(self):
+        """
+        Jenis layer dan ukuran bobot; model dengan signature sama bisa ditumpuk (lihat `stack`).
+        """
+        return tuple((kind, tuple(weight.shape for weight in weights)) for kind, weights in self.layers)
+
+    def count_params(self):
+        return sum(weight.size for _, weights in self.layers for weight in weights)
+
+    def predict(self, X, verbose=0, batch_size=None):
+        """
+        Forward pass untuk batch input berbentuk (batch, lookback, fitur), atau
+        (model, batch, lookback, fitur) untuk model hasil `stack`.
+
+        Args:
+            X (array): Input model
+            batch_size (int): Jumlah sampel per potongan (default: MAX_BATCH)
+
+        Returns:
+            array: Prediksi float32 berbentuk (batch, output_units) atau (model, batch, output_units)
+        """
+        X = np.asarray(X, dtype=np.float32)
+        batch_size = batch_size or self.MAX_BATCH
+        # Potong pada sumbu sampel (bukan sumbu model untuk input bertumpuk)
+        samples = X.shape[-3]
+        if samples <= batch_size:
+            return self._forward(X)
+        return np.concatenate([self._forward(X[..., i:i + batch_size, :, :]) for i in range(0, samples, batch_size)],
+                              axis=-2)
+
+    def _forward(self, X):
+        # (batch, waktu, fitur) -> (waktu, batch, fitur); model bertumpuk: (model, batch, ...) -> (waktu, model, batch, fitur)
+        outputs = np.ascontiguousarray(np.moveaxis(X, -2, 0))
+        for kind, weights in self.layers:
+            if kind == 'dense':
+                kernel, bias = weights
+                outputs = outputs @ kernel
+                outputs += bias
+            else:
+                outputs = self._lstm(outputs, *weights, return_sequences=(kind == 'lstm_seq'))
+        return outputs
+
+    @staticmethod
+    def _lstm(inputs, kernel, recurrent_kernel, bias, return_sequences):
+        # inputs (waktu, batch, fitur); model bertumpuk: (waktu, model, batch, fitur) dengan bobot (model, ...)
+        timesteps, *lead, features = inputs.shape
+        lead = tuple(lead)
+        units = recurrent_kernel.shape[-2]
+
+        # Proyeksi input seluruh langkah waktu sekaligus: (waktu, ..., 4*units)
+        if kernel.ndim == 2:
+            projected = (inputs.reshape(-1, features) @ kernel).reshape(timesteps, *lead, 4 * units)
+        else:
+            projected = inputs @ kernel
+        projected += bias
+
+        h = np.zeros(lead + (units,), dtype=np.float32)
+        c = np.zeros(lead + (units,), dtype=np.float32)
+        z = np.empty(lead + (4 * units,), dtype=np.float32)
+        ig = np.empty(lead + (units,), dtype=np.float32)
+        sequence = np.empty((timesteps,) + lead + (units,), dtype=np.float32) if return_sequences else None
+
+        for t in range(timesteps):
+            np.matmul(h, recurrent_kernel, out=z)
+            z += projected[t]
+            np.tanh(z, out=z)
+            # tanh(x/2) -> sigmoid(x) untuk gate i, f, o
+            sigmoid = z[..., :3 * units]
+            sigmoid *= 0.5
+            sigmoid += 0.5
+            i, f, o, g = z[..., :units], z[..., units:2 * units], z[..., 2 * units:3 * units], z[..., 3 * units:]
+
+            # c = f * c + i * g ; h = o * tanh(c)
+            c *= f
+            np.multiply(i, g, out=ig)
+            c += ig
+            np.tanh(c, out=h)
+            h *= o
+            if return_sequences:
+                sequence[t] = h
+        return sequence if return_sequences else h
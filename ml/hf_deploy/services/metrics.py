@@ -0,0 +1,311 @@
+import bisect
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Batas bucket histogram durasi (detik): dari pembacaan cache mikrodetik sampai unduhan Yahoo Finance
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _ThreadShards:
+    """
+    Penyimpanan nilai metrik per thread.
+
+    Setiap thread menulis ke shard miliknya sendiri, sehingga jalur panas (`inc` / `observe`) tidak
+    membutuhkan lock: tidak ada dua thread yang mengubah objek yang sama. Lock hanya dipakai saat
+    thread pertama kali membuat shard dan saat scrape menjumlahkan semua shard.
+    Shard milik thread yang sudah selesai tetap disimpan agar nilai counter tidak pernah turun.
+    """
+    def __init__(self, size):
+        self.size = size
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+
+    def get(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = [0.0] * self.size
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def total(self):
+        with self._lock:
+            shards = list(self._shards)
+        return [sum(values) for values in zip(*shards)] if shards else [0.0] * self.size
+
+
+class _CounterChild:
+    def __init__(self):
+        self._shards = _ThreadShards(1)
+
+    def inc(self, amount=1):
+        self._shards.get()[0] += amount
+
+    def value(self):
+        return self._shards.total()[0]
+
+
+class _Timer:
+    """
+    Context manager yang mencatat durasi blok ke histogram.
+    """
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class _ObservedTimer(_Timer):
+    """
+    Timer tahap yang juga meneruskan durasinya ke pengamat tahap (cth: profiler).
+    """
+    __slots__ = ('stage',)
+
+    def __init__(self, histogram, stage):
+        super().__init__(histogram)
+        self.stage = stage
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        self.histogram.observe(elapsed)
+        for observer in _STAGE_OBSERVERS:
+            observer(self.stage, elapsed)
+        return False
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # Susunan shard: [jumlah per bucket (+Inf di akhir)..., total nilai]
+        self._shards = _ThreadShards(len(buckets) + 2)
+
+    def observe(self, value):
+        shard = self._shards.get()
+        shard[bisect.bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+
+    def time(self):
+        return _Timer(self)
+
+    def snapshot(self):
+        """
+        Returns:
+            tuple: (jumlah kumulatif per bucket termasuk +Inf, total nilai)
+        """
+        values = self._shards.total()
+        cumulative, running = [], 0
+        for count in values[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, values[-1]
+
+
+class _Metric:
+    """
+    Dasar metrik berlabel. `labels(...)` mengembalikan child yang disimpan, jadi pemanggil di jalur panas
+    sebaiknya menyimpan child tersebut (atau memanggil `labels` yang cukup berupa lookup dictionary).
+    """
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        (REGISTRY if registry is None else registry).register(self)
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"Metrik {self.name} membutuhkan label {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _label_text(self, values, extra=()):
+        pairs = list(zip(self.labelnames, values)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{key}="{_escape(str(value))}"' for key, value in pairs) + '}'
+
+    def collect(self):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """
+    Counter yang hanya bisa naik (cth: jumlah cache hit).
+    """
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        super().__init__(name, documentation, labelnames, registry)
+        if not self.labelnames:
+            # Metrik tanpa label langsung tampil bernilai 0
+            self.labels()
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def collect(self):
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{self._label_text(values)} {_format(child.value())}"
+
+
+class Histogram(_Metric):
+    """
+    Histogram durasi dengan bucket tetap (format histogram Prometheus: _bucket, _sum, _count).
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+        if not self.labelnames:
+            self.labels()
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def collect(self):
+        for values, child in list(self._children.items()):
+            cumulative, total = child.snapshot()
+            for bound, count in zip(self.buckets + (math.inf,), cumulative):
+                yield f"{self.name}_bucket{self._label_text(values, [('le', _format(bound))])} {_format(count)}"
+            yield f"{self.name}_sum{self._label_text(values)} {_format(total)}"
+            yield f"{self.name}_count{self._label_text(values)} {_format(cumulative[-1])}"
+
+
+class CallbackMetric(_Metric):
+    """
+    Metrik yang nilainya dibaca saat scrape dari fungsi callback (cth: ukuran cache model).
+    Tidak menambah biaya apa pun di jalur request.
+
+    Callback mengembalikan dictionary {tuple_nilai_label: angka}.
+    """
+    def __init__(self, name, documentation, callback, labelnames=(), kind='gauge', registry=None):
+        self.kind = kind
+        self.callback = callback
+        super().__init__(name, documentation, labelnames, registry)
+
+    def collect(self):
+        for values, value in self.callback().items():
+            yield f"{self.name}{self._label_text(values)} {_format(value)}"
+
+
+class MetricsRegistry:
+    """
+    Kumpulan metrik yang dirender ke format teks Prometheus (version 0.0.4) oleh endpoint /metrics.
+    """
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metrik {metric.name} sudah terdaftar")
+            self._metrics[metric.name] = metric
+
+    def unregister(self, name):
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                samples = list(metric.collect())
+            except Exception as e:
+                # Satu callback yang gagal tidak boleh menggagalkan seluruh scrape
+                logger.warning("METRICS: Gagal mengumpulkan %s: %s", metric.name, e)
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# Registry bawaan untuk seluruh layanan
+REGISTRY = MetricsRegistry()
+
+# Durasi setiap tahap jalur prediksi (cache read, unduhan, muat model/scaler, normalisasi, predict, serialisasi)
+STAGE_SECONDS = Histogram('finsight_stage_seconds', 'Durasi tahap pemrosesan prediksi dalam detik', ['stage'])
+# Durasi request HTTP per route
+REQUEST_SECONDS = Histogram('finsight_http_request_seconds', 'Durasi request HTTP dalam detik',
+                            ['method', 'route', 'status'])
+# Hasil pemeriksaan cache harga: hit, miss (belum ada cache), stale (kadaluarsa), fallback (cache lama dipakai saat API error)
+PRICE_CACHE_EVENTS = Counter('finsight_price_cache_total', 'Hasil pemeriksaan cache harga', ['result'])
+# Percobaan unduhan ke Yahoo Finance: ok / error, dan jumlah retry setelah percobaan gagal
+UPSTREAM_ATTEMPTS = Counter('finsight_upstream_attempts_total', 'Percobaan unduhan data ke Yahoo Finance', ['outcome'])
+UPSTREAM_RETRIES = Counter('finsight_upstream_retries_total', 'Retry unduhan data ke Yahoo Finance')
+
+# Fungsi `observer(stage, detik)` yang dipanggil setiap tahap selesai; kosong kecuali profiler diaktifkan
+_STAGE_OBSERVERS = []
+
+
+def add_stage_observer(observer):
+    """
+    Mendaftarkan pengamat durasi tahap. Dipanggil di thread yang menjalankan tahap, jadi harus cepat.
+    """
+    if observer not in _STAGE_OBSERVERS:
+        _STAGE_OBSERVERS.append(observer)
+
+
+def remove_stage_observer(observer):
+    if observer in _STAGE_OBSERVERS:
+        _STAGE_OBSERVERS.remove(observer)
+
+
+def stage(name):
+    """
+    Timer untuk satu tahap: `with stage('predict'): ...`.
+    Tanpa pengamat terdaftar, timer hanya mengisi histogram `finsight_stage_seconds`.
+    """
+    if _STAGE_OBSERVERS:
+        return _ObservedTimer(STAGE_SECONDS.labels(name), name)
+    return STAGE_SECONDS.labels(name).time()
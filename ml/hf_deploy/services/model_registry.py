@@ -0,0 +1,152 @@
+import os
+import logging
+import time
+import threading
+from collections import OrderedDict
+from services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class RegistryEntry:
+    """
+    Satu artefak (model/scaler) yang tersimpan di memori beserta statistiknya.
+    """
+    def __init__(self, value, signature, nbytes, load_time):
+        self.value = value
+        self.signature = signature  # (mtime_ns, ukuran file) saat artefak dimuat
+        self.nbytes = nbytes        # Perkiraan memori yang dipakai
+        self.load_time = load_time  # Lama waktu memuat dari disk (detik)
+        self.hits = 0
+
+
+def file_signature(path):
+    """
+    Sidik file di disk (waktu modifikasi dan ukuran) untuk mendeteksi artefak yang berubah.
+    """
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def estimate_nbytes(value, path):
+    """
+    Perkiraan memori sebuah artefak.
+    Model Keras dihitung dari jumlah parameternya (float32), selain itu dipakai ukuran file di disk.
+    """
+    if hasattr(value, 'count_params'):
+        return value.count_params() * 4
+    return os.path.getsize(path)
+
+
+class ModelRegistry:
+    """
+    Cache memori ber-batas untuk model dan scaler dengan kebijakan LRU (Least Recently Used).
+
+    - Dibatasi jumlah entri (`max_entries`) dan/atau total byte (`max_bytes`).
+    - Entri yang paling lama tidak dipakai dikeluarkan lebih dulu saat batas terlampaui.
+    - Entri otomatis dimuat ulang jika file di disk berubah (mtime/ukuran berbeda).
+    - Mencatat statistik hit/miss, eviction, dan lama waktu muat per entri.
+    """
+    def __init__(self, max_entries=None, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Request bersamaan untuk artefak yang sama hanya memuat dari disk satu kali
+        self._flights = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, path, loader):
+        """
+        Mengambil artefak dari cache, atau memuatnya dengan `loader(path)` jika belum ada/berubah.
+        """
+        signature = file_signature(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                entry.hits += 1
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry.value
+            if entry is not None:
+                # File di disk sudah berubah (cth: model dilatih ulang), buang versi lama
+                logger.info("Artefak %s berubah di disk, memuat ulang...", key)
+                self._remove(key)
+                self.invalidations += 1
+            self.misses += 1
+
+        return self._flights.do(key, self._load, key, path, loader, signature)
+
+    def _load(self, key, path, loader, signature):
+        """
+        Memuat artefak dari disk lalu menyimpannya ke cache (dijalankan sekali per key secara bersamaan).
+        """
+        start = time.perf_counter()
+        value = loader(path)
+        entry = RegistryEntry(value, signature, estimate_nbytes(value, path), time.perf_counter() - start)
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+        return value
+
+    def invalidate(self, key=None):
+        """
+        Menghapus satu entri (atau seluruh cache jika key=None) secara eksplisit.
+        """
+        with self._lock:
+            keys = list(self._entries) if key is None else [key]
+            for k in keys:
+                if k in self._entries:
+                    self._remove(k)
+                    self.invalidations += 1
+
+    @property
+    def total_bytes(self):
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def stats(self):
+        """
+        Ringkasan statistik cache untuk monitoring.
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'total_bytes': self.total_bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'items': {
+                    key: {'nbytes': entry.nbytes, 'load_time': entry.load_time, 'hits': entry.hits}
+                    for key, entry in self._entries.items()
+                },
+            }
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        del self._entries[key]
+
+    def _evict(self):
+        """
+        Mengeluarkan entri LRU sampai batas jumlah entri dan byte terpenuhi.
+        Entri terbaru selalu dipertahankan meskipun ukurannya sendiri melebihi batas.
+        """
+        while len(self._entries) > 1 and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+        ):
+            key, _ = self._entries.popitem(last=False)
+            self.evictions += 1
+            logger.info("Mengeluarkan %s dari cache model (LRU)", key)
@@ -1,8 +1,19 @@
+import tensorflow as tf
 from tensorflow.keras.models import Sequential, load_model
 from tensorflow.keras.layers import LSTM, Dense, Dropout
-import matplotlib.pyplot as plt
+from tensorflow.keras.optimizers import Adam
+import joblib
+import logging
+import numpy as np
 import os
-from services.data_service import load_and_process_data
+import time
+from services.data_service import fetch_data, load_and_process_data, load_scaled_data, create_sequences, train_size_for
+from services.inference import bundle_from_keras, save_bundle, load_bundle
+from services.scaling import save_params, scaler_params_path
+from services.plotting import PLOT_RENDERER, render_lines
+from services.checkpoint import ResumableEarlyStopping, TrainingCheckpoint, load_checkpoint, clear_checkpoint
+
+logger = logging.getLogger(__name__)
 
 def build_model(input_shape, output_units, units=50, dropout_rate=0.2):
     """
@@ -48,75 +59,349 @@ def build_model(input_shape, output_units, units=50, dropout_rate=0.2):
     
     return model
 
-def train_model(conf, symbol='USDIDR=X'):
+def make_window_dataset(series, lookback, prediction_days, start, stop, batch_size,
+                        shuffle=False, shuffle_buffer=None, cache=False, seed=None):
+    """
+    Membangun dataset tf.data berisi pasangan (X, y) sliding window secara lazy.
+
+    Yang disimpan hanya deret harga (float32) dan index awal window; window setiap batch
+    dibentuk saat dibutuhkan dengan satu `tf.gather`, sehingga memori sebanding dengan panjang
+    deret, bukan deret x lookback. Batch berikutnya disiapkan paralel dengan komputasi model (prefetch).
+    Sampel ke-i identik dengan create_sequences: X = series[i:i+lookback], y = series[i+lookback:i+lookback+prediction_days].
+
+    Args:
+        series (array): Data harga ternormalisasi, bentuk (n,) atau (n, 1)
+        lookback (int): Jumlah langkah waktu ke belakang (Input X)
+        prediction_days (int): Jumlah langkah waktu ke depan (Target y)
+        start, stop (int): Rentang index sampel yang dipakai (untuk split latih/uji)
+        batch_size (int): Jumlah sampel per batch
+        shuffle (bool): Acak urutan sampel setiap epoch (untuk data latih)
+        shuffle_buffer (int): Ukuran buffer shuffle; None = seluruh sampel
+        cache (bool): Simpan batch di memori setelah iterasi pertama (hanya untuk dataset tanpa shuffle)
+        seed (int): Seed shuffle (opsional)
+
+    Returns:
+        tf.data.Dataset: Batch (X [batch, lookback, 1], y [batch, prediction_days]) float32
+    """
+    # Model Keras menghitung dalam float32; deret float32 tidak perlu dikonversi lagi
+    series = tf.constant(np.asarray(series, dtype=np.float32).reshape(-1))
+    x_offsets = tf.range(lookback, dtype=tf.int64)
+    y_offsets = tf.range(lookback, lookback + prediction_days, dtype=tf.int64)
+
+    def to_windows(index):
+        # index: [batch] -> matriks index window [batch, lookback] dan [batch, prediction_days]
+        index = index[:, tf.newaxis]
+        X = tf.gather(series, index + x_offsets)[..., tf.newaxis]
+        y = tf.gather(series, index + y_offsets)
+        return X, y
+
+    dataset = tf.data.Dataset.range(start, stop)
+    if shuffle:
+        dataset = dataset.shuffle(shuffle_buffer or (stop - start), seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size).map(to_windows, num_parallel_calls=tf.data.AUTOTUNE)
+    if cache and not shuffle:
+        dataset = dataset.cache()
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+def load_training_data(conf, symbol, scaler_path, pipeline=None):
+    """
+    Menyiapkan data latih & validasi sesuai pipeline input (`conf.INPUT_PIPELINE`).
+
+    Returns:
+        tuple: (train_data, val_data, X_test, y_test, scaler). Untuk pipeline 'numpy', train_data dan
+        val_data berupa tuple (X, y); untuk 'tfdata' berupa tf.data.Dataset. X_test & y_test selalu
+        array numpy (view) untuk evaluasi.
+    """
+    pipeline = pipeline or conf.INPUT_PIPELINE
+    if pipeline == 'numpy':
+        X_train, y_train, X_test, y_test, scaler = load_and_process_data(conf, symbol, scaler_path, save_scaler=True)
+        return (X_train, y_train), (X_test, y_test), X_test, y_test, scaler
+    if pipeline != 'tfdata':
+        raise ValueError(f"Pipeline input tidak dikenal: {pipeline}")
+
+    scaled_data, scaler = load_scaled_data(conf, symbol, scaler_path, save_scaler=True)
+
+    # View sliding window (tanpa salinan) hanya dipakai untuk menghitung split dan evaluasi
+    X, y = create_sequences(scaled_data, conf.LOOKBACK_WINDOW, conf.PREDICTION_STEPS)
+    train_size = train_size_for(len(X), conf.TEST_SIZE)
+
+    window = dict(lookback=conf.LOOKBACK_WINDOW, prediction_days=conf.PREDICTION_STEPS, batch_size=conf.BATCH_SIZE)
+    train_ds = make_window_dataset(scaled_data, start=0, stop=train_size, shuffle=True,
+                                   shuffle_buffer=conf.SHUFFLE_BUFFER, **window)
+    val_ds = make_window_dataset(scaled_data, start=train_size, stop=len(X), cache=conf.PIPELINE_CACHE, **window)
+
+    X_test = X[train_size:].reshape(-1, conf.LOOKBACK_WINDOW, 1)
+    return train_ds, val_ds, X_test, y[train_size:], scaler
+
+def fit_model(model, train_data, val_data, epochs, batch_size, verbose=1, callbacks=None, initial_epoch=0):
+    """
+    Menjalankan model.fit untuk data numpy (tuple X, y) maupun tf.data.Dataset.
+    """
+    if isinstance(train_data, tf.data.Dataset):
+        # Shuffle sudah dilakukan di dalam dataset
+        return model.fit(train_data, epochs=epochs, validation_data=val_data, shuffle=False,
+                         verbose=verbose, callbacks=callbacks, initial_epoch=initial_epoch)
+    X_train, y_train = train_data
+    return model.fit(X_train, y_train, epochs=epochs, batch_size=batch_size,
+                     validation_data=val_data, verbose=verbose, callbacks=callbacks, initial_epoch=initial_epoch)
+
+def export_model(conf, symbol='USDIDR=X', model=None):
+    """
+    Mengekspor model Keras menjadi bundle bobot NumPy (.npz) untuk runtime inferensi tanpa TensorFlow
+    (lihat services/inference.py). Hasil ekspor diverifikasi terhadap output Keras sebelum dipakai.
+    Scaler sklearn (.pkl) lama yang belum memiliki sidecar parameter (.json) ikut dikonversi.
+
+    Args:
+        conf (Config): Objek konfigurasi (Hourly/Daily)
+        symbol (str): Simbol mata uang
+        model: Model Keras yang sudah dimuat (opsional, default: dimuat dari file .h5)
+
+    Returns:
+        str: Lokasi file bundle bobot
+
+    Raises:
+        ValueError: Jika output runtime NumPy berbeda dari output Keras
+    """
+    paths = conf.get_paths(symbol)
+    if model is None:
+        model = load_model(paths['model'], compile=False)
+
+    bundle = bundle_from_keras(model, dtype=conf.WEIGHTS_STORAGE_DTYPE)
+    save_bundle(bundle, paths['weights'])
+
+    # Uji kesamaan numerik (parity) pada input acak di rentang data ternormalisasi;
+    # bobot float16 hanya akurat sekitar 3 digit sehingga toleransinya lebih longgar
+    X = np.random.default_rng(0).random((8, conf.LOOKBACK_WINDOW, 1), dtype=np.float32)
+    expected = model.predict(X, verbose=0)
+    actual = load_bundle(paths['weights']).predict(X)
+    rtol, atol = (1e-2, 1e-3) if np.dtype(conf.WEIGHTS_STORAGE_DTYPE) == np.float16 else (1e-4, 1e-5)
+    if not np.allclose(actual, expected, rtol=rtol, atol=atol):
+        os.remove(paths['weights'])
+        raise ValueError(f"Output bundle NumPy berbeda dari Keras (selisih maks {np.abs(actual - expected).max():.2e})")
+
+    logger.info("Bundle bobot inferensi disimpan ke %s", paths['weights'])
+
+    params_path = scaler_params_path(paths['scaler'])
+    if os.path.exists(paths['scaler']) and (
+            not os.path.exists(params_path) or os.path.getmtime(params_path) < os.path.getmtime(paths['scaler'])):
+        save_params(joblib.load(paths['scaler']), params_path)
+        logger.info("Parameter scaler disimpan ke %s", params_path)
+    return paths['weights']
+
+def train_model(conf, symbol='USDIDR=X', resume=False):
     """
     Fungsi utama untuk melatih model LSTM.
     Melakukan proses end-to-end: Load Data -> Build Model -> Train -> Save -> Eval.
+
+    Pelatihan berhenti lebih awal saat val loss tidak membaik selama `EARLY_STOPPING_PATIENCE` epoch
+    (bobot terbaik dikembalikan), dan checkpoint ditulis setiap `CHECKPOINT_EVERY` epoch di samping
+    file model sehingga pelatihan yang terputus dapat dilanjutkan dengan `resume=True`.
     
     Args:
         conf (Config): Objek konfigurasi (Hourly/Daily)
         symbol (str): Simbol mata uang yang akan dilatih
+        resume (bool): Lanjutkan dari checkpoint terakhir (termasuk state optimizer) jika ada
+
+    Returns:
+        dict: Ringkasan pelatihan (jumlah epoch, loss akhir, val loss akhir, durasi,
+        serta epoch & waktu yang dihemat oleh early stopping / resume)
     """
-    print(f"Memulai pelatihan mode {conf.MODE.upper()} untuk {symbol}...")
+    logger.info("Memulai pelatihan mode %s untuk %s...", conf.MODE.upper(), symbol)
+    start_time = time.perf_counter()
     
     # Dapatkan path dinamis berdasarkan simbol
     paths = conf.get_paths(symbol)
 
-    # 1. Load dan Proses Data
-    X_train, y_train, X_test, y_test, scaler = load_and_process_data(conf, symbol, paths['scaler'], save_scaler=True)
+    # 1. Load dan Proses Data (pipeline numpy atau tf.data, lihat conf.INPUT_PIPELINE)
+    train_data, val_data, X_test, y_test, scaler = load_training_data(conf, symbol, paths['scaler'])
     
-    print(f"Data latih shape: {X_train.shape}")
-    print(f"Data uji shape: {X_test.shape}")
-
-    # 2. Bangun Model
-    model = build_model(
-        input_shape=(X_train.shape[1], 1),
-        output_units=conf.PREDICTION_STEPS,
-        units=conf.UNITS,
-        dropout_rate=conf.DROPOUT_RATE
-    )
+    logger.info("Pipeline input: %s", conf.INPUT_PIPELINE)
+    logger.info("Data uji shape: %s", X_test.shape)
+
+    # 2. Bangun Model (atau lanjutkan dari checkpoint)
+    model, state = load_checkpoint(paths['model']) if resume else (None, None)
+    if model is not None:
+        logger.info("Melanjutkan pelatihan dari checkpoint epoch %d", state['epoch'])
+    else:
+        if resume:
+            logger.info("Checkpoint tidak ditemukan, memulai pelatihan dari awal")
+        state = {}
+        model = build_model(
+            input_shape=(conf.LOOKBACK_WINDOW, 1),
+            output_units=conf.PREDICTION_STEPS,
+            units=conf.UNITS,
+            dropout_rate=conf.DROPOUT_RATE
+        )
     # Tampilkan ringkasan arsitektur model di terminal
     model.summary()
 
-    # 3. Latih Model (Fitting)
-    history = model.fit(
-        X_train, y_train,
+    # 3. Latih Model (Fitting) dengan early stopping & checkpoint berkala
+    callbacks = []
+    early_stopping = None
+    if conf.EARLY_STOPPING:
+        early_stopping_state = state.get('early_stopping')
+        if early_stopping_state is not None:
+            early_stopping_state['best_weights'] = state.get('best_weights')
+        early_stopping = ResumableEarlyStopping(
+            resume_state=early_stopping_state,
+            monitor='val_loss',
+            patience=conf.EARLY_STOPPING_PATIENCE,
+            min_delta=conf.EARLY_STOPPING_MIN_DELTA,
+            restore_best_weights=True,
+            verbose=1
+        )
+        callbacks.append(early_stopping)
+    # Checkpoint dipasang setelah early stopping agar state early stopping epoch ini ikut tersimpan
+    checkpoint = TrainingCheckpoint(paths['model'], every=conf.CHECKPOINT_EVERY,
+                                    early_stopping=early_stopping, resume_state=state)
+    callbacks.append(checkpoint)
+
+    fit_model(
+        model, train_data, val_data,
         epochs=conf.EPOCHS,
         batch_size=conf.BATCH_SIZE,
-        validation_data=(X_test, y_test),
-        verbose=1 # Tampilkan progress bar
+        verbose=1, # Tampilkan progress bar
+        callbacks=callbacks,
+        initial_epoch=state.get('epoch', 0)
     )
+    # Riwayat lengkap, termasuk epoch sebelum resume
+    history = checkpoint.history
 
-    # 4. Simpan Model (.h5)
+    # 4. Simpan Model (.h5), lalu checkpoint tidak diperlukan lagi
     os.makedirs(os.path.dirname(paths['model']), exist_ok=True)
     model.save(paths['model'])
-    print(f"Model berhasil disimpan ke {paths['model']}")
-
-    # 5. Plot Loss (Grafik Penurunan Error)
-    plt.figure(figsize=(10, 6))
-    plt.plot(history.history['loss'], label='Train Loss (Error Latih)')
-    plt.plot(history.history['val_loss'], label='Validation Loss (Error Validasi)')
-    plt.title(f'Model Loss ({conf.MODE.upper()} - {symbol})')
-    plt.xlabel('Epochs (Iterasi)')
-    plt.ylabel('Loss (MSE)')
-    plt.legend()
-    plt.savefig(paths['loss_plot'])
-    print(f"Grafik Loss disimpan ke {paths['loss_plot']}")
+    clear_checkpoint(paths['model'])
+    logger.info("Model berhasil disimpan ke %s", paths['model'])
+    export_model(conf, symbol, model=model)
+
+    # 5. Plot Loss (Grafik Penurunan Error), dirender di worker plot tanpa menunggu
+    PLOT_RENDERER.submit(
+        render_lines, paths['loss_plot'],
+        [(None, history['loss'], dict(label='Train Loss (Error Latih)')),
+         (None, history['val_loss'], dict(label='Validation Loss (Error Validasi)'))],
+        title=f'Model Loss ({conf.MODE.upper()} - {symbol})',
+        xlabel='Epochs (Iterasi)',
+        ylabel='Loss (MSE)'
+    )
 
     # 6. Evaluasi pada Data Test (Visualisasi Prediksi vs Asli)
-    predictions = model.predict(X_test)
+    predictions = model.predict(val_data if isinstance(val_data, tf.data.Dataset) else X_test)
     
     # Kita hanya memplot langkah pertama (Step 1) untuk melihat trend umum
     # Inverse transform untuk mengembalikan nilai ke harga asli (Rupiah/Dollar)
     pred_step1 = scaler.inverse_transform(predictions[:, 0].reshape(-1, 1))
     actual_step1 = scaler.inverse_transform(y_test[:, 0].reshape(-1, 1))
 
-    plt.figure(figsize=(10, 6))
-    plt.plot(actual_step1, color='blue', label=f'Harga Asli (Next {conf.TIME_UNIT[:-1]})')
-    plt.plot(pred_step1, color='red', label=f'Harga Prediksi (Next {conf.TIME_UNIT[:-1]})')
-    plt.title(f'Prediksi Mata Uang ({conf.MODE} - {symbol})')
-    plt.xlabel(f'Waktu ({conf.TIME_UNIT})')
-    plt.ylabel('Harga')
-    plt.legend()
-    plt.savefig(paths['prediction_plot'])
-    print(f"Grafik Prediksi disimpan ke {paths['prediction_plot']}")
+    PLOT_RENDERER.submit(
+        render_lines, paths['prediction_plot'],
+        [(None, actual_step1, dict(color='blue', label=f'Harga Asli (Next {conf.TIME_UNIT[:-1]})')),
+         (None, pred_step1, dict(color='red', label=f'Harga Prediksi (Next {conf.TIME_UNIT[:-1]})'))],
+        title=f'Prediksi Mata Uang ({conf.MODE} - {symbol})',
+        xlabel=f'Waktu ({conf.TIME_UNIT})',
+        ylabel='Harga'
+    )
+
+    # Epoch yang tidak perlu dijalankan karena early stopping, dan perkiraan waktu yang dihemat
+    # (rata-rata durasi epoch x epoch yang dilewati, ditambah durasi epoch yang dipakai ulang dari checkpoint)
+    epochs_run = len(history['loss'])
+    epochs_saved = conf.EPOCHS - epochs_run
+    mean_epoch_time = float(np.mean(checkpoint.epoch_times)) if checkpoint.epoch_times else 0.0
+    resumed_time = float(sum(checkpoint.epoch_times[:checkpoint.resumed_epochs]))
+    # Model yang disimpan memakai bobot epoch terbaik, jadi kedua loss dilaporkan dari epoch yang sama
+    best_epoch = early_stopping.best_epoch if early_stopping is not None else epochs_run - 1
+
+    return {
+        'symbol': symbol,
+        'mode': conf.MODE,
+        'epochs': epochs_run,
+        'best_epoch': best_epoch + 1,
+        'final_loss': float(history['loss'][best_epoch]),
+        'final_val_loss': float(history['val_loss'][best_epoch]),
+        'resumed_from_epoch': checkpoint.resumed_epochs,
+        'epochs_saved': epochs_saved,
+        'wall_time_saved': epochs_saved * mean_epoch_time + resumed_time,
+        'wall_time': time.perf_counter() - start_time,
+    }
+
+def fine_tune_model(conf, symbol='USDIDR=X'):
+    """
+    Warm-start: melanjutkan pelatihan model yang sudah ada pada data terbaru, alih-alih melatih ulang
+    dari nol di seluruh riwayat.
+
+    Model (.h5) dan scaler yang sudah ada dimuat, lalu model di-fine-tune selama `FINE_TUNE_EPOCHS`
+    epoch dengan learning rate kecil pada `FINE_TUNE_BARS` bar terakhir. Ekor data (holdout, sebesar
+    TEST_SIZE) tidak ikut dilatih dan dipakai untuk membandingkan model lama dengan kandidat.
+    Kandidat hanya menggantikan model lama (secara atomik) jika loss holdout-nya tidak lebih buruk.
+    Scaler tidak diubah agar skala input tetap sama dengan model yang sudah ada.
+
+    Jika model belum pernah dilatih, fungsi ini menjalankan pelatihan penuh (train_model).
+
+    Args:
+        conf (Config): Objek konfigurasi (Hourly/Daily)
+        symbol (str): Simbol mata uang
+
+    Returns:
+        dict: Ringkasan fine-tuning (loss holdout model lama & kandidat, status promosi, durasi)
+    """
+    paths = conf.get_paths(symbol)
+    if not (os.path.exists(paths['model']) and os.path.exists(paths['scaler'])):
+        logger.info("Model %s (%s) belum ada, menjalankan pelatihan penuh...", symbol, conf.MODE)
+        return train_model(conf, symbol=symbol)
+
+    logger.info("Memulai fine-tuning mode %s untuk %s...", conf.MODE.upper(), symbol)
+    start_time = time.perf_counter()
+
+    # 1. Data terbaru saja, dinormalisasi dengan scaler yang sudah ada
+    df = fetch_data(symbol, conf.START_DATE, conf.END_DATE, interval=conf.INTERVAL)
+    df = df.iloc[-conf.FINE_TUNE_BARS:]
+    scaler = joblib.load(paths['scaler'])
+    scaled_data = scaler.transform(df.to_numpy(dtype=conf.DTYPE))
+
+    X, y = create_sequences(scaled_data, conf.LOOKBACK_WINDOW, conf.PREDICTION_STEPS)
+    X = np.reshape(X, (X.shape[0], X.shape[1], 1))
+    train_size = train_size_for(len(X), conf.TEST_SIZE)
+    if train_size == 0 or train_size == len(X):
+        raise ValueError(f"Data terbaru terlalu sedikit untuk fine-tuning ({len(df)} bar)")
+    X_train, y_train = X[:train_size], y[:train_size]
+    X_holdout, y_holdout = X[train_size:], y[train_size:]
+
+    # 2. Muat model lama dan ukur loss-nya pada holdout sebagai acuan
+    model = load_model(paths['model'], compile=False)
+    model.compile(optimizer=Adam(learning_rate=conf.FINE_TUNE_LEARNING_RATE), loss='mean_squared_error')
+    current_loss = float(model.evaluate(X_holdout, y_holdout, batch_size=conf.BATCH_SIZE, verbose=0))
+
+    # 3. Fine-tune pada data terbaru (tanpa holdout)
+    history = fit_model(
+        model, (X_train, y_train), None,
+        epochs=conf.FINE_TUNE_EPOCHS,
+        batch_size=conf.BATCH_SIZE,
+        verbose=1
+    )
+    candidate_loss = float(model.evaluate(X_holdout, y_holdout, batch_size=conf.BATCH_SIZE, verbose=0))
+
+    # 4. Promosikan kandidat hanya jika tidak ada regresi
+    promoted = candidate_loss <= current_loss * (1 + conf.FINE_TUNE_TOLERANCE)
+    if promoted:
+        # Tulis ke file sementara lalu os.replace agar API tidak pernah membaca file setengah jadi
+        tmp_path = f"{os.path.splitext(paths['model'])[0]}.tmp.h5"
+        model.save(tmp_path)
+        os.replace(tmp_path, paths['model'])
+        export_model(conf, symbol, model=model)
+        logger.info("Model hasil fine-tuning dipromosikan ke %s (holdout loss %.6f -> %.6f)",
+                    paths['model'], current_loss, candidate_loss)
+    else:
+        logger.info("Model hasil fine-tuning ditolak: holdout loss %.6f lebih buruk dari model lama %.6f",
+                    candidate_loss, current_loss)
+
+    return {
+        'symbol': symbol,
+        'mode': conf.MODE,
+        'strategy': 'finetune',
+        'epochs': len(history.history['loss']),
+        'final_loss': float(history.history['loss'][-1]),
+        'current_val_loss': current_loss,
+        'final_val_loss': candidate_loss if promoted else current_loss,
+        'candidate_val_loss': candidate_loss,
+        'promoted': promoted,
+        'wall_time': time.perf_counter() - start_time,
+    }
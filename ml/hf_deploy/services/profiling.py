@@ -0,0 +1,286 @@
+import collections
+import contextvars
+import cProfile
+import hmac
+import io
+import itertools
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from datetime import datetime
+import numpy as np
+from core.config import BaseConfig
+from services.metrics import add_stage_observer
+
+logger = logging.getLogger(__name__)
+
+# Header request yang meminta profil (nilainya harus sama dengan PROFILING_TOKEN)
+PROFILE_HEADER = 'x-finsight-profile'
+
+# Label request yang sedang diproses (cth: 'hourly:USDIDR=X'); ikut tersalin ke thread `asyncio.to_thread`
+REQUEST_LABEL = contextvars.ContextVar('finsight_request_label', default=None)
+# Daftar durasi tahap milik request yang sedang diprofil
+_PROFILE_STAGES = contextvars.ContextVar('finsight_profile_stages', default=None)
+
+
+def _frame_name(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Sampling profiler untuk satu thread: thread latar belakang membaca stack thread target setiap
+    `interval` detik (`sys._current_frames`) dan menghitung setiap stack dalam format collapsed
+    ("a;b;c jumlah", siap untuk flamegraph.pl / speedscope).
+
+    Frame di atas `root` (bootstrap thread, executor) dibuang agar stack dimulai dari fungsi yang diprofil.
+    """
+    def __init__(self, thread_id, interval, root=None):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.root = root
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None and frame.f_code is not self.root:
+                names.append(_frame_name(frame.f_code))
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+                self.samples += 1
+
+    def collapsed(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def top_functions(profile, limit):
+    """
+    Fungsi dengan waktu kumulatif terbesar dari hasil cProfile.
+
+    Returns:
+        list: Dictionary {function, calls, tottime, cumtime} terurut dari cumtime terbesar
+    """
+    stats = pstats.Stats(profile).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            'function': f"{os.path.basename(filename)}:{line}({name})",
+            'calls': calls,
+            'tottime': tottime,
+            'cumtime': cumtime,
+        }
+        for (filename, line, name), (_, calls, tottime, cumtime, _) in rows
+    ]
+
+
+class StageWindow:
+    """
+    Durasi tahap (`services.metrics.stage`) dalam jendela waktu bergulir, untuk melihat tahap mana
+    yang paling lambat akhir-akhir ini. Histogram /metrics bersifat kumulatif sejak start, sedangkan
+    jendela ini hanya berisi `window` detik terakhir (dibatasi `max_samples` observasi).
+    """
+    def __init__(self, window, max_samples=100_000):
+        self.window = window
+        self._samples = collections.deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        sample = (time.monotonic(), stage, seconds, REQUEST_LABEL.get())
+        with self._lock:
+            self._samples.append(sample)
+
+    def _recent(self):
+        cutoff = time.monotonic() - self.window
+        with self._lock:
+            while self._samples and self._samples[0][0] < cutoff:
+                self._samples.popleft()
+            return list(self._samples)
+
+    def top(self, n):
+        """
+        Returns:
+            dict: `stages` (statistik per tahap, terurut dari p95 terbesar) dan `slowest`
+            (n observasi individual paling lambat beserta label request-nya)
+        """
+        samples = self._recent()
+        by_stage = collections.defaultdict(list)
+        for _, stage, seconds, _ in samples:
+            by_stage[stage].append(seconds)
+
+        stages = []
+        for stage, values in by_stage.items():
+            values = np.asarray(values)
+            stages.append({
+                'stage': stage,
+                'count': int(len(values)),
+                'total': float(values.sum()),
+                'mean': float(values.mean()),
+                'p50': float(np.percentile(values, 50)),
+                'p95': float(np.percentile(values, 95)),
+                'max': float(values.max()),
+            })
+        stages.sort(key=lambda row: row['p95'], reverse=True)
+
+        now = time.monotonic()
+        slowest = sorted(samples, key=lambda sample: sample[2], reverse=True)[:n]
+        return {
+            'window': self.window,
+            'observations': len(samples),
+            'stages': stages[:n],
+            'slowest': [{'stage': stage, 'seconds': seconds, 'request': label, 'age': now - at}
+                        for at, stage, seconds, label in slowest],
+        }
+
+
+class RequestProfiler:
+    """
+    Profiler opt-in untuk request prediksi.
+
+    Aktif jika `PROFILING_ENABLED` (setiap request diprofil) atau `PROFILING_TOKEN` diisi (hanya request
+    dengan header `X-Finsight-Profile` yang cocok). Membaca profil selalu memerlukan token: tanpa
+    `PROFILING_TOKEN`, request tetap diprofil tetapi endpoint `/debug` tidak tersedia. Saat nonaktif, profiler tidak mendaftarkan pengamat
+    tahap dan router hanya memeriksa atribut `active`, jadi jalur request tidak berubah sama sekali.
+
+    Request yang diprofil dijalankan seluruhnya di satu thread di bawah cProfile dan `StackSampler`.
+    Hasilnya (fungsi teratas, stack collapsed, output pstats, durasi per tahap) disimpan di memori untuk
+    `PROFILING_MAX_PROFILES` profil terakhir. Selama aktif, setiap tahap juga dicatat ke `StageWindow`.
+    """
+    def __init__(self, enabled=False, token=None, sample_interval=0.001, max_profiles=20,
+                 stage_window=300, top_n=10):
+        self.enabled = enabled
+        self.token = token
+        self.sample_interval = sample_interval
+        self.top_n = top_n
+        self.active = bool(enabled or token)
+        self.stages = StageWindow(stage_window)
+        self._profiles = collections.OrderedDict()
+        self._max_profiles = max_profiles
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        if self.active:
+            add_stage_observer(self._observe_stage)
+
+    @classmethod
+    def from_config(cls, conf=BaseConfig):
+        if conf.PROFILING_ENABLED and conf.PROFILING_TOKEN is None:
+            logger.warning("PROFILING_ENABLED aktif tanpa FINSIGHT_PROFILING_TOKEN: request tetap diprofil, "
+                           "tetapi endpoint /debug tidak tersedia (404) sampai token diset")
+        return cls(conf.PROFILING_ENABLED, conf.PROFILING_TOKEN, conf.PROFILING_SAMPLE_INTERVAL,
+                   conf.PROFILING_MAX_PROFILES, conf.PROFILING_STAGE_WINDOW, conf.PROFILING_TOP_N)
+
+    @property
+    def readable(self):
+        """
+        Apakah endpoint `/debug` tersedia: profiler aktif dan token diset.
+        """
+        return self.active and self.token is not None
+
+    def authorized(self, headers):
+        """
+        Apakah request boleh mengakses profil (token diset dan header token cocok).
+        """
+        if not self.readable:
+            return False
+        return hmac.compare_digest(headers.get(PROFILE_HEADER, ''), self.token)
+
+    def wants_profile(self, headers):
+        """
+        Apakah request ini harus diprofil. Hanya dipanggil jika `active`.
+        """
+        if self.enabled:
+            return True
+        return PROFILE_HEADER in headers and self.authorized(headers)
+
+    def _observe_stage(self, stage, seconds):
+        self.stages.observe(stage, seconds)
+        profile_stages = _PROFILE_STAGES.get()
+        if profile_stages is not None:
+            profile_stages.append((stage, seconds))
+
+    def profile(self, label, func, *args, **kwargs):
+        """
+        Menjalankan `func(*args, **kwargs)` di thread saat ini di bawah cProfile dan sampler stack.
+
+        Returns:
+            tuple: (hasil func, id profil)
+        """
+        profile_stages = []
+        REQUEST_LABEL.set(label)
+        _PROFILE_STAGES.set(profile_stages)
+        sampler = StackSampler(threading.get_ident(), self.sample_interval,
+                               root=RequestProfiler.profile.__code__).start()
+        profiler = cProfile.Profile()
+        error = None
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            error = e
+        finally:
+            profiler.disable()
+            wall_time = time.perf_counter() - start
+            sampler.stop()
+            _PROFILE_STAGES.set(None)
+
+        buffer = io.StringIO()
+        pstats.Stats(profiler, stream=buffer).sort_stats('cumulative').print_stats(self.top_n * 3)
+        record = {
+            'id': str(next(self._ids)),
+            'created_at': datetime.now().isoformat(),
+            'request': label,
+            'wall_time': wall_time,
+            'error': None if error is None else repr(error),
+            'stages': [{'stage': stage, 'seconds': seconds} for stage, seconds in profile_stages],
+            'samples': sampler.samples,
+            'sample_interval': self.sample_interval,
+            'top_functions': top_functions(profiler, self.top_n),
+            'collapsed': sampler.collapsed(),
+            'pstats': buffer.getvalue(),
+        }
+        with self._lock:
+            self._profiles[record['id']] = record
+            while len(self._profiles) > self._max_profiles:
+                self._profiles.popitem(last=False)
+        logger.info("PROFILE: %s selesai dalam %.1f ms (id %s, %d sampel)",
+                    label, wall_time * 1000, record['id'], sampler.samples)
+
+        if error is not None:
+            raise error
+        return result, record['id']
+
+    def get(self, profile_id):
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def summaries(self):
+        """
+        Ringkasan profil tersimpan (tanpa stack collapsed & pstats), terbaru lebih dulu.
+        """
+        with self._lock:
+            records = list(self._profiles.values())
+        return [{key: value for key, value in record.items() if key not in ('collapsed', 'pstats')}
+                for record in reversed(records)]
+
+
+# Profiler tunggal untuk API
+PROFILER = RequestProfiler.from_config()
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from core.config import CONFIGS, BaseConfig
+from services import data_service
+from services.data_service import cache_ttl, revalidate_async
+from services.forecast_cache import bar_duration
+from services.predictor import load_artifacts, predict_future_async, recent_range
+
+logger = logging.getLogger(__name__)
+
+# Jeda minimum antar refresh (detik), juga dipakai sebagai jeda setelah refresh gagal
+MIN_DELAY = 60
+# Jeda setelah pergantian bar agar sumber data sempat menerbitkan bar baru (detik)
+BAR_SETTLE_DELAY = 120
+
+
+class RefreshJob:
+    """
+    Status satu pasangan (simbol, mode) yang dipanaskan oleh scheduler.
+    """
+    def __init__(self, symbol, mode):
+        self.symbol = symbol
+        self.mode = mode
+        self.model_loaded = False
+        self.runs = 0
+        self.failures = 0
+        self.last_run = None
+        self.last_duration = None
+        self.last_error = None
+        self.next_run = None
+
+    def to_dict(self):
+        return {
+            'symbol': self.symbol,
+            'mode': self.mode,
+            'model_loaded': self.model_loaded,
+            'runs': self.runs,
+            'failures': self.failures,
+            'last_run': self.last_run.isoformat() if self.last_run else None,
+            'last_duration': self.last_duration,
+            'last_error': self.last_error,
+            'next_run': self.next_run.isoformat() if self.next_run else None,
+        }
+
+
+class RefreshScheduler:
+    """
+    Scheduler latar belakang (asyncio) yang berjalan bersama aplikasi FastAPI.
+
+    - Saat start: memuat model & scaler setiap (simbol, mode) ke cache predictor (diulang setiap
+      tick selama belum berhasil).
+    - Memperbarui cache harga sebelum TTL habis dan setelah bar baru ditutup.
+    - Menghitung ulang forecast setelah refresh, sehingga request cukup membaca cache.
+
+    Jumlah refresh yang berjalan bersamaan dibatasi semaphore, dan setiap jadwal diberi jitter
+    acak agar banyak simbol tidak menghantam Yahoo Finance pada detik yang sama.
+    """
+    def __init__(self, symbols, modes, concurrency=2, jitter=30, refresh_lead=0.1):
+        self.jobs = [RefreshJob(symbol, mode) for symbol in symbols for mode in modes]
+        self.concurrency = concurrency
+        self.jitter = jitter
+        self.refresh_lead = refresh_lead
+        self.started_at = None
+        self._semaphore = None
+        self._tasks = []
+
+    @property
+    def running(self):
+        return any(not task.done() for task in self._tasks)
+
+    async def start(self):
+        """
+        Memulai scheduler: pre-load model lalu menjalankan loop refresh untuk setiap job.
+        """
+        if self.running:
+            return
+        self.started_at = datetime.now(timezone.utc)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        logger.info("SCHEDULER: Memulai %d job refresh (concurrency=%d)", len(self.jobs), self.concurrency)
+        self._tasks = [asyncio.create_task(self._job_loop(job)) for job in self.jobs]
+
+    async def stop(self):
+        """
+        Menghentikan semua loop refresh.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("SCHEDULER: Dihentikan")
+
+    def status(self):
+        """
+        Ringkasan status scheduler untuk endpoint monitoring.
+        """
+        return {
+            'running': self.running,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'concurrency': self.concurrency,
+            'jobs': [job.to_dict() for job in self.jobs],
+        }
+
+    async def _job_loop(self, job):
+        async with self._semaphore:
+            await self._preload(job)
+        # Jalankan job pertama segera agar cache & forecast sudah hangat
+        delay = random.uniform(0, self.jitter)
+        force_refresh = False
+        while True:
+            job.next_run = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            await asyncio.sleep(delay)
+            async with self._semaphore:
+                ok = await self._run(job, force_refresh)
+            delay = self._next_delay(job) if ok else MIN_DELAY + random.uniform(0, self.jitter)
+            force_refresh = True
+
+    async def _preload(self, job):
+        """
+        Memuat model & scaler ke cache predictor agar request pertama tidak menunggu load dari disk.
+
+        Returns:
+            bool: True jika model berhasil dimuat
+        """
+        conf = CONFIGS[job.mode]
+        try:
+            await asyncio.to_thread(load_artifacts, conf, job.symbol, job.mode)
+            job.model_loaded = True
+        except Exception as e:
+            job.last_error = f"Gagal pre-load model: {e}"
+            logger.warning("SCHEDULER: %s", job.last_error)
+        return job.model_loaded
+
+    async def _run(self, job, force_refresh=True):
+        """
+        Memperbarui cache harga lalu menghitung ulang forecast untuk satu job.
+        Tanpa `force_refresh`, cache yang masih jauh dari kadaluarsa tidak diunduh ulang.
+        """
+        conf = CONFIGS[job.mode]
+        start = time.perf_counter()
+        job.last_run = datetime.now(timezone.utc)
+        job.runs += 1
+        try:
+            # Pre-load yang gagal (cth: model belum dilatih saat server start) dicoba lagi setiap tick
+            loaded = job.model_loaded or await self._preload(job)
+            if force_refresh or self._needs_refresh(job):
+                if not await revalidate_async(job.symbol, **recent_range(conf, job.mode)):
+                    raise RuntimeError("Refresh cache gagal")
+            if loaded:
+                results = await predict_future_async(job.mode, job.symbol)
+                if not results:
+                    raise RuntimeError("Forecast kosong")
+                job.last_error = None
+            return True
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            logger.error("SCHEDULER: Job %s (%s) gagal: %s", job.symbol, job.mode, e)
+            return False
+        finally:
+            job.last_duration = time.perf_counter() - start
+
+    def _needs_refresh(self, job):
+        """
+        Apakah cache belum ada atau sudah memasuki sisa TTL yang harus di-refresh.
+        """
+        interval = CONFIGS[job.mode].INTERVAL
+        age = data_service.CACHE_STORE.age(job.symbol, interval)
+        return age is None or age >= cache_ttl(interval) * (1 - self.refresh_lead)
+
+    def _next_delay(self, job):
+        """
+        Jeda sampai refresh berikutnya: sebelum TTL cache habis, atau sesaat setelah bar berikutnya
+        ditutup, mana yang lebih dulu. Ditambah jitter acak.
+        """
+        interval = CONFIGS[job.mode].INTERVAL
+        ttl = cache_ttl(interval)
+        age = data_service.CACHE_STORE.age(job.symbol, interval)
+        refresh_in = 0 if age is None else (ttl * (1 - self.refresh_lead) - age).total_seconds()
+
+        now = datetime.now(timezone.utc)
+        bar = bar_duration(job.mode)
+        if bar >= timedelta(days=1):
+            bar_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        else:
+            bar_start = now.replace(minute=0, second=0, microsecond=0)
+        next_bar_in = (bar_start + bar - now).total_seconds() + BAR_SETTLE_DELAY
+
+        return max(min(refresh_in, next_bar_in), MIN_DELAY) + random.uniform(0, self.jitter)
+
+
+# Scheduler tunggal untuk aplikasi, dijalankan dari lifespan FastAPI (app/main.py)
+SCHEDULER = RefreshScheduler(
+    symbols=BaseConfig.SCHEDULER_SYMBOLS,
+    modes=list(CONFIGS.keys()),
+    concurrency=BaseConfig.SCHEDULER_CONCURRENCY,
+    jitter=BaseConfig.SCHEDULER_JITTER,
+    refresh_lead=BaseConfig.SCHEDULER_REFRESH_LEAD
+)
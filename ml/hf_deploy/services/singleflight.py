@@ -0,0 +1,114 @@
+import asyncio
+import threading
+
+
+class _Call:
+    """
+    Satu pemanggilan yang sedang berjalan untuk sebuah key.
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Penggabungan request (single-flight): pemanggil bersamaan dengan key yang sama
+    hanya menjalankan fungsi satu kali, sisanya menunggu dan memakai hasil yang sama.
+
+    Lock global hanya dipakai sesaat untuk mendaftarkan pemanggilan; penantian dilakukan
+    per key, sehingga key yang berbeda tidak saling menghalangi.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Menjalankan `func(*args, **kwargs)` untuk key ini, atau menunggu pemanggilan yang sedang berjalan.
+        Error dari pemanggilan utama diteruskan ke semua pemanggil yang menunggu.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self, key):
+        """
+        Apakah ada pemanggilan yang sedang berjalan untuk key ini.
+        """
+        return key in self._calls
+
+
+class _AsyncCall:
+    """
+    Satu task yang sedang berjalan untuk sebuah key beserta jumlah pemanggil yang menunggunya.
+    """
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """
+    Versi asyncio dari SingleFlight untuk coroutine dalam satu event loop.
+
+    Pemanggil pertama membuat satu task untuk key tersebut; pemanggil lain menunggu task yang sama.
+    Task dilindungi `asyncio.shield`, sehingga pembatalan satu pemanggil tidak membatalkan
+    pekerjaan yang masih ditunggu pemanggil lain. Jika pemanggil terakhir yang menunggu dibatalkan,
+    task ikut dibatalkan (tidak ada lagi yang memakai hasilnya) dan pemanggil berikutnya memulai task baru.
+    """
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key, func, *args, **kwargs):
+        """
+        Menjalankan coroutine `func(*args, **kwargs)` untuk key ini, atau menunggu task yang sedang berjalan.
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _AsyncCall(asyncio.ensure_future(func(*args, **kwargs)))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                # Lepas key sekarang juga: task yang sedang dibatalkan tidak boleh ditunggu pemanggil baru
+                self._forget(key, call)
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key, call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def in_flight(self, key):
+        """
+        Apakah ada task yang sedang berjalan untuk key ini.
+        """
+        return key in self._calls
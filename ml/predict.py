@@ -1,5 +1,6 @@
 import argparse
 from services.predictor import predict_future
+from core.logger import setup_logging
 
 if __name__ == '__main__':
     # Konfigurasi argumen baris perintah (CLI)
@@ -12,6 +13,7 @@ if __name__ == '__main__':
     parser.add_argument('--symbol', type=str, default='USDIDR=X', help='Simbol mata uang (cth: EURUSD=X)')
     
     args = parser.parse_args()
+    setup_logging()
     
     # Jalankan prediksi (plot=True akan menyimpan grafik ke disk)
     final_results = predict_future(args.mode, symbol=args.symbol, plot=True)
@@ -0,0 +1,175 @@
+import glob
+import json
+import os
+import time
+import numpy as np
+from tensorflow.keras.callbacks import Callback, EarlyStopping
+from tensorflow.keras.models import load_model
+
+
+def checkpoint_paths(model_path, epoch=None):
+    """
+    Lokasi file checkpoint di samping artefak model (`get_paths(symbol)['model']`).
+
+    - state: epoch terakhir, riwayat loss, state early stopping, dan nama file model & bobot terbaik
+      milik epoch tersebut (.json). File ini adalah titik commit checkpoint.
+    - model: model lengkap + state optimizer (.keras), diberi tag epoch
+    - best: bobot terbaik early stopping (.npz), diberi tag epoch
+
+    Tanpa `epoch`, path model & best adalah nama lama tanpa tag (checkpoint dari versi sebelumnya).
+    """
+    base = os.path.splitext(model_path)[0]
+    tag = '' if epoch is None else f"_e{epoch}"
+    return {
+        'model': f"{base}_checkpoint{tag}.keras",
+        'best': f"{base}_checkpoint_best{tag}.npz",
+        'state': f"{base}_checkpoint.json",
+    }
+
+
+def _tmp_path(path):
+    # Nama sementara tetap berakhiran sama (Keras memeriksa ekstensi .keras)
+    root, ext = os.path.splitext(path)
+    return f"{root}.tmp{ext}"
+
+
+def _checkpoint_files(model_path):
+    """
+    Semua file checkpoint milik model ini (termasuk sisa epoch lama dan file sementara).
+    """
+    base = glob.escape(os.path.splitext(model_path)[0])
+    return glob.glob(f"{base}_checkpoint*")
+
+
+def load_checkpoint(model_path):
+    """
+    Memuat checkpoint terakhir untuk melanjutkan pelatihan (--resume).
+
+    Returns:
+        tuple: (model, state) atau (None, None) jika checkpoint tidak ada.
+        Model dimuat beserta state optimizer; state['best_weights'] berisi bobot terbaik (atau None).
+    """
+    state_path = checkpoint_paths(model_path)['state']
+    if not os.path.exists(state_path):
+        return None, None
+    with open(state_path) as f:
+        state = json.load(f)
+
+    # Model & bobot terbaik yang dirujuk state selalu berasal dari epoch yang sama dengan state
+    directory = os.path.dirname(state_path)
+    files = state.get('files')
+    if files is None:
+        legacy = checkpoint_paths(model_path)
+        files = {'model': os.path.basename(legacy['model']), 'best': os.path.basename(legacy['best'])}
+    model_file = os.path.join(directory, files['model'])
+    if not os.path.exists(model_file):
+        return None, None
+    model = load_model(model_file)
+
+    state['best_weights'] = None
+    best_file = os.path.join(directory, files['best']) if files.get('best') else None
+    if best_file and os.path.exists(best_file):
+        with np.load(best_file) as data:
+            state['best_weights'] = [data[f'arr_{i}'] for i in range(len(data.files))]
+    return model, state
+
+
+def clear_checkpoint(model_path):
+    """
+    Menghapus file checkpoint setelah pelatihan selesai dan model final tersimpan.
+    """
+    for path in _checkpoint_files(model_path):
+        os.remove(path)
+
+
+class ResumableEarlyStopping(EarlyStopping):
+    """
+    EarlyStopping yang dapat melanjutkan state (best, wait, bobot terbaik) dari checkpoint,
+    karena EarlyStopping bawaan Keras me-reset state-nya di setiap awal `fit`.
+    """
+    def __init__(self, resume_state=None, **kwargs):
+        super().__init__(**kwargs)
+        self.resume_state = resume_state
+
+    def on_train_begin(self, logs=None):
+        super().on_train_begin(logs)
+        if self.resume_state:
+            self.wait = self.resume_state['wait']
+            self.best = self.resume_state['best']
+            self.best_epoch = self.resume_state['best_epoch']
+            self.best_weights = self.resume_state.get('best_weights')
+
+    def get_state(self):
+        return {
+            'wait': self.wait,
+            'best': None if self.best is None else float(self.best),
+            'best_epoch': self.best_epoch,
+        }
+
+
+class TrainingCheckpoint(Callback):
+    """
+    Menyimpan checkpoint setiap `every` epoch secara atomik.
+
+    Model dan bobot terbaik ditulis ke file baru bertag epoch, lalu file state ditulis paling akhir
+    (tulis ke file sementara lalu os.replace) dan merujuk keduanya. Mengganti state adalah satu-satunya
+    titik commit: crash kapan pun menyisakan state lama yang masih merujuk model & bobot terbaik dari
+    epoch yang sama. File epoch lama baru dihapus setelah state baru tersimpan.
+
+    Riwayat loss dan durasi setiap epoch ikut disimpan agar ringkasan pelatihan tetap utuh
+    setelah dilanjutkan (--resume).
+    """
+    def __init__(self, model_path, every=1, early_stopping=None, resume_state=None):
+        super().__init__()
+        self.model_path = model_path
+        self.every = max(1, every)
+        self.early_stopping = early_stopping
+        resume_state = resume_state or {}
+        self.history = resume_state.get('history', {})
+        self.epoch_times = resume_state.get('epoch_times', [])
+        self.resumed_epochs = resume_state.get('epoch', 0)
+        self._epoch_start = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._epoch_start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.epoch_times.append(time.perf_counter() - self._epoch_start)
+        for key, value in (logs or {}).items():
+            self.history.setdefault(key, []).append(float(value))
+        if (epoch + 1) % self.every == 0:
+            self.save(epoch + 1)
+
+    def save(self, epoch):
+        """
+        Menulis model (+ optimizer), bobot terbaik, dan state untuk epoch yang sudah selesai.
+        """
+        paths = checkpoint_paths(self.model_path, epoch)
+        os.makedirs(os.path.dirname(paths['model']), exist_ok=True)
+
+        tmp_model = _tmp_path(paths['model'])
+        self.model.save(tmp_model)
+        os.replace(tmp_model, paths['model'])
+
+        state = {'epoch': epoch, 'history': self.history, 'epoch_times': self.epoch_times,
+                 'files': {'model': os.path.basename(paths['model']), 'best': None}}
+        if self.early_stopping is not None:
+            state['early_stopping'] = self.early_stopping.get_state()
+            if self.early_stopping.best_weights is not None:
+                tmp_best = _tmp_path(paths['best'])
+                with open(tmp_best, 'wb') as f:
+                    np.savez(f, *self.early_stopping.best_weights)
+                os.replace(tmp_best, paths['best'])
+                state['files']['best'] = os.path.basename(paths['best'])
+
+        # Titik commit: sebelum baris ini, state lama (dan file epoch lamanya) tetap utuh
+        tmp_state = _tmp_path(paths['state'])
+        with open(tmp_state, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_state, paths['state'])
+
+        # Hapus file epoch sebelumnya (dan sisa crash) yang tidak lagi dirujuk state
+        keep = {paths['state'], paths['model'], paths['best']}
+        for path in _checkpoint_files(self.model_path):
+            if path not in keep:
+                os.remove(path)
@@ -1,47 +1,319 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
+from numpy.lib.stride_tricks import sliding_window_view
 import joblib
 import os
-from core.config import CONFIGS
+from core.config import CONFIGS, BaseConfig
+from services.cache_store import get_cache_store
+from services.singleflight import SingleFlight, AsyncSingleFlight
+from services.scaling import save_params, scaler_params_path
+from services.metrics import PRICE_CACHE_EVENTS, UPSTREAM_ATTEMPTS, UPSTREAM_RETRIES, stage
+from core.logger import LogSampler
 
+import asyncio
 import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import time
 import random
+import logging
+
+logger = logging.getLogger(__name__)
+# CACHE HIT terjadi di hampir setiap request, cukup dicatat sebagian
+CACHE_HIT_SAMPLER = LogSampler()
 
 CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'cache')
 
-def download_with_retry(ticker, start, end, interval, max_retries=5):
+# Lapisan penyimpanan cache (format biner kolumnar secara default, lihat services/cache_store.py)
+CACHE_STORE = get_cache_store(BaseConfig.CACHE_FORMAT, CACHE_DIR)
+
+# Request bersamaan untuk ticker & interval yang sama hanya memicu satu unduhan ke Yahoo Finance
+DOWNLOAD_FLIGHTS = SingleFlight()
+ASYNC_DOWNLOAD_FLIGHTS = AsyncSingleFlight()
+# Lock tulis cache per (ticker, interval). DOWNLOAD_FLIGHTS dan ASYNC_DOWNLOAD_FLIGHTS tidak saling
+# mengenal, dan key refresh & 'gap' bisa berjalan bersamaan, sehingga semua baca-gabung-tulis cache
+# (apply_refresh / apply_cache_gap) dari jalur sinkron, async, dan scheduler diserialkan di sini.
+_CACHE_WRITE_LOCKS = {}
+_CACHE_WRITE_LOCKS_GUARD = threading.Lock()
+# Referensi task revalidasi latar belakang agar tidak dibersihkan garbage collector sebelum selesai
+BACKGROUND_TASKS = set()
+# Thread revalidasi latar belakang untuk stale-while-revalidate di jalur sinkron
+REVALIDATE_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix='revalidate')
+
+def default_downloader():
+    """
+    Pengunduh default (`yf.download`). yfinance baru diimport saat unduhan benar-benar diperlukan
+    (cache miss / kadaluarsa), sehingga import modul ini tetap ringan untuk API.
+    """
+    import yfinance as yf
+    return yf.download
+
+def download_with_retry(ticker, start, end, interval, max_retries=5, downloader=None, allow_empty=False):
     """
     Mengunduh data dengan mekanisme retry dan exponential backoff.
+
+    Args:
+        downloader (callable): Fungsi pengunduh dengan signature seperti `yf.download`
+            (default: `yf.download`). Bisa diganti dengan pengunduh palsu untuk pengujian.
+        allow_empty (bool): Anggap DataFrame kosong sebagai hasil sah (cth: belum ada bar baru)
     """
+    downloader = downloader or default_downloader()
     for attempt in range(max_retries):
         try:
-            print(f"DEBUG: Attempt {attempt+1}/{max_retries} downloading {ticker}...")
-            df = yf.download(ticker, start=start, end=end, interval=interval, progress=False)
+            logger.debug("Attempt %d/%d downloading %s...", attempt + 1, max_retries, ticker)
+            with stage('download'):
+                df = downloader(ticker, start=start, end=end, interval=interval, progress=False)
             
             # Check if dataframe is empty (yfinance sometimes returns empty df on failure without raising)
-            if df.empty:
-                print(f"WARNING: Empty DataFrame received on attempt {attempt+1}")
+            if df.empty and not allow_empty:
+                logger.warning("Empty DataFrame received on attempt %d", attempt + 1)
                 raise ValueError("Empty DataFrame returned from yfinance")
-                
+
+            UPSTREAM_ATTEMPTS.labels('ok').inc()
             return df
             
         except Exception as e:
-            print(f"ERROR: Download failed on attempt {attempt+1}: {e}")
+            UPSTREAM_ATTEMPTS.labels('error').inc()
+            logger.warning("Download failed on attempt %d: %s", attempt + 1, e)
             if attempt < max_retries - 1:
+                UPSTREAM_RETRIES.inc()
                 # Exponential backoff: 2s, 4s, 8s, 16s... + random jitter
                 sleep_time = (2 ** attempt) + random.uniform(0.5, 1.5)
-                print(f"Waiting {sleep_time:.2f} seconds before retrying...")
+                logger.info("Waiting %.2f seconds before retrying...", sleep_time)
                 time.sleep(sleep_time)
             else:
-                print("ERROR: Max retries reached.")
+                logger.error("Max retries reached downloading %s", ticker)
                 raise e
     return pd.DataFrame() # Should not be reached if raise e is present
 
 
-def fetch_data(ticker, start, end, interval='1d'):
+def normalize_download(df, ticker):
+    """
+    Merapikan DataFrame mentah dari yfinance: isi baris kosong dan lepas level MultiIndex ticker.
+
+    Returns:
+        DataFrame: Data dengan kolom 'Close' saja, atau seluruh kolom jika 'Close' tidak ditemukan
+    """
+    # Data per jam dari yfinance seringkali memiliki baris yang hilang
+    df = df.ffill()
+
+    # Handle YFinance MultiIndex (Ticker level)
+    if isinstance(df.columns, pd.MultiIndex):
+        # If columns are (Price, Ticker), we want to grab 'Close'
+        # The structure is usually levels=['Price', 'Ticker']
+        # We can try to get just the 'Close' cross-section if possible, or droplevel
+        try:
+            # Attempt to extract 'Close' for the specific ticker if it exists in level 1
+            if ticker in df.columns.get_level_values(1):
+                df = df.xs(ticker, level=1, axis=1) # Drop ticker level
+            else:
+                # Just drop the ticker level generically if it's the second level
+                df.columns = df.columns.droplevel(1)
+        except Exception as e:
+            logger.warning("MultiIndex handling failed: %s", e)
+
+    if 'Close' in df.columns:
+        return df[['Close']]
+    # Fallback if structure is weird (e.g. just a series or different name)
+    logger.warning("'Close' column not found, saving full DF.")
+    return df
+
+
+def cache_write_lock(ticker, interval):
+    """
+    Lock tulis untuk file cache (ticker, interval), dibuat saat pertama kali dibutuhkan.
+    """
+    with _CACHE_WRITE_LOCKS_GUARD:
+        return _CACHE_WRITE_LOCKS.setdefault((ticker, interval), threading.Lock())
+
+
+def plan_refresh(ticker, start, end, interval, incremental=False):
+    """
+    Menentukan rentang unduhan untuk memperbarui cache.
+
+    Jika cache sudah ada (dan mode inkremental aktif), hanya bar setelah timestamp terakhir
+    di cache yang diunduh. Bar terakhir ikut diunduh ulang karena bisa jadi masih parsial saat disimpan.
+
+    Returns:
+        tuple: (jenis 'full'/'delta', start, end) atau None jika tidak ada rentang yang perlu diunduh
+    """
+    if not (incremental and BaseConfig.CACHE_INCREMENTAL):
+        logger.info("FETCHING API: Mengambil data baru untuk %s dari %s sampai %s...", ticker, start, end)
+        return ('full', start, end)
+
+    last_timestamp = CACHE_STORE.last_timestamp(ticker, interval)
+    delta_start = last_timestamp.strftime('%Y-%m-%d')
+    if delta_start >= end:
+        return None
+
+    logger.info("FETCHING DELTA: Mengambil data %s dari %s sampai %s (cache terakhir: %s)", ticker, delta_start, end, last_timestamp)
+    return ('delta', delta_start, end)
+
+
+def apply_refresh(ticker, start, interval, kind, df):
+    """
+    Menyimpan hasil unduhan dari `plan_refresh` ke cache.
+    Unduhan 'delta' digabungkan (deduplikasi) ke cache secara atomik, unduhan 'full' menggantikan cache.
+    Dijalankan di bawah `cache_write_lock` agar penulis lain tidak menimpa hasil penggabungan.
+
+    Returns:
+        DataFrame: Data yang tersimpan di cache (bisa kosong jika Yahoo Finance tidak mengembalikan data)
+    """
+    with cache_write_lock(ticker, interval):
+        if kind is None or (kind == 'delta' and df.empty):
+            # Belum ada bar baru (cth: akhir pekan), cukup tandai cache sebagai segar
+            CACHE_STORE.touch(ticker, interval)
+            return CACHE_STORE.read(ticker, interval)
+
+        if kind == 'delta':
+            return CACHE_STORE.append(ticker, interval, normalize_download(df, ticker))
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Initial DF Shape: %s, Columns: %s", df.shape, list(df.columns))
+
+        if df.empty:
+            logger.warning("Data kosong dari Yahoo Finance untuk %s.", ticker)
+            return df
+
+        # Simpan ke cache
+        df = normalize_download(df, ticker)
+        CACHE_STORE.write(ticker, interval, df, coverage_start=start)
+        return df
+
+
+def refresh_cache(ticker, start, end, interval, incremental=False, downloader=None):
+    """
+    Mengunduh data dari Yahoo Finance dan memperbarui cache.
+    Jika cache sudah ada (dan mode inkremental aktif), hanya bar baru yang diunduh.
+
+    Returns:
+        DataFrame: Data yang tersimpan di cache (bisa kosong jika Yahoo Finance tidak mengembalikan data)
+    """
+    plan = plan_refresh(ticker, start, end, interval, incremental)
+    if plan is None:
+        return apply_refresh(ticker, start, interval, None, None)
+
+    kind, download_start, download_end = plan
+    # Mengunduh data menggunakan yfinance dengan retry
+    df = download_with_retry(ticker, start=download_start, end=download_end, interval=interval,
+                             downloader=downloader, allow_empty=(kind == 'delta'))
+    return apply_refresh(ticker, start, interval, kind, df)
+
+
+def plan_cache_gap(ticker, start, interval):
+    """
+    Menentukan rentang yang hilang jika `start` lebih awal dari awal rentang cache.
+
+    Returns:
+        tuple: (start, end) rentang yang perlu diunduh, atau None jika cache sudah mencakup `start`
+    """
+    coverage_start = CACHE_STORE.coverage_start(ticker, interval)
+    requested_start = pd.Timestamp(start)
+    if coverage_start.tz is not None:
+        requested_start = requested_start.tz_localize(coverage_start.tz)
+    if requested_start >= coverage_start:
+        return None
+
+    gap_end = coverage_start.strftime('%Y-%m-%d')
+    logger.info("FETCHING GAP: Mengambil data %s dari %s sampai %s (di luar rentang cache)", ticker, start, gap_end)
+    return (start, gap_end)
+
+
+def apply_cache_gap(ticker, start, interval, df):
+    """
+    Menggabungkan hasil unduhan dari `plan_cache_gap` ke depan cache (di bawah `cache_write_lock`).
+    """
+    if not df.empty:
+        df = normalize_download(df, ticker)
+    with cache_write_lock(ticker, interval):
+        CACHE_STORE.append(ticker, interval, df, coverage_start=start)
+
+
+def extend_cache_start(ticker, start, interval, downloader=None):
+    """
+    Mengunduh hanya bagian yang hilang jika `start` lebih awal dari awal rentang cache,
+    lalu menggabungkannya ke depan cache. Kegagalan unduhan tidak fatal karena cache yang ada tetap bisa dipakai.
+    """
+    gap = plan_cache_gap(ticker, start, interval)
+    if gap is None:
+        return
+    try:
+        df = download_with_retry(ticker, start=gap[0], end=gap[1], interval=interval, max_retries=1,
+                                 downloader=downloader, allow_empty=True)
+        apply_cache_gap(ticker, start, interval, df)
+    except Exception as e:
+        logger.warning("Gagal melengkapi awal cache %s: %s", ticker, e)
+
+
+def cache_ttl(interval):
+    """
+    Durasi cache (TTL): 12 jam untuk data harian, 1 jam untuk data per jam.
+    """
+    return datetime.timedelta(hours=12 if interval == '1d' else 1)
+
+
+def cache_status(ticker, interval):
+    """
+    Memeriksa umur cache terhadap TTL (12 jam untuk harian, 1 jam untuk per jam).
+
+    Returns:
+        tuple: (umur_cache atau None jika belum ada, apakah_cache_masih_valid)
+    """
+    # Pastikan direktori cache ada
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    
+    is_cache_valid = False
+    
+    cache_age = CACHE_STORE.age(ticker, interval)
+    if cache_age is not None:
+        if cache_age < cache_ttl(interval):
+             is_cache_valid = True
+             PRICE_CACHE_EVENTS.labels('hit').inc()
+             if CACHE_HIT_SAMPLER():
+                 logger.info("CACHE HIT: Menggunakan data cache lokal untuk %s (Age: %s, 1 dari %d dicatat)",
+                             ticker, cache_age, CACHE_HIT_SAMPLER.every)
+        else:
+             PRICE_CACHE_EVENTS.labels('stale').inc()
+             logger.info("CACHE STALE: Data cache kadaluarsa untuk %s", ticker)
+    else:
+        PRICE_CACHE_EVENTS.labels('miss').inc()
+    return cache_age, is_cache_valid
+
+
+def read_stale(ticker, start, end, interval):
+    """
+    Membaca rentang [start, end] dari cache yang sudah kadaluarsa untuk stale-while-revalidate.
+
+    Returns:
+        DataFrame: Kolom 'Close', atau None jika cache tidak terbaca / rentangnya kosong
+    """
+    try:
+        with stage('cache_read'):
+            df = CACHE_STORE.read_range(ticker, interval, start, end)[['Close']]
+    except Exception as e:
+        logger.warning("Gagal membaca cache %s: %s", ticker, e)
+        return None
+    return None if df.empty else df
+
+
+def revalidate(ticker, start, end, interval, downloader=None):
+    """
+    Versi sinkron dari `revalidate_async`: memperbarui cache sekarang juga, digabung dengan unduhan
+    lain untuk key yang sama. Error hanya dicatat.
+
+    Returns:
+        bool: True jika cache berhasil diperbarui
+    """
+    try:
+        DOWNLOAD_FLIGHTS.do((ticker, interval), refresh_cache, ticker, start, end, interval,
+                            incremental=CACHE_STORE.exists(ticker, interval), downloader=downloader)
+        return True
+    except Exception as e:
+        logger.error("REVALIDATE ERROR: Gagal memperbarui cache %s (%s): %r", ticker, interval, e)
+        return False
+
+
+def fetch_data(ticker, start, end, interval='1d', downloader=None, stale_while_revalidate=False):
     """
     Mengambil data historis keuangan dari Yahoo Finance dengan Caching.
     
@@ -50,125 +322,312 @@ def fetch_data(ticker, start, end, interval='1d'):
         start (str): Tanggal mulai format 'YYYY-MM-DD'
         end (str): Tanggal akhir format 'YYYY-MM-DD'
         interval (str): Interval data ('1d' atau '1h')
+        downloader (callable): Pengganti `yf.download` (opsional, untuk pengujian)
+        stale_while_revalidate (bool): Layani cache kadaluarsa langsung dan perbarui di thread latar
+            belakang, seperti `fetch_data_async` (jika CACHE_STALE_WHILE_REVALIDATE aktif). Dipakai jalur
+            prediksi API; pelatihan & CLI tetap menunggu data terbaru.
         
     Returns:
         DataFrame: Pandas DataFrame yang berisi kolom 'Close' (Harga Penutupan)
+            untuk rentang [start, end] (tanggal `end` ikut tercakup)
     """
-    # Pastikan direktori cache ada
-    os.makedirs(CACHE_DIR, exist_ok=True)
-    
-    # Path file cache
-    cache_file = os.path.join(CACHE_DIR, f"{ticker}_{interval}.csv")
-    
-    # Tentukan durasi cache (TTL)
-    ttl_hours = 12 if interval == '1d' else 1
-    
-    is_cache_valid = False
-    
-    if os.path.exists(cache_file):
-        file_mod_time = datetime.datetime.fromtimestamp(os.path.getmtime(cache_file))
-        if datetime.datetime.now() - file_mod_time < datetime.timedelta(hours=ttl_hours):
-             is_cache_valid = True
-             print(f"CACHE HIT: Menggunakan data cache lokal untuk {ticker} (Age: {datetime.datetime.now() - file_mod_time})")
-        else:
-             print(f"CACHE STALE: Data cache kadaluarsa untuk {ticker}")
+    cache_age, is_cache_valid = cache_status(ticker, interval)
+
+    if cache_age is not None and not is_cache_valid and stale_while_revalidate and BaseConfig.CACHE_STALE_WHILE_REVALIDATE:
+        df = read_stale(ticker, start, end, interval)
+        if df is not None:
+            # Unduhan yang sudah berjalan untuk key ini akan memperbarui cache, tidak perlu thread baru
+            if not DOWNLOAD_FLIGHTS.in_flight((ticker, interval)):
+                REVALIDATE_EXECUTOR.submit(revalidate, ticker, start, end, interval, downloader)
+            return df
 
     if is_cache_valid:
         try:
-            # Load dari cache
-            df = pd.read_csv(cache_file, index_col=0, parse_dates=True)
-            # Filter sesuai request agar konsisten? 
-            # Untuk simplifikasi, kita return apa adanya dari cache karena biasanya rentang request mirip.
-            # Tapi idealnya kita filter start/end.
-            # Kita asumsi cache selalu menyimpan data "terbaru" yang cukup panjang.
-            return df[['Close']]
+            # Lengkapi bagian awal rentang jika request meminta data lebih lama dari isi cache
+            DOWNLOAD_FLIGHTS.do((ticker, interval, 'gap'), extend_cache_start, ticker, start, interval, downloader=downloader)
+            # Load dari cache: hanya rentang start/end yang diminta yang dibaca dari disk
+            with stage('cache_read'):
+                return CACHE_STORE.read_range(ticker, interval, start, end)[['Close']]
         except Exception as e:
-            print(f"Gagal membaca cache: {e}")
-    
-    print(f"FETCHING API: Mengambil data baru untuk {ticker} dari {start} sampai {end}...")
+            logger.warning("Gagal membaca cache %s: %s", ticker, e)
     
     try:
-        # Mengunduh data menggunakan yfinance dengan retry
-        df = download_with_retry(ticker, start=start, end=end, interval=interval)
-        print(f"DEBUG: Initial DF Shape: {df.shape}")
-        print(f"DEBUG: Initial DF Columns: {df.columns}")
-        
+        # Request bersamaan menunggu satu unduhan yang sama, lalu masing-masing membaca rentangnya dari cache
+        df = DOWNLOAD_FLIGHTS.do((ticker, interval), refresh_cache, ticker, start, end, interval,
+                                 incremental=cache_age is not None, downloader=downloader)
         if df.empty:
-            print("Peringatan: Data kosong dari Yahoo Finance.")
             return df
-        
-        # Data per jam dari yfinance seringkali memiliki baris yang hilang
-        df = df.ffill()
-
-        # Handle YFinance MultiIndex (Ticker level)
-        if isinstance(df.columns, pd.MultiIndex):
-            # If columns are (Price, Ticker), we want to grab 'Close'
-            # The structure is usually levels=['Price', 'Ticker']
-            # We can try to get just the 'Close' cross-section if possible, or droplevel
-            try:
-                # Attempt to extract 'Close' for the specific ticker if it exists in level 1
-                if ticker in df.columns.get_level_values(1):
-                    df = df.xs(ticker, level=1, axis=1) # Drop ticker level
-                else:
-                    # Just drop the ticker level generically if it's the second level
-                    df.columns = df.columns.droplevel(1)
-            except Exception as e:
-                print(f"Warning: MultiIndex handling failed: {e}")
+        DOWNLOAD_FLIGHTS.do((ticker, interval, 'gap'), extend_cache_start, ticker, start, interval, downloader=downloader)
+        return CACHE_STORE.read_range(ticker, interval, start, end)[['Close']]
+    except Exception as e:
+        logger.error("YFinance Download Error: %s", e)
+        # Jika gagal fetch bar, coba baca cache lama (sebagai fallback ultimate)
+        if CACHE_STORE.exists(ticker, interval):
+             PRICE_CACHE_EVENTS.labels('fallback').inc()
+             logger.warning("FALLBACK: Menggunakan cache kadaluarsa %s karena API error.", ticker)
+             return CACHE_STORE.read_range(ticker, interval, start, end)[['Close']]
+        raise e
 
-        # Simpan ke cache
-        if 'Close' in df.columns:
-            df[['Close']].to_csv(cache_file)
-            return df[['Close']]
-        else:
-            # Fallback if structure is weird (e.g. just a series or different name)
-            print("Warning: 'Close' column not found, saving full DF.")
-            df.to_csv(cache_file)
+
+async def download_with_retry_async(ticker, start, end, interval, max_retries=5, downloader=None,
+                                    allow_empty=False, timeout=None, deadline=None):
+    """
+    Versi asyncio dari `download_with_retry`.
+
+    Backoff memakai `asyncio.sleep` sehingga tidak memblokir worker selama menunggu retry.
+    Pengunduh (sinkron) dijalankan di thread executor dengan batas waktu per percobaan, dan seluruh
+    rangkaian retry dibatasi `deadline`: percobaan terakhir dipotong ke sisa waktu, dan retry yang
+    backoff-nya melewati deadline tidak dijalankan (error terakhir langsung diteruskan).
+    Pembatalan (cancel) dari pemanggil langsung menghentikan rangkaian retry.
+
+    Args:
+        timeout (float): Batas waktu per percobaan unduh dalam detik (default: BaseConfig.DOWNLOAD_TIMEOUT)
+        deadline (float): Batas waktu total dalam detik (default: BaseConfig.DOWNLOAD_DEADLINE)
+    """
+    downloader = downloader or default_downloader()
+    timeout = BaseConfig.DOWNLOAD_TIMEOUT if timeout is None else timeout
+    deadline = BaseConfig.DOWNLOAD_DEADLINE if deadline is None else deadline
+    loop = asyncio.get_running_loop()
+    deadline_at = loop.time() + deadline
+    for attempt in range(max_retries):
+        try:
+            logger.debug("Attempt %d/%d downloading %s...", attempt + 1, max_retries, ticker)
+            # Catatan: thread pengunduh tidak bisa dihentikan paksa, tetapi pemanggil tidak lagi menunggunya
+            with stage('download'):
+                df = await asyncio.wait_for(
+                    asyncio.to_thread(downloader, ticker, start=start, end=end, interval=interval, progress=False),
+                    timeout=max(0.0, min(timeout, deadline_at - loop.time()))
+                )
+
+            if df.empty and not allow_empty:
+                logger.warning("Empty DataFrame received on attempt %d", attempt + 1)
+                raise ValueError("Empty DataFrame returned from yfinance")
+
+            UPSTREAM_ATTEMPTS.labels('ok').inc()
+            return df
+
+        except Exception as e:
+            UPSTREAM_ATTEMPTS.labels('error').inc()
+            logger.warning("Download failed on attempt %d: %r", attempt + 1, e)
+            # Exponential backoff: 2s, 4s, 8s, 16s... + random jitter
+            sleep_time = (2 ** attempt) + random.uniform(0.5, 1.5)
+            if attempt < max_retries - 1 and loop.time() + sleep_time < deadline_at:
+                UPSTREAM_RETRIES.inc()
+                logger.info("Waiting %.2f seconds before retrying...", sleep_time)
+                await asyncio.sleep(sleep_time)
+            else:
+                logger.error("Retry limit or deadline reached downloading %s", ticker)
+                raise e
+    return pd.DataFrame() # Should not be reached if raise e is present
+
+
+async def refresh_cache_async(ticker, start, end, interval, incremental=False, downloader=None, timeout=None):
+    """
+    Versi asyncio dari `refresh_cache`.
+    """
+    plan = plan_refresh(ticker, start, end, interval, incremental)
+    if plan is None:
+        return await asyncio.to_thread(apply_refresh, ticker, start, interval, None, None)
+
+    kind, download_start, download_end = plan
+    df = await download_with_retry_async(ticker, start=download_start, end=download_end, interval=interval,
+                                         downloader=downloader, allow_empty=(kind == 'delta'), timeout=timeout)
+    # Penulisan cache bisa menunggu lock tulis yang dipegang jalur sinkron, jadi jangan di event loop
+    return await asyncio.to_thread(apply_refresh, ticker, start, interval, kind, df)
+
+
+async def extend_cache_start_async(ticker, start, interval, downloader=None, timeout=None):
+    """
+    Versi asyncio dari `extend_cache_start`.
+    """
+    gap = plan_cache_gap(ticker, start, interval)
+    if gap is None:
+        return
+    try:
+        df = await download_with_retry_async(ticker, start=gap[0], end=gap[1], interval=interval, max_retries=1,
+                                             downloader=downloader, allow_empty=True, timeout=timeout)
+        await asyncio.to_thread(apply_cache_gap, ticker, start, interval, df)
+    except Exception as e:
+        logger.warning("Gagal melengkapi awal cache %s: %r", ticker, e)
+
+
+async def revalidate_async(ticker, start, end, interval, downloader=None, timeout=None):
+    """
+    Memperbarui cache sekarang juga (tanpa melihat TTL), digabung dengan unduhan lain untuk key yang sama.
+    Dipakai oleh stale-while-revalidate dan scheduler latar belakang. Error hanya dicatat.
+
+    Returns:
+        bool: True jika cache berhasil diperbarui
+    """
+    try:
+        await ASYNC_DOWNLOAD_FLIGHTS.do((ticker, interval), refresh_cache_async, ticker, start, end, interval,
+                                        incremental=CACHE_STORE.exists(ticker, interval),
+                                        downloader=downloader, timeout=timeout)
+        return True
+    except Exception as e:
+        logger.error("REVALIDATE ERROR: Gagal memperbarui cache %s (%s): %r", ticker, interval, e)
+        return False
+
+
+async def fetch_data_async(ticker, start, end, interval='1d', downloader=None, timeout=None):
+    """
+    Versi asyncio dari `fetch_data` untuk dipakai di endpoint async.
+
+    Cache hit dilayani langsung (pembacaan mmap), sedangkan unduhan ke Yahoo Finance dan
+    backoff retry tidak memblokir event loop maupun thread worker. Request bersamaan untuk
+    ticker & interval yang sama digabungkan menjadi satu unduhan.
+
+    Args:
+        timeout (float): Batas waktu per percobaan unduh dalam detik (default: BaseConfig.DOWNLOAD_TIMEOUT)
+
+    Returns:
+        DataFrame: Pandas DataFrame yang berisi kolom 'Close' untuk rentang [start, end]
+    """
+    cache_age, is_cache_valid = cache_status(ticker, interval)
+
+    if cache_age is not None and not is_cache_valid and BaseConfig.CACHE_STALE_WHILE_REVALIDATE:
+        # Stale-while-revalidate: layani data lama sekarang, perbarui cache di latar belakang
+        df = read_stale(ticker, start, end, interval)
+        if df is not None:
+            task = asyncio.ensure_future(revalidate_async(ticker, start, end, interval, downloader=downloader, timeout=timeout))
+            BACKGROUND_TASKS.add(task)
+            task.add_done_callback(BACKGROUND_TASKS.discard)
             return df
+
+    if is_cache_valid:
+        try:
+            await ASYNC_DOWNLOAD_FLIGHTS.do((ticker, interval, 'gap'), extend_cache_start_async,
+                                            ticker, start, interval, downloader=downloader, timeout=timeout)
+            with stage('cache_read'):
+                return CACHE_STORE.read_range(ticker, interval, start, end)[['Close']]
+        except Exception as e:
+            logger.warning("Gagal membaca cache %s: %s", ticker, e)
+
+    try:
+        df = await ASYNC_DOWNLOAD_FLIGHTS.do((ticker, interval), refresh_cache_async, ticker, start, end, interval,
+                                             incremental=cache_age is not None, downloader=downloader, timeout=timeout)
+        if df.empty:
+            return df
+        await ASYNC_DOWNLOAD_FLIGHTS.do((ticker, interval, 'gap'), extend_cache_start_async,
+                                        ticker, start, interval, downloader=downloader, timeout=timeout)
+        return CACHE_STORE.read_range(ticker, interval, start, end)[['Close']]
     except Exception as e:
-        print(f"YFinance Download Error: {e}")
+        logger.error("YFinance Download Error: %r", e)
         # Jika gagal fetch bar, coba baca cache lama (sebagai fallback ultimate)
-        if os.path.exists(cache_file):
-             print("FALLBACK: Menggunakan cache kadaluarsa karena API error.")
-             return pd.read_csv(cache_file, index_col=0, parse_dates=True)[['Close']]
+        if CACHE_STORE.exists(ticker, interval):
+             PRICE_CACHE_EVENTS.labels('fallback').inc()
+             logger.warning("FALLBACK: Menggunakan cache kadaluarsa %s karena API error.", ticker)
+             return CACHE_STORE.read_range(ticker, interval, start, end)[['Close']]
         raise e
 
-def preprocess_data(df):
+def preprocess_data(df, dtype=None):
     """
     Normalisasi data menggunakan MinMaxScaler.
     LSTM bekerja lebih baik jika data berada dalam rentang 0 sampai 1.
+
+    Parameter scaler (min & skala) dihitung dari harga asli float64, sedangkan hasil normalisasi
+    langsung dibuat dalam dtype pipeline (`BaseConfig.DTYPE`, default float32) tanpa salinan float64.
     
     Args:
         df (DataFrame): Data harga asli
+        dtype (str): dtype hasil normalisasi (default: BaseConfig.DTYPE)
         
     Returns:
         tuple: (data_ternormalisasi, objek_scaler)
     """
+    # sklearn hanya dibutuhkan saat pelatihan
+    from sklearn.preprocessing import MinMaxScaler
+
     scaler = MinMaxScaler(feature_range=(0, 1))
-    scaled_data = scaler.fit_transform(df)
+    scaler.fit(df.to_numpy(dtype=np.float64))
+    scaled_data = scaler.transform(df.to_numpy(dtype=dtype or BaseConfig.DTYPE))
     return scaled_data, scaler
 
-def create_sequences(data, lookback, prediction_days):
+def create_sequences(data, lookback, prediction_days, features=0, target=0, materialize=False):
     """
     Membuat urutan (sequences) data untuk pelatihan LSTM (Sliding Window).
-    
+
+    Window dibangun sebagai *strided view* di atas `data` (tanpa alokasi per baris),
+    sehingga X dan y yang dikembalikan bersifat read-only dan berbagi memori dengan `data`.
+    Gunakan `materialize=True` jika pemanggil membutuhkan salinan array yang contiguous.
+
     Args:
-        data (array): Data harga yang sudah dinormalisasi
+        data (array): Data harga yang sudah dinormalisasi, bentuk (n,) atau (n, n_kolom)
         lookback (int): Jumlah langkah waktu ke belakang (Input X)
         prediction_days (int): Jumlah langkah waktu ke depan yang diprediksi (Target y)
-        
+        features (int | list | None): Kolom input. int -> X berbentuk (sampel, lookback),
+            list/None (semua kolom) -> X berbentuk (sampel, lookback, n_fitur)
+        target (int): Kolom yang dijadikan target y
+        materialize (bool): Salin hasil view menjadi array contiguous yang bisa ditulis
+
     Returns:
         tuple: (X, y) array numpy
     """
-    X, y = [], []
-    # Loop melalui data untuk membuat pasangan input-output
-    # Kita berhenti lebih awal agar memiliki cukup data untuk target prediksi di akhir
-    for i in range(lookback, len(data) - prediction_days + 1):
-        # X: Data dari index (i-lookback) sampai i
-        X.append(data[i-lookback:i, 0])
-        # y: Data dari index i sampai (i+prediction_days) -> Target multi-step
-        y.append(data[i:i+prediction_days, 0])
-        
-    return np.array(X), np.array(y)
+    data = np.asarray(data)
+    if data.ndim == 1:
+        data = data.reshape(-1, 1)
+
+    # Jumlah pasangan input-output; berhenti lebih awal agar target di akhir tetap lengkap
+    n_samples = max(len(data) - lookback - prediction_days + 1, 0)
+    if n_samples == 0:
+        # Data terlalu pendek: kembalikan array kosong dengan bentuk yang konsisten
+        if isinstance(features, (int, np.integer)):
+            x_shape = (0, lookback)
+        else:
+            n_features = data.shape[1] if features is None else len(features)
+            x_shape = (0, lookback, n_features)
+        return np.empty(x_shape, dtype=data.dtype), np.empty((0, prediction_days), dtype=data.dtype)
+
+    # X: window ke-i mencakup index (i-lookback) sampai i
+    if isinstance(features, (int, np.integer)):
+        X = sliding_window_view(data[:, features], lookback)[:n_samples]
+    else:
+        source = data if features is None else data[:, features]
+        # (sampel, n_fitur, lookback) -> (sampel, lookback, n_fitur), tetap berupa view
+        X = sliding_window_view(source, lookback, axis=0)[:n_samples].transpose(0, 2, 1)
+
+    # y: window dimulai tepat setelah window X -> Target multi-step
+    y = sliding_window_view(data[:, target], prediction_days)[lookback:lookback + n_samples]
+
+    if materialize:
+        return np.ascontiguousarray(X), np.ascontiguousarray(y)
+    return X, y
+
+def load_scaled_data(conf, symbol, scaler_path, save_scaler=False):
+    """
+    Mengunduh data lalu menormalisasinya (langkah 1-2 dari load_and_process_data).
+    Dipakai langsung oleh pipeline tf.data yang membangun window sendiri secara lazy.
+
+    Args:
+        conf (Config): Objek konfigurasi (Hourly/Daily)
+        symbol (str): Simbol mata uang
+        scaler_path (str): Lokasi penyimpanan file scaler
+        save_scaler (bool): Apakah perlu menyimpan objek scaler ke disk
+
+    Returns:
+        tuple: (data_ternormalisasi, objek_scaler)
+    """
+    # 1. Ambil Data
+    df = fetch_data(symbol, conf.START_DATE, conf.END_DATE, interval=conf.INTERVAL)
+
+    # 2. Preprocess (Normalisasi)
+    scaled_data, scaler = preprocess_data(df, dtype=conf.DTYPE)
+
+    if save_scaler:
+        # Pastikan direktori ada sebelum menyimpan
+        os.makedirs(os.path.dirname(scaler_path), exist_ok=True)
+        joblib.dump(scaler, scaler_path)
+        # Sidecar parameter (min & skala) untuk inferensi cepat tanpa unpickle sklearn
+        save_params(scaler, scaler_params_path(scaler_path))
+        logger.info("Scaler berhasil disimpan ke %s", scaler_path)
+
+    return scaled_data, scaler
+
+def train_size_for(n_samples, test_size):
+    """
+    Jumlah sampel latih: sampel awal untuk latih, sisanya di akhir untuk uji (TimeSeriesSplit manual).
+    """
+    return int(n_samples * (1 - test_size))
 
 def load_and_process_data(conf, symbol, scaler_path, save_scaler=False):
     """
@@ -187,17 +646,8 @@ def load_and_process_data(conf, symbol, scaler_path, save_scaler=False):
     Returns:
         tuple: (X_train, y_train, X_test, y_test, scaler)
     """
-    # 1. Ambil Data
-    df = fetch_data(symbol, conf.START_DATE, conf.END_DATE, interval=conf.INTERVAL)
-    
-    # 2. Preprocess (Normalisasi)
-    scaled_data, scaler = preprocess_data(df)
-    
-    if save_scaler:
-        # Pastikan direktori ada sebelum menyimpan
-        os.makedirs(os.path.dirname(scaler_path), exist_ok=True)
-        joblib.dump(scaler, scaler_path)
-        print(f"Scaler berhasil disimpan ke {scaler_path}")
+    # 1-2. Ambil Data & Normalisasi
+    scaled_data, scaler = load_scaled_data(conf, symbol, scaler_path, save_scaler=save_scaler)
 
     # 3. Buat Sequences (Input X dan Target y)
     X, y = create_sequences(scaled_data, conf.LOOKBACK_WINDOW, conf.PREDICTION_STEPS)
@@ -208,7 +658,7 @@ def load_and_process_data(conf, symbol, scaler_path, save_scaler=False):
     
     # 5. Bagi Data Latih dan Uji (Train/Test Split)
     # Menggunakan data awal untuk latih, dan data akhir untuk uji (TimeSeriesSplit manual)
-    train_size = int(len(X) * (1 - conf.TEST_SIZE))
+    train_size = train_size_for(len(X), conf.TEST_SIZE)
     
     X_train, X_test = X[:train_size], X[train_size:]
     y_train, y_test = y[:train_size], y[train_size:]
@@ -0,0 +1,91 @@
+import hashlib
+import threading
+from datetime import datetime, timedelta, timezone
+
+
+class ForecastEntry:
+    """
+    Hasil forecast yang tersimpan beserta versi input yang menghasilkannya.
+    """
+    def __init__(self, version, results, expires_at):
+        self.version = version
+        self.results = results
+        self.expires_at = expires_at  # Perkiraan waktu bar baru muncul (UTC)
+        self.etag = hashlib.sha1(repr(version).encode('utf-8')).hexdigest()[:16]
+
+    def max_age(self, minimum=60):
+        """
+        Sisa detik sampai bar berikutnya diperkirakan muncul (untuk header Cache-Control).
+        """
+        remaining = (self.expires_at - datetime.now(timezone.utc)).total_seconds()
+        return max(int(remaining), minimum)
+
+
+class ForecastCache:
+    """
+    Cache hasil forecast per (simbol, mode).
+
+    Forecast tidak berubah sebelum bar baru muncul atau model dilatih ulang, sehingga setiap entri
+    diberi versi (sidik file model & scaler, timestamp bar terakhir). Entri otomatis dianggap usang
+    saat versinya berbeda, dan digantikan oleh hasil baru untuk (simbol, mode) yang sama.
+    """
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_entry(self, symbol, mode, version):
+        """
+        Mengembalikan entri forecast tersimpan jika versinya masih sama, selain itu None.
+        """
+        entry = self._entries.get((symbol, mode))
+        with self._lock:
+            if entry is not None and entry.version == version:
+                self.hits += 1
+                return entry
+            self.misses += 1
+        return None
+
+    def get(self, symbol, mode, version):
+        """
+        Mengembalikan forecast tersimpan jika versinya masih sama, selain itu None.
+        """
+        entry = self.get_entry(symbol, mode, version)
+        return None if entry is None else entry.results
+
+    def put(self, symbol, mode, version, results, bar_duration):
+        """
+        Menyimpan forecast baru; bar berikutnya diperkirakan muncul `bar_duration` setelah bar terakhir.
+
+        Returns:
+            ForecastEntry: Entri yang disimpan (ETag & Cache-Control untuk hasil ini)
+        """
+        last_timestamp = version[-1]
+        if last_timestamp.tzinfo is None:
+            last_timestamp = last_timestamp.replace(tzinfo=timezone.utc)
+        entry = ForecastEntry(version, results, last_timestamp + bar_duration)
+        self._entries[(symbol, mode)] = entry
+        return entry
+
+    def invalidate(self, symbol=None, mode=None):
+        """
+        Menghapus entri yang cocok dengan simbol dan/atau mode (semua entri jika keduanya None).
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if (symbol is None or key[0] == symbol) and (mode is None or key[1] == mode):
+                    del self._entries[key]
+
+    def stats(self):
+        """
+        Ringkasan statistik cache untuk monitoring.
+        """
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+def bar_duration(mode):
+    """
+    Durasi satu bar untuk mode tertentu.
+    """
+    return timedelta(hours=1) if mode == 'hourly' else timedelta(days=1)
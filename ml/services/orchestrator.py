@@ -0,0 +1,172 @@
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+from core.config import CONFIGS
+from core.logger import setup_logging
+
+logger = logging.getLogger(__name__)
+
+# Jumlah unduhan data paralel saat prefetch (unduhan I/O-bound, cukup beberapa thread)
+PREFETCH_WORKERS = 4
+
+
+def discover_symbols():
+    """
+    Mencari semua simbol yang sudah memiliki model terlatih di direktori models/ (untuk opsi --all).
+    """
+    symbols = set()
+    for conf in CONFIGS.values():
+        suffix = f"_{conf.MODE}_model.h5"
+        for path in glob.glob(os.path.join(conf.MODELS_DIR, f"*{suffix}")):
+            symbols.add(os.path.basename(path)[:-len(suffix)])
+    return sorted(symbols)
+
+
+def _init_worker(threads):
+    """
+    Initializer proses worker: batasi thread TensorFlow sebelum TensorFlow dimuat,
+    agar beberapa worker tidak berebut core CPU (oversubscription).
+    """
+    # Proses spawn tidak mewarisi konfigurasi logging proses utama
+    setup_logging()
+
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    os.environ['TF_NUM_INTRAOP_THREADS'] = str(threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = '1'
+
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def _run_job(symbol, mode, resume=False, finetune=False):
+    """
+    Menjalankan satu job pelatihan di proses worker.
+    """
+    from services.model_service import train_model, fine_tune_model
+
+    start = time.perf_counter()
+    try:
+        if finetune:
+            summary = fine_tune_model(CONFIGS[mode], symbol=symbol)
+        else:
+            summary = train_model(CONFIGS[mode], symbol=symbol, resume=resume)
+        summary['status'] = 'ok'
+    except Exception as e:
+        summary = {'symbol': symbol, 'mode': mode, 'status': 'error', 'error': str(e)}
+    summary['wall_time'] = time.perf_counter() - start
+    return summary
+
+
+def prefetch_data(symbols, modes, workers=PREFETCH_WORKERS):
+    """
+    Mengunduh data setiap (simbol, interval) satu kali di proses utama sebelum job dibagikan,
+    sehingga worker-worker pelatihan hanya membaca cache dan tidak mengunduh data yang sama berulang kali.
+    Unduhan dijalankan paralel di thread pool kecil; penulisan cache per (ticker, interval)
+    tetap dijaga oleh single-flight & lock tulis di data_service.
+    """
+    from services.data_service import fetch_data
+
+    def fetch(symbol, mode):
+        conf = CONFIGS[mode]
+        fetch_data(symbol, conf.START_DATE, conf.END_DATE, interval=conf.INTERVAL)
+
+    pairs = [(symbol, mode) for symbol in symbols for mode in modes]
+    if not pairs:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pairs))), thread_name_prefix='prefetch') as executor:
+        futures = {executor.submit(fetch, symbol, mode): (symbol, mode) for symbol, mode in pairs}
+        for future in as_completed(futures):
+            symbol, mode = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                # Worker akan mencoba lagi dan melaporkan error di ringkasan
+                logger.warning("Gagal mengunduh data %s (%s): %s", symbol, mode, e)
+
+
+def run_training_jobs(symbols, modes, workers=None, threads_per_worker=None, report_path=None, resume=False,
+                      finetune=False):
+    """
+    Melatih banyak pasangan (simbol, mode) secara paralel menggunakan process pool.
+
+    Args:
+        symbols (list): Daftar simbol mata uang
+        modes (list): Daftar mode ('daily' / 'hourly')
+        workers (int): Jumlah proses worker (default: jumlah job, maksimal jumlah CPU)
+        threads_per_worker (int): Thread TensorFlow per worker (default: CPU dibagi rata ke worker)
+        report_path (str): Lokasi file ringkasan JSON (opsional)
+        resume (bool): Lanjutkan setiap job dari checkpoint terakhir jika ada
+        finetune (bool): Fine-tune model yang sudah ada alih-alih melatih ulang dari awal
+
+    Returns:
+        dict: Ringkasan seluruh job (durasi per job dan val loss akhir)
+    """
+    jobs = [(symbol, mode) for symbol in symbols for mode in modes]
+    cpu_count = os.cpu_count() or 1
+    workers = workers or min(len(jobs), cpu_count)
+    threads_per_worker = threads_per_worker or max(1, cpu_count // workers)
+
+    logger.info("Menjalankan %d job pelatihan dengan %d worker x %d thread...", len(jobs), workers, threads_per_worker)
+    start = time.perf_counter()
+    prefetch_data(symbols, modes)
+
+    results = []
+    # 'spawn' agar setiap worker memulai TensorFlow dari awal (fork tidak aman untuk runtime TF)
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(threads_per_worker,)) as executor:
+        futures = {executor.submit(_run_job, symbol, mode, resume, finetune): (symbol, mode) for symbol, mode in jobs}
+        for future in as_completed(futures):
+            symbol, mode = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                # Worker mati (cth: kehabisan memori)
+                summary = {'symbol': symbol, 'mode': mode, 'status': 'error', 'error': str(e)}
+            results.append(summary)
+            logger.info("Selesai: %s (%s) -> %s", symbol, mode, summary['status'])
+
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'workers': workers,
+        'threads_per_worker': threads_per_worker,
+        'wall_time': time.perf_counter() - start,
+        'jobs': sorted(results, key=lambda r: (r['symbol'], r['mode'])),
+    }
+
+    if report_path:
+        save_report(report, report_path)
+
+    return report
+
+
+def save_report(report, report_path):
+    """
+    Menyimpan ringkasan pelatihan sebagai file JSON.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    logger.info("Ringkasan pelatihan disimpan ke %s", report_path)
+
+
+def print_report(report):
+    """
+    Menampilkan ringkasan pelatihan dalam bentuk tabel di terminal.
+    """
+    print("-" * 100)
+    print(f"{'Simbol':<14} {'Mode':<8} {'Status':<7} {'Epoch':>6} {'Val Loss':>12} {'Durasi (s)':>12} "
+          f"{'Epoch Hemat':>12} {'Hemat (s)':>12}")
+    for job in report['jobs']:
+        val_loss = f"{job['final_val_loss']:.6f}" if 'final_val_loss' in job else '-'
+        saved = f"{job['wall_time_saved']:.1f}" if 'wall_time_saved' in job else '-'
+        print(f"{job['symbol']:<14} {job['mode']:<8} {job['status']:<7} {job.get('epochs', '-'):>6} "
+              f"{val_loss:>12} {job['wall_time']:>12.1f} {job.get('epochs_saved', '-'):>12} {saved:>12}")
+    print(f"Total durasi: {report['wall_time']:.1f} detik")
+    print("-" * 100)
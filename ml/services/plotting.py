@@ -0,0 +1,120 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+def render_lines(path, lines, title, xlabel, ylabel, figsize=(10, 6), grid=False):
+    """
+    Menggambar grafik garis dan menyimpannya ke file PNG.
+
+    Memakai API berorientasi objek matplotlib (Figure + canvas Agg), bukan state global pyplot,
+    sehingga aman dipanggil dari thread mana pun. Figure tidak didaftarkan ke pyplot dan
+    dibersihkan setelah disimpan, jadi memori tidak menumpuk antar pemanggilan.
+
+    Args:
+        path (str): Lokasi file gambar
+        lines (list): Daftar (x, y, kwargs_plot); x boleh None untuk index 0..n-1
+        title, xlabel, ylabel (str): Judul dan label sumbu
+        figsize (tuple): Ukuran gambar (inci)
+        grid (bool): Tampilkan grid
+    """
+    # matplotlib diimport lazy agar modul ini ringan untuk jalur yang tidak membuat plot
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    for x, y, kwargs in lines:
+        if x is None:
+            ax.plot(y, **kwargs)
+        else:
+            ax.plot(x, y, **kwargs)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.legend()
+    if grid:
+        ax.grid(True)
+
+    try:
+        fig.savefig(path)
+    finally:
+        # Lepaskan semua artist agar memori figure langsung bisa dibebaskan
+        fig.clear()
+    return path
+
+
+class PlotRenderer:
+    """
+    Worker rendering plot di luar jalur request/pelatihan.
+
+    Pekerjaan rendering dimasukkan ke antrean satu thread khusus (ThreadPoolExecutor), sehingga
+    `predict_future` dan `train_model` langsung kembali tanpa menunggu file gambar selesai ditulis.
+    Thread worker diselesaikan otomatis saat interpreter berhenti, jadi skrip CLI tetap menulis
+    semua gambar sebelum keluar. Gunakan `wait()` jika pemanggil membutuhkan file segera.
+    """
+    def __init__(self, workers=1, verbose=True):
+        self.workers = workers
+        self.verbose = verbose
+        self.rendered = 0
+        self.failed = 0
+        self._executor = None
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Menjadwalkan `func(*args, **kwargs)` di thread rendering.
+
+        Returns:
+            Future: Selesai saat gambar tersimpan (berisi path) atau gagal (berisi exception)
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='plot-render')
+            future = self._executor.submit(self._run, func, *args, **kwargs)
+            self._pending.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def _run(self, func, *args, **kwargs):
+        try:
+            path = func(*args, **kwargs)
+        except Exception as e:
+            self.failed += 1
+            logger.error("PLOT: Gagal membuat grafik: %s", e)
+            raise
+        self.rendered += 1
+        if self.verbose:
+            logger.info("PLOT: Grafik disimpan ke %s", path)
+        return path
+
+    def _discard(self, future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def wait(self, timeout=None):
+        """
+        Menunggu semua rendering yang sedang antre selesai.
+        """
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                # Error sudah dicatat di _run
+                pass
+
+    def stats(self):
+        """
+        Ringkasan antrean rendering untuk monitoring.
+        """
+        return {'pending': len(self._pending), 'rendered': self.rendered, 'failed': self.failed}
+
+
+# Renderer tunggal untuk predictor dan pelatihan
+PLOT_RENDERER = PlotRenderer()
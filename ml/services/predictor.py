@@ -1,96 +1,157 @@
+import asyncio
+import logging
 import numpy as np
 import os
 import pandas as pd
-import yfinance as yf
-from tensorflow.keras.models import load_model
-import joblib
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-from core.config import CONFIGS
+from core.config import CONFIGS, BaseConfig
+from services.model_registry import ModelRegistry, file_signature
+from services.forecast_cache import ForecastCache, bar_duration
+from services.inference import NumpyLSTMModel, load_bundle
+from services.scaling import load_scaler, scaler_params_path
+from services.metrics import stage
+from services.plotting import PLOT_RENDERER, render_lines
 
-# Cache Memori untuk menyimpan model yang sudah dimuat
+logger = logging.getLogger(__name__)
+
+# Cache Memori untuk menyimpan model dan scaler yang sudah dimuat
 # Agar tidak perlu membaca file dari disk setiap kali prediksi (Mempercepat API)
-LOADED_MODELS = {}
+# Dibatasi dengan kebijakan LRU agar memori tidak terus bertambah untuk banyak simbol
+MODEL_REGISTRY = ModelRegistry(
+    max_entries=BaseConfig.MODEL_CACHE_MAX_ENTRIES,
+    max_bytes=BaseConfig.MODEL_CACHE_MAX_BYTES
+)
+
+# Cache hasil forecast: forecast hanya berubah saat bar baru muncul atau model dilatih ulang
+FORECAST_CACHE = ForecastCache()
 
 def get_model_from_cache(symbol, model_path):
     """
     Mengambil model dari cache memori jika ada, jika tidak, muat dari disk.
+    Model dimuat ulang otomatis jika file model (.h5 / .npz) di disk berubah.
     """
-    if symbol in LOADED_MODELS:
-        return LOADED_MODELS[symbol]
-    
-    print(f"Memuat model untuk {symbol} dari disk...")
-    # Load model Keras (.h5)
-    model = load_model(model_path)
-    LOADED_MODELS[symbol] = model
-    return model
+    return MODEL_REGISTRY.get(f"{symbol}:model", model_path, _load_model)
 
-def predict_future(mode, symbol='USDIDR=X', plot=True):
+def get_scaler_from_cache(symbol, scaler_path):
     """
-    Fungsi utama untuk membuat prediksi masa depan.
-    
-    Langkah-langkah:
-    1. Load Model dan Scaler yang sesuai dengan mode dan simbol.
-    2. Ambil data harga terbaru dari Yahoo Finance (sebagai konteks input).
-    3. Lakukan prediksi menggunakan model.
-    4. Generate timestamp untuk hasil prediksi.
-    5. (Opsional) Buat grafik hasil prediksi.
-    
-    Returns:
-        list: Daftar dictionary berisi {step, timestamp, value}
+    Mengambil scaler dari cache memori jika ada, jika tidak, muat dari disk.
+    Scaler selalu dikembalikan sebagai MinMaxParams (transform NumPy tanpa overhead sklearn).
+    """
+    return MODEL_REGISTRY.get(f"{symbol}:scaler", scaler_path, _load_scaler)
+
+def _load_model(model_path):
+    logger.info("Memuat model dari %s...", model_path)
+    with stage('model_load'):
+        if model_path.endswith('.npz'):
+            # Bundle bobot NumPy: tidak perlu memuat TensorFlow
+            return load_bundle(model_path)
+        # Load model Keras (.h5); TensorFlow hanya diimport saat backend Keras benar-benar dipakai
+        from tensorflow.keras.models import load_model
+        return load_model(model_path)
+
+def _load_scaler(scaler_path):
+    with stage('scaler_load'):
+        return load_scaler(scaler_path)
+
+def model_artifact_path(conf, symbol):
+    """
+    File model yang dipakai untuk inferensi sesuai `INFERENCE_BACKEND`: bundle bobot .npz untuk backend
+    'numpy' (jika sudah diekspor dan tidak lebih lama dari .h5), selain itu model Keras .h5.
     """
-    if mode not in CONFIGS:
-        raise ValueError(f"Mode tidak valid: {mode}. Opsi: {list(CONFIGS.keys())}")
-    
-    conf = CONFIGS[mode]
     paths = conf.get_paths(symbol)
-    
-    print(f"Memulai prediksi mode {mode.upper()} untuk {symbol}...")
+    if conf.INFERENCE_BACKEND == 'numpy':
+        # Bundle yang lebih lama dari .h5 berarti model dilatih ulang tanpa ekspor ulang
+        if os.path.exists(paths['weights']) and (
+                not os.path.exists(paths['model'])
+                or os.path.getmtime(paths['weights']) >= os.path.getmtime(paths['model'])):
+            return paths['weights']
+    return paths['model']
 
-    # 1. Load Model dan Scaler
-    try:
-        # Cek apakah file model dan scaler ada
-        if not os.path.exists(paths['model']) or not os.path.exists(paths['scaler']):
-            print(f"Artifact tidak ditemukan untuk {symbol}. Silakan latih model terlebih dahulu.")
-            return []
-            
-        # Gunakan cache untuk performa
-        model = get_model_from_cache(f"{symbol}_{mode}", paths['model'])
-        scaler = joblib.load(paths['scaler'])
-    except Exception as e:
-        print(f"Error memuat model atau scaler: {e}")
-        return []
+def scaler_artifact_path(conf, symbol):
+    """
+    File scaler yang dipakai untuk inferensi: sidecar parameter .json jika ada dan tidak lebih lama
+    dari scaler sklearn .pkl, selain itu .pkl (model lama yang belum diekspor ulang).
+    """
+    scaler_path = conf.get_paths(symbol)['scaler']
+    params_path = scaler_params_path(scaler_path)
+    if os.path.exists(params_path) and (
+            not os.path.exists(scaler_path) or os.path.getmtime(params_path) >= os.path.getmtime(scaler_path)):
+        return params_path
+    return scaler_path
 
-    # 2. Ambil Data Terbaru (Gunakan data_service dengan caching)
-    from services.data_service import fetch_data
-    
+def load_artifacts(conf, symbol, mode):
+    """
+    Memuat model dan scaler (melalui cache) untuk simbol dan mode tertentu.
+
+    Raises:
+        FileNotFoundError: Jika model atau scaler belum dilatih
+    """
+    model_path = model_artifact_path(conf, symbol)
+    scaler_path = scaler_artifact_path(conf, symbol)
+    # Cek apakah file model dan scaler ada
+    if not os.path.exists(model_path) or not os.path.exists(scaler_path):
+        raise FileNotFoundError(f"Artifact tidak ditemukan untuk {symbol}. Silakan latih model terlebih dahulu.")
+
+    # Gunakan cache untuk performa
+    model = get_model_from_cache(f"{symbol}_{mode}", model_path)
+    scaler = get_scaler_from_cache(f"{symbol}_{mode}", scaler_path)
+    return model, scaler
+
+def recent_range(conf, mode):
+    """
+    Rentang tanggal data terbaru yang cukup untuk satu window input (60 hari per jam / 120 hari harian).
+    """
     end_date = datetime.now()
     start_date = end_date - timedelta(days=60 if mode == 'hourly' else 120) 
-    
-    try:
-        df = fetch_data(symbol, start=start_date.strftime('%Y-%m-%d'), end=end_date.strftime('%Y-%m-%d'), interval=conf.INTERVAL)
-    except Exception as e:
-        print(f"Error fetching data: {e}")
-        return []
+    return dict(start=start_date.strftime('%Y-%m-%d'), end=end_date.strftime('%Y-%m-%d'), interval=conf.INTERVAL)
+
+def window_from_data(conf, symbol, df, scaler):
+    """
+    Menyiapkan window input model yang sudah dinormalisasi dari data harga terbaru.
+
+    Returns:
+        tuple: (timestamp_terakhir, data_asli (lookback, 1), data_ternormalisasi (lookback, 1))
 
+    Raises:
+        ValueError: Jika data terbaru tidak cukup untuk satu window
+    """
     if df.empty or len(df) < conf.LOOKBACK_WINDOW:
-        print(f"Data terbaru tidak cukup untuk {symbol} ({len(df)} rows).")
-        return []
+        raise ValueError(f"Data terbaru tidak cukup untuk {symbol} ({len(df)} rows).")
 
     # Ambil window terakhir untuk input model
     recent_data = df[['Close']].values[-conf.LOOKBACK_WINDOW:]
-    # Normalisasi data input menggunakan scaler yang sama saat training
-    recent_data_scaled = scaler.transform(recent_data)
-    # Reshape ke format [1 sample, lookback, 1 feature]
-    X_input = np.reshape(recent_data_scaled, (1, conf.LOOKBACK_WINDOW, 1))
-    
-    # 3. Lakukan Prediksi
-    prediction_scaled = model.predict(X_input, verbose=0)
-    # Kembalikan ke harga asli
-    prediction = scaler.inverse_transform(prediction_scaled.reshape(-1, 1)).flatten()
-    
-    # 4. Generate Timestamps (Waktu Masa Depan)
-    last_timestamp = df.index[-1]
+    # Normalisasi data input menggunakan scaler yang sama saat training, langsung dalam dtype pipeline
+    with stage('preprocess'):
+        recent_data_scaled = scaler.transform(recent_data.astype(conf.DTYPE, copy=False))
+    return df.index[-1], recent_data, recent_data_scaled
+
+def prepare_input(conf, symbol, mode, scaler, stale_while_revalidate=False):
+    """
+    Mengambil data harga terbaru dan menyiapkan window input model yang sudah dinormalisasi.
+    Lihat `window_from_data` untuk nilai kembalian dan `fetch_data` untuk `stale_while_revalidate`.
+    """
+    from services.data_service import fetch_data
+
+    df = fetch_data(symbol, **recent_range(conf, mode), stale_while_revalidate=stale_while_revalidate)
+    return window_from_data(conf, symbol, df, scaler)
+
+def forecast_version(conf, symbol, last_timestamp):
+    """
+    Versi input sebuah forecast: sidik file model & scaler serta timestamp bar terakhir.
+    Forecast dengan versi yang sama pasti menghasilkan nilai yang sama.
+    """
+    if isinstance(last_timestamp, pd.Timestamp):
+        last_timestamp = last_timestamp.to_pydatetime()
+    return (file_signature(model_artifact_path(conf, symbol)), file_signature(scaler_artifact_path(conf, symbol)),
+            last_timestamp)
+
+def build_forecast(mode, last_timestamp, prediction):
+    """
+    Menyusun hasil prediksi beserta timestamp masa depan untuk setiap langkah.
+
+    Returns:
+        list: Daftar dictionary berisi {step, timestamp, value}
+    """
     # Pastikan last_timestamp adalah objek datetime python
     if isinstance(last_timestamp, pd.Timestamp):
         last_timestamp = last_timestamp.to_pydatetime()
@@ -114,16 +175,231 @@ def predict_future(mode, symbol='USDIDR=X', plot=True):
             "timestamp": current_time.isoformat(),
             "value": float(price)
         })
+    return results
+
+def predict_future(mode, symbol='USDIDR=X', plot=True, stale_while_revalidate=False):
+    """
+    Fungsi utama untuk membuat prediksi masa depan. Lihat `forecast_future`.
+
+    Returns:
+        list: Daftar dictionary berisi {step, timestamp, value}, atau list kosong jika gagal
+    """
+    entry = forecast_future(mode, symbol, plot, stale_while_revalidate)
+    return [] if entry is None else entry.results
+
+def forecast_future(mode, symbol='USDIDR=X', plot=True, stale_while_revalidate=False):
+    """
+    Membuat prediksi masa depan beserta versinya (untuk header ETag/Cache-Control).
+    
+    Langkah-langkah:
+    1. Load Model dan Scaler yang sesuai dengan mode dan simbol.
+    2. Ambil data harga terbaru dari Yahoo Finance (sebagai konteks input).
+    3. Lakukan prediksi menggunakan model.
+    4. Generate timestamp untuk hasil prediksi.
+    5. (Opsional) Buat grafik hasil prediksi.
+
+    Args:
+        stale_while_revalidate (bool): Layani cache harga kadaluarsa tanpa menunggu unduhan
+            (untuk jalur API, lihat `fetch_data`)
+    
+    Returns:
+        ForecastEntry: Hasil forecast (`results`) dan ETag-nya, atau None jika gagal
+    """
+    if mode not in CONFIGS:
+        raise ValueError(f"Mode tidak valid: {mode}. Opsi: {list(CONFIGS.keys())}")
+    
+    conf = CONFIGS[mode]
+    
+    logger.debug("Memulai prediksi mode %s untuk %s...", mode.upper(), symbol)
+
+    # 1. Load Model dan Scaler
+    try:
+        model, scaler = load_artifacts(conf, symbol, mode)
+    except FileNotFoundError as e:
+        logger.warning("%s", e)
+        return None
+    except Exception as e:
+        logger.error("Error memuat model atau scaler %s: %s", symbol, e)
+        return None
+
+    # 2. Ambil Data Terbaru (Gunakan data_service dengan caching)
+    try:
+        last_timestamp, recent_data, recent_data_scaled = prepare_input(conf, symbol, mode, scaler,
+                                                                        stale_while_revalidate)
+    except Exception as e:
+        logger.error("Error fetching data %s: %s", symbol, e)
+        return None
+
+    return run_forecast(conf, symbol, mode, model, scaler, last_timestamp, recent_data, recent_data_scaled, plot=plot)
+
+def run_forecast(conf, symbol, mode, model, scaler, last_timestamp, recent_data, recent_data_scaled, plot=False):
+    """
+    Menjalankan model pada window input (atau memakai forecast tersimpan) dan menyusun hasilnya.
+
+    Returns:
+        ForecastEntry: Hasil forecast (`results`, daftar {step, timestamp, value}) beserta versi & ETag
+            milik hasil tersebut, sehingga header tidak perlu dibaca ulang dari cache yang bisa
+            sudah diganti request/scheduler lain
+    """
+    # Gunakan forecast tersimpan jika belum ada bar baru dan model tidak berubah
+    version = forecast_version(conf, symbol, last_timestamp)
+    if not plot:
+        cached = FORECAST_CACHE.get_entry(symbol, mode, version)
+        if cached is not None:
+            return cached
+
+    # Reshape ke format [1 sample, lookback, 1 feature]
+    X_input = np.reshape(recent_data_scaled, (1, conf.LOOKBACK_WINDOW, 1))
+    
+    # 3. Lakukan Prediksi
+    with stage('predict'):
+        prediction_scaled = model.predict(X_input, verbose=0)
+    with stage('postprocess'):
+        # Kembalikan ke harga asli
+        prediction = scaler.inverse_transform(prediction_scaled.reshape(-1, 1)).flatten()
+        # 4. Generate Timestamps (Waktu Masa Depan)
+        results = build_forecast(mode, last_timestamp, prediction)
+    entry = FORECAST_CACHE.put(symbol, mode, version, results, bar_duration(mode))
 
     if plot:
-        generate_plot(conf, symbol, paths['forecast_plot'], recent_data, prediction, scaler, mode)
+        generate_plot(conf, symbol, conf.get_paths(symbol)['forecast_plot'], recent_data, prediction, scaler, mode)
 
-    return results
+    return entry
+
+async def predict_future_async(mode, symbol='USDIDR=X'):
+    """
+    Versi asyncio dari `predict_future` (tanpa plot). Lihat `forecast_future_async`.
+
+    Returns:
+        list: Daftar dictionary berisi {step, timestamp, value}, atau list kosong jika gagal
+    """
+    entry = await forecast_future_async(mode, symbol)
+    return [] if entry is None else entry.results
+
+async def forecast_future_async(mode, symbol='USDIDR=X'):
+    """
+    Versi asyncio dari `forecast_future` (tanpa plot) untuk endpoint async.
+
+    Pengambilan data memakai `fetch_data_async` sehingga retry ke Yahoo Finance tidak memblokir worker,
+    sedangkan pemuatan artefak dan inferensi model (CPU-bound) dijalankan di thread executor.
+
+    Returns:
+        ForecastEntry: Hasil forecast (`results`) dan ETag-nya, atau None jika gagal
+    """
+    from services.data_service import fetch_data_async
+
+    if mode not in CONFIGS:
+        raise ValueError(f"Mode tidak valid: {mode}. Opsi: {list(CONFIGS.keys())}")
+
+    conf = CONFIGS[mode]
+    logger.debug("Memulai prediksi mode %s untuk %s...", mode.upper(), symbol)
+
+    # 1. Load Model dan Scaler (bisa membaca disk, jalankan di executor)
+    try:
+        model, scaler = await asyncio.to_thread(load_artifacts, conf, symbol, mode)
+    except FileNotFoundError as e:
+        logger.warning("%s", e)
+        return None
+    except Exception as e:
+        logger.error("Error memuat model atau scaler %s: %s", symbol, e)
+        return None
+
+    # 2. Ambil Data Terbaru tanpa memblokir event loop
+    try:
+        df = await fetch_data_async(symbol, **recent_range(conf, mode))
+        last_timestamp, recent_data, recent_data_scaled = window_from_data(conf, symbol, df, scaler)
+    except Exception as e:
+        logger.error("Error fetching data %s: %r", symbol, e)
+        return None
+
+    # 3-4. Inferensi di executor
+    return await asyncio.to_thread(run_forecast, conf, symbol, mode, model, scaler,
+                                   last_timestamp, recent_data, recent_data_scaled)
+
+def predict_many(mode, symbols):
+    """
+    Prediksi untuk banyak simbol sekaligus.
+
+    Setiap simbol memiliki model sendiri. Untuk backend NumPy, model simbol-simbol dengan topologi dan
+    ukuran bobot yang sama ditumpuk (`NumpyLSTMModel.stack`) sehingga seluruh simbol tersebut dihitung
+    dalam satu forward pass (loop waktu LSTM dijalankan sekali, bukan sekali per simbol).
+    Model Keras tidak bisa ditumpuk sehingga tetap dijalankan satu per simbol.
+    Kegagalan satu simbol tidak menggagalkan simbol lainnya. Seperti endpoint async, cache harga
+    kadaluarsa langsung dipakai sementara pembaruannya berjalan di latar belakang.
+
+    Returns:
+        tuple: (hasil {simbol: list forecast}, error {simbol: pesan error})
+    """
+    if mode not in CONFIGS:
+        raise ValueError(f"Mode tidak valid: {mode}. Opsi: {list(CONFIGS.keys())}")
+
+    conf = CONFIGS[mode]
+    results, errors = {}, {}
+    # Kelompok forward pass: {key: [(simbol, model, scaler, versi_forecast, input), ...]}
+    # key = signature bobot untuk model NumPy (bisa ditumpuk), path model untuk Keras
+    groups = {}
+
+    logger.debug("Memulai prediksi batch mode %s untuk %d simbol...", mode.upper(), len(symbols))
+
+    # 1. Siapkan model, scaler, dan window input setiap simbol
+    for symbol in dict.fromkeys(symbols):
+        try:
+            model, scaler = load_artifacts(conf, symbol, mode)
+            last_timestamp, _, recent_data_scaled = prepare_input(conf, symbol, mode, scaler,
+                                                                  stale_while_revalidate=True)
+            version = forecast_version(conf, symbol, last_timestamp)
+        except Exception as e:
+            errors[symbol] = str(e)
+            continue
+
+        cached = FORECAST_CACHE.get(symbol, mode, version)
+        if cached is not None:
+            results[symbol] = cached
+            continue
+        if isinstance(model, NumpyLSTMModel):
+            key = model.weights_signature()
+        else:
+            key = model_artifact_path(conf, symbol)
+        groups.setdefault(key, []).append((symbol, model, scaler, version, recent_data_scaled))
+
+    # 2. Satu forward pass per kelompok untuk seluruh simbol di dalamnya
+    for members in groups.values():
+        try:
+            with stage('predict'):
+                if len(members) == 1:
+                    _, model, _, _, recent_data_scaled = members[0]
+                    prediction_scaled = model.predict(recent_data_scaled[None], verbose=0)
+                else:
+                    # Input (simbol, 1, lookback, 1) -> prediksi (simbol, 1, langkah)
+                    stacked = NumpyLSTMModel.stack([model for _, model, _, _, _ in members])
+                    X_batch = np.stack([recent_data_scaled[None] for _, _, _, _, recent_data_scaled in members])
+                    prediction_scaled = stacked.predict(X_batch)[:, 0]
+        except Exception as e:
+            for symbol, _, _, _, _ in members:
+                errors[symbol] = str(e)
+            continue
+
+        # 3. Kembalikan ke harga asli dan buat timestamp per simbol
+        for (symbol, _, scaler, version, _), row in zip(members, prediction_scaled):
+            with stage('postprocess'):
+                prediction = scaler.inverse_transform(row.reshape(-1, 1)).flatten()
+                results[symbol] = build_forecast(mode, version[-1], prediction)
+            FORECAST_CACHE.put(symbol, mode, version, results[symbol], bar_duration(mode))
+
+    # Kembalikan hasil sesuai urutan simbol pada request
+    results = {symbol: results[symbol] for symbol in dict.fromkeys(symbols) if symbol in results}
+
+    return results, errors
 
 def generate_plot(conf, symbol, plot_path, recent_data, forecast, scaler, mode):
     """
     Membuat visualisasi grafik prediksi masa depan.
     Menyambungkan garis data historis dengan garis prediksi.
+
+    Rendering dijalankan di worker plot (services/plotting.py), sehingga fungsi ini langsung kembali.
+
+    Returns:
+        Future: Selesai saat file grafik tersimpan
     """
     # recent_data sudah harga asli, tidak perlu inverse transform
     history = recent_data.flatten()
@@ -136,15 +412,16 @@ def generate_plot(conf, symbol, plot_path, recent_data, forecast, scaler, mode):
     history_indices = list(range(len(history)))
     # Index forecast dimulai dari index terakhir history
     forecast_indices = list(range(len(history) - 1, len(history) + len(forecast)))
-    
-    plt.figure(figsize=(12, 6))
-    plt.plot(history_indices, history, label=f'Riwayat (Last {conf.LOOKBACK_WINDOW} {conf.TIME_UNIT})', color='blue')
-    plt.plot(forecast_indices, forecast_with_connector, label=f'Prediksi (Next {conf.PREDICTION_STEPS} {conf.TIME_UNIT})', color='red', marker='o')
-    plt.title(f'{mode.title()} Currency Forecast: {symbol}')
-    plt.xlabel(f'Langkah Waktu ({conf.TIME_UNIT})')
-    plt.ylabel('Harga')
-    plt.legend()
-    plt.grid(True)
-    
-    plt.savefig(plot_path)
-    print(f"Grafik Forecast disimpan ke {plot_path}")
+
+    lines = [
+        (history_indices, history, dict(label=f'Riwayat (Last {conf.LOOKBACK_WINDOW} {conf.TIME_UNIT})', color='blue')),
+        (forecast_indices, forecast_with_connector, dict(label=f'Prediksi (Next {conf.PREDICTION_STEPS} {conf.TIME_UNIT})', color='red', marker='o')),
+    ]
+    return PLOT_RENDERER.submit(
+        render_lines, plot_path, lines,
+        title=f'{mode.title()} Currency Forecast: {symbol}',
+        xlabel=f'Langkah Waktu ({conf.TIME_UNIT})',
+        ylabel='Harga',
+        figsize=(12, 6),
+        grid=True
+    )
@@ -0,0 +1,98 @@
+import json
+import os
+import numpy as np
+
+# Versi format sidecar parameter scaler (.json); naikkan jika isi file berubah
+SCALER_FORMAT_VERSION = 1
+
+
+def scaler_params_path(scaler_path):
+    """
+    Lokasi sidecar parameter scaler (.json) di samping file scaler sklearn (`get_paths(symbol)['scaler']`).
+    """
+    return f"{os.path.splitext(scaler_path)[0]}.json"
+
+
+class MinMaxParams:
+    """
+    Representasi minimal MinMaxScaler: hanya array `min_` dan `scale_` per kolom.
+
+    Hasil `transform` / `inverse_transform` identik dengan sklearn (operasi dan urutan pembulatan sama),
+    tanpa validasi input sklearn di setiap pemanggilan. Input boleh berbentuk apa saja selama sumbu
+    terakhir adalah kolom fitur, misalnya satu window (lookback, 1) atau batch window (batch, lookback, 1).
+    Input float32 menghasilkan float32 dan float64 menghasilkan float64, sama seperti sklearn.
+    """
+    def __init__(self, min_, scale_, data_min=None, data_max=None, feature_range=(0, 1)):
+        self.min_ = np.asarray(min_, dtype=np.float64)
+        self.scale_ = np.asarray(scale_, dtype=np.float64)
+        self.data_min_ = None if data_min is None else np.asarray(data_min, dtype=np.float64)
+        self.data_max_ = None if data_max is None else np.asarray(data_max, dtype=np.float64)
+        self.feature_range = tuple(feature_range)
+
+    @classmethod
+    def from_sklearn(cls, scaler):
+        return cls(scaler.min_, scaler.scale_, scaler.data_min_, scaler.data_max_, scaler.feature_range)
+
+    @staticmethod
+    def _as_float(X):
+        X = np.asarray(X)
+        dtype = X.dtype if X.dtype in (np.float32, np.float64) else np.float64
+        return np.array(X, dtype=dtype)
+
+    def transform(self, X):
+        X = self._as_float(X)
+        X *= self.scale_
+        X += self.min_
+        return X
+
+    def inverse_transform(self, X):
+        X = self._as_float(X)
+        X -= self.min_
+        X /= self.scale_
+        return X
+
+    def to_dict(self):
+        return {
+            'version': SCALER_FORMAT_VERSION,
+            'min': self.min_.tolist(),
+            'scale': self.scale_.tolist(),
+            'data_min': None if self.data_min_ is None else self.data_min_.tolist(),
+            'data_max': None if self.data_max_ is None else self.data_max_.tolist(),
+            'feature_range': list(self.feature_range),
+        }
+
+
+def save_params(params, path):
+    """
+    Menyimpan parameter scaler ke sidecar JSON secara atomik (file sementara lalu os.replace).
+    Nilai float64 ditulis dengan repr terpendek yang round-trip, jadi tidak ada presisi yang hilang.
+    """
+    if not isinstance(params, MinMaxParams):
+        params = MinMaxParams.from_sklearn(params)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(params.to_dict(), f)
+    os.replace(tmp_path, path)
+
+
+def load_scaler(path):
+    """
+    Memuat scaler untuk inferensi sebagai MinMaxParams.
+
+    Sidecar .json dibaca langsung; file scaler sklearn lama (.pkl) tetap didukung dan dikonversi
+    ke MinMaxParams setelah di-unpickle (sklearn baru diimport pada jalur ini saja).
+
+    Raises:
+        ValueError: Jika versi sidecar tidak didukung
+    """
+    if path.endswith('.json'):
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('version') != SCALER_FORMAT_VERSION:
+            raise ValueError(f"Versi parameter scaler {path} tidak didukung: {data.get('version')}")
+        return MinMaxParams(data['min'], data['scale'], data.get('data_min'), data.get('data_max'),
+                            data.get('feature_range', (0, 1)))
+
+    import joblib
+    return MinMaxParams.from_sklearn(joblib.load(path))
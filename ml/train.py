@@ -1,23 +1,67 @@
 import argparse
 from core.config import CONFIGS
-from services.model_service import train_model
+from core.logger import setup_logging
 
 if __name__ == '__main__':
     # Konfigurasi argumen baris perintah (CLI)
     parser = argparse.ArgumentParser(description='Melatih Model LSTM (Train)')
-    
-    # Argumen Mode: 'daily' atau 'hourly'
-    parser.add_argument('--mode', type=str, default='hourly', choices=['daily', 'hourly'], help='Mode prediksi: daily atau hourly')
-    
+
+    # Argumen Mode: 'daily', 'hourly', atau 'all' (keduanya)
+    parser.add_argument('--mode', type=str, default='hourly', choices=['daily', 'hourly', 'all'], help='Mode prediksi: daily, hourly, atau all')
+
     # Argumen Simbol: Mata uang yang akan dilatih (default: IDR)
     parser.add_argument('--symbol', type=str, default='USDIDR=X', help='Simbol mata uang (cth: EURUSD=X)')
-    
+
+    # Pelatihan banyak simbol sekaligus (paralel)
+    parser.add_argument('--symbols', type=str, nargs='+', help='Daftar simbol mata uang untuk dilatih paralel')
+    parser.add_argument('--all', action='store_true', help='Latih ulang semua simbol yang sudah memiliki model di models/')
+    parser.add_argument('--workers', type=int, default=None, help='Jumlah proses worker (default: sesuai jumlah CPU)')
+    parser.add_argument('--threads', type=int, default=None, help='Thread TensorFlow per worker (default: CPU dibagi rata)')
+    parser.add_argument('--resume', action='store_true', help='Lanjutkan pelatihan dari checkpoint terakhir jika ada')
+    parser.add_argument('--finetune', action='store_true', help='Fine-tune model yang sudah ada pada data terbaru (dipromosikan jika tidak regresi)')
+    parser.add_argument('--export', action='store_true', help='Hanya ekspor model .h5 yang sudah ada ke bundle bobot NumPy (tanpa pelatihan)')
+    parser.add_argument('--report', type=str, default=None, help='Lokasi file ringkasan JSON (cth: training_report.json)')
+
     args = parser.parse_args()
-    
-    # Validasi Mode
-    if args.mode not in CONFIGS:
-        print(f"Mode tidak valid. Opsi: {list(CONFIGS.keys())}")
-        exit(1)
-        
-    # Jalankan proses pelatihan
-    train_model(CONFIGS[args.mode], symbol=args.symbol)
+    setup_logging()
+
+    modes = list(CONFIGS.keys()) if args.mode == 'all' else [args.mode]
+
+    if args.export:
+        from services.orchestrator import discover_symbols
+        from services.model_service import export_model
+
+        # Ekspor ulang model lama agar API dapat memakai backend NumPy
+        for symbol in (discover_symbols() if args.all else (args.symbols or [args.symbol])):
+            for mode in modes:
+                export_model(CONFIGS[mode], symbol=symbol)
+    elif args.all or args.symbols or len(modes) > 1 or args.workers:
+        from services.orchestrator import discover_symbols, run_training_jobs, print_report
+
+        symbols = discover_symbols() if args.all else (args.symbols or [args.symbol])
+        if not symbols:
+            print("Tidak ada simbol untuk dilatih.")
+            exit(1)
+
+        # Jalankan banyak job pelatihan secara paralel
+        report = run_training_jobs(symbols, modes, workers=args.workers,
+                                   threads_per_worker=args.threads, report_path=args.report,
+                                   resume=args.resume, finetune=args.finetune)
+        print_report(report)
+    else:
+        from datetime import datetime
+        from services.model_service import train_model, fine_tune_model
+        from services.orchestrator import print_report, save_report
+
+        # Jalankan proses pelatihan
+        if args.finetune:
+            summary = fine_tune_model(CONFIGS[args.mode], symbol=args.symbol)
+        else:
+            summary = train_model(CONFIGS[args.mode], symbol=args.symbol, resume=args.resume)
+        summary['status'] = 'ok'
+
+        # Ringkasan yang sama dengan pelatihan paralel (epoch & waktu yang dihemat early stopping/resume)
+        report = {'created_at': datetime.now().isoformat(), 'wall_time': summary['wall_time'], 'jobs': [summary]}
+        if args.report:
+            save_report(report, args.report)
+        print_report(report)